@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Sınıf seti: her öğrenciye adı ve gözlem yeri dolu bir form, tek PDF içinde. Üç form türü için
+# süre, Python bellek tepe değeri ve PDF boyutu; karşılaştırma için tek formun süresi.
+#   python benchmarks/gozlem_sinif_seti.py [öğrenci sayısı]
+import sys
+from olcum import check, env_line, import_page, report, timed, traced
+
+gozlem_formu = import_page("gozlem_formu")
+
+# 200 öğrencilik sınıf setinde form türü başına üst sınırlar: tek çekirdekli geliştirme makinesinde
+# ölçülen değerlerin (0,25 / 0,26 / 0,36 sn; en çok 15 MB) yaklaşık dört ve iki katı
+BUDGET_SECONDS = {"structured": 1.0, "semi": 1.0, "unstructured": 1.5}
+BUDGET_PEAK_MB = 32
+
+def main(n=200):
+    env_line()
+    items = gozlem_formu.DEFAULT_MADDELER.splitlines()
+    kazanim = gozlem_formu.DEFAULT_KAZANIM
+    students = [(f"Öğrenci Şükrü {i}", "Sultanahmet Meydanı" if i % 2 else "") for i in range(n)]
+    for form_type in ("structured", "semi", "unstructured"):
+        gozlem_formu.create_class_set_pdf(form_type, "OKUL", "Öğretmen", kazanim, items, students[:2])
+        _, single = timed(gozlem_formu.create_observation_pdf, form_type, "OKUL", "Öğretmen", kazanim, items, repeat=5)
+        pdf, seconds = timed(gozlem_formu.create_class_set_pdf, form_type, "OKUL", "Öğretmen", kazanim, items, students, repeat=3)
+        _, _, peak = traced(gozlem_formu.create_class_set_pdf, form_type, "OKUL", "Öğretmen", kazanim, items, students)
+        report(f"{form_type}: {n} öğrenci", seconds, form_ms=f"{seconds / n * 1000:.2f}", tek_form_ms=f"{single * 1000:.1f}",
+               tepe_mb=f"{peak / 2**20:.1f}", pdf_kb=len(pdf) // 1024)
+        if n == 200:
+            check(seconds <= BUDGET_SECONDS[form_type], f"{form_type} {seconds:.2f} sn > {BUDGET_SECONDS[form_type]} sn")
+            check(peak / 2**20 <= BUDGET_PEAK_MB, f"{form_type} bellek {peak / 2**20:.1f} MB > {BUDGET_PEAK_MB} MB")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Tek öğrencilik izin belgesi: önceden derlenmiş şablon (SlipTemplate.document) ile tam çizim
+# (SlipDocument.add_page + output) karşılaştırması. create_dual_pdf şablonu kullanır; şablon
+# uygulanamazsa aynı işlev tam çizime düşer.
+#   python benchmarks/izin_sablonu.py [öğrenci sayısı]
+import datetime
+import sys
+from olcum import check, env_line, report, timed
+import izin_belgesi
+
+TRIP = izin_belgesi.Trip("Atatürk Anadolu Lisesi", "Ayşe Öğretmen", "Belgrad Ormanı", datetime.date(2026, 11, 1),
+                         "Özel Servis", "Coğrafi gözlem ve inceleme gezisi.")
+
+def full_draw(student):
+    doc = izin_belgesi.SlipDocument()
+    doc.add_page(TRIP, [student] * 2)
+    return doc.output()
+
+def dual_pdf(student):
+    return izin_belgesi.create_dual_pdf(TRIP.school_name, *student, TRIP.teacher_name, TRIP.destination,
+                                        TRIP.trip_date, TRIP.transport, TRIP.purpose)
+
+def run_all(fn, students):
+    return [fn(s) for s in students]
+
+def main(n=200):
+    env_line()
+    students = [("10-A", str(i), f"Öğrenci Şükrü {i}") for i in range(n)]
+    _, build = timed(lambda: izin_belgesi.SlipTemplate(TRIP))
+    report("şablon derleme (gezi başına bir kez)", build)
+    check(izin_belgesi.get_template(TRIP).frame_ok, "şablon çerçevesi bu fpdf sürümünde kurulamadı")
+    full_draw(students[0]), dual_pdf(students[0])
+    per_slip = {}
+    for label, fn in (("tam çizim (add_page)", full_draw), ("create_dual_pdf (şablon)", dual_pdf)):
+        pdfs, seconds = timed(run_all, fn, students, repeat=3)
+        per_slip[fn] = seconds / n
+        report(label, per_slip[fn], ortalama_bayt=sum(map(len, pdfs)) // n)
+    slow, fast = per_slip[full_draw], per_slip[dual_pdf]
+    report("hızlanma", kat=f"{slow / fast:.1f}x")
+    check(fast < slow, "şablon yolu tam çizimden yavaş")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
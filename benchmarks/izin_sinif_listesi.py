@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Sınıf listesi: create_roster_pdf ile tüm öğrencilerin izin belgeleri tek PDF'te. İki sayfa düzeni
+# için süre, Python bellek tepe değeri (tracemalloc) ve PDF boyutu.
+#   python benchmarks/izin_sinif_listesi.py [öğrenci sayısı]
+import datetime
+import sys
+from olcum import check, env_line, report, timed, traced
+import izin_belgesi
+
+TRIP = izin_belgesi.Trip("Atatürk Anadolu Lisesi", "Ayşe Öğretmen", "Belgrad Ormanı", datetime.date(2026, 11, 1),
+                         "Özel Servis", "Coğrafi gözlem ve inceleme gezisi.")
+
+# 1000 öğrencilik liste için üst sınırlar: tek çekirdekli geliştirme makinesinde ölçülenin (2,1 sn,
+# 23 MB) yaklaşık üç katı. Karesel çıktı tamponu (bkz. pdf_ortak.OutputBuffer) geri gelirse süre aşılır.
+BUDGET_SECONDS = 6.0
+BUDGET_PEAK_MB = 64
+
+def main(n=1000):
+    env_line()
+    students = [(f"{9 + i % 4}-{'ABCD'[i % 4]}", str(100 + i), f"Öğrenci Şükrü Çağlar {i}") for i in range(n)]
+    izin_belgesi.create_roster_pdf(TRIP, students[:2])
+    for two_per_page in (False, True):
+        label = "sayfa başına iki öğrenci" if two_per_page else "öğrenci başına bir sayfa"
+        pdf, seconds = timed(izin_belgesi.create_roster_pdf, TRIP, students, two_per_page)
+        _, _, peak = traced(izin_belgesi.create_roster_pdf, TRIP, students, two_per_page)
+        report(f"{label}: {n} öğrenci", seconds, sayfa=n if not two_per_page else (n + 1) // 2,
+               tepe_mb=f"{peak / 2**20:.1f}", pdf_kb=len(pdf) // 1024)
+        if n == 1000:
+            check(seconds <= BUDGET_SECONDS, f"{label} {seconds:.2f} sn > {BUDGET_SECONDS} sn")
+            check(peak / 2**20 <= BUDGET_PEAK_MB, f"{label} bellek {peak / 2**20:.1f} MB > {BUDGET_PEAK_MB} MB")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Kişiye özel belgeler (ZIP): write_slip_zip'in bu süreçte sırayla (executor=None) ve spawn süreç
+# havuzunda 1, 2, ... çekirdek sayısı kadar işçiyle süresi. Havuz uygulamadaki gibi önceden ısıtılır
+# (veli_izin.get_slip_pool süreç başına bir kez kurulur); ana süreç bellek tepe değeri de ölçülür.
+#   python benchmarks/izin_zip.py [öğrenci sayısı]
+import datetime
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from olcum import check, env_line, report, timed, traced
+import izin_belgesi
+
+TRIP = izin_belgesi.Trip("Atatürk Anadolu Lisesi", "Ayşe Öğretmen", "Belgrad Ormanı", datetime.date(2026, 11, 1),
+                         "Özel Servis", "Coğrafi gözlem ve inceleme gezisi.")
+
+# Çekirdek başına beklenen en düşük verim: 2+ çekirdekte havuz, sıralı yolun (çekirdek x 0,5) katı hızlı olmalı
+MIN_EFFICIENCY = 0.5
+# Ana süreçte en fazla `window` bitmiş belge bekler; tepe değer öğrenci sayısıyla büyümemeli
+BUDGET_PEAK_MB = 8
+
+def write_zip(students, executor):
+    with tempfile.TemporaryFile() as out:
+        izin_belgesi.write_slip_zip(TRIP, students, out, executor=executor)
+        return out.tell()
+
+def main(n=300):
+    env_line()
+    cores = os.cpu_count() or 1
+    students = [(f"{9 + i % 4}-{'ABCD'[i % 4]}", str(100 + i), f"Öğrenci Şükrü Çağlar {i}") for i in range(n)]
+    write_zip(students[:4], None)
+    size, serial = timed(write_zip, students, None)
+    report(f"sıralı: {n} öğrenci", serial, zip_kb=size // 1024)
+    best = serial
+    for workers in sorted({1, 2, cores}):
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            write_zip(students[:workers * 2], pool)
+            _, seconds = timed(write_zip, students, pool)
+            _, _, peak = traced(write_zip, students, pool)
+        label = f"havuz, {workers} işçi"
+        if workers > cores:
+            label += " (çekirdekten fazla)"
+        else:
+            best = min(best, seconds)
+        report(label, seconds, hizlanma=f"{serial / seconds:.2f}x", ana_surec_tepe_mb=f"{peak / 2**20:.1f}")
+        check(peak / 2**20 <= BUDGET_PEAK_MB, f"{workers} işçiyle ana süreç belleği {peak / 2**20:.1f} MB > {BUDGET_PEAK_MB} MB")
+    if cores < 2:
+        # get_slip_pool tek çekirdekte havuz kurmaz; burada yalnız havuzun ek yükü görülür
+        print("Ölçeklenme tek çekirdekli makinede ölçülemez; 2+ çekirdekte yeniden çalıştırın.")
+    else:
+        check(serial / best >= cores * MIN_EFFICIENCY,
+              f"{cores} çekirdekte hızlanma {serial / best:.2f}x < {cores * MIN_EFFICIENCY:.1f}x")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Fotoğraf hazırlama (kaya_goruntu.prepare_image) uçtan uca gecikmesi: telefon fotoğrafı boyutunda
+# (12 MP, yön etiketi ve GPS'li EXIF) sentetik JPEG'ler ve bir PNG. Önceki sürüm fotoğrafı olduğu gibi
+# gönderiyordu; yükleme boyutu ve yükleme dahil uçtan uca süre bununla karşılaştırılır. Yükleme süresi
+# tipik yukarı yönlü bant genişliklerinden hesaplanır. Karşılaştırma için draft modu kullanılmadan tam
+# çözünürlükte çözme de ölçülür. Çıktıda EXIF/GPS kalmadığı ve yönün uygulandığı doğrulanır.
+#   python benchmarks/kaya_goruntu.py [fotoğraf sayısı]
+import io
+import statistics
+import sys
+from olcum import check, env_line, report, sample_photo, timed
+from PIL import Image, ImageOps
+from kaya_goruntu import BYTE_BUDGET, JPEG_QUALITY, MAX_EDGE, MIN_JPEG_QUALITY, prepare_image
+
+# 12 MP JPEG başına üst sınır: tek çekirdekli geliştirme makinesinde ölçülen ortancanın (245 ms) yaklaşık iki katı
+BUDGET_MEDIAN_MS = 450
+# Yukarı yönlü bant genişliği (Mbit/s): mobil veri ve okul kablosuz ağı
+UPLINK_MBPS = (5, 20)
+
+def upload_seconds(size, mbps):
+    return size * 8 / (mbps * 1e6)
+
+def full_decode(data):
+    # Draft modu olmadan aynı işlem: tam çözünürlüklü bitmap oluşur
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert("RGB")
+    img.thumbnail((MAX_EDGE, MAX_EDGE), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buf.getvalue()
+
+def main(n=8):
+    env_line()
+    photos = [sample_photo(4000, 3000, seed=i) for i in range(n)]
+    report("kaynak", None, adet=n, ortalama_kb=sum(map(len, photos)) // n // 1024, boyut="4000x3000")
+    prepare_image(photos[0])
+
+    times, sizes = [], []
+    for data in photos:
+        (out, stats), seconds = timed(prepare_image, data)
+        times.append(seconds)
+        sizes.append(len(out))
+        img = Image.open(io.BytesIO(out))
+        check(not img.getexif(), "hazırlanan görüntüde EXIF kaldı")
+        check(img.size == (1200, 1600), f"yön uygulanmadı ya da boyut beklenmedik: {img.size}")
+        check(len(out) <= BYTE_BUDGET or stats["quality"] == MIN_JPEG_QUALITY, "bayt bütçesi aşıldı")
+    median = statistics.median(times)
+    report("prepare_image (draft)", median, p95_ms=f"{sorted(times)[int(0.95 * (n - 1))] * 1000:.1f}",
+           ortalama_kb=sum(sizes) // n // 1024)
+
+    # Önceki sürüm: ham fotoğraf (EXIF/GPS dahil) hazırlıksız yüklenir
+    raw, prepared = sum(map(len, photos)) / n, sum(sizes) / n
+    report("yükleme boyutu: ham / hazırlanmış", None, ham_kb=int(raw // 1024), hazir_kb=int(prepared // 1024),
+           kat=f"{raw / prepared:.1f}x")
+    for mbps in UPLINK_MBPS:
+        before = upload_seconds(raw, mbps)
+        after = median + upload_seconds(prepared, mbps)
+        report(f"uçtan uca, {mbps} Mbit/s yükleme", after, ham_ms=f"{before * 1000:.0f}", kat=f"{before / after:.1f}x")
+        check(after < before, f"{mbps} Mbit/s'te hazırlama + yükleme ham yüklemeden yavaş")
+
+    # Bütçeye sığmayan görüntüde kalite tabanın altına inmemeli
+    _, floor = prepare_image(photos[0], max_bytes=32 * 1024)
+    report("kalite tabanı (32 KB bütçe)", None, kalite=floor["quality"], kb=floor["bytes"] // 1024)
+    check(floor["quality"] == MIN_JPEG_QUALITY, f"kalite {floor['quality']} < {MIN_JPEG_QUALITY}")
+
+    _, full = timed(full_decode, photos[0], repeat=3)
+    report("tam çözünürlükte çözme (karşılaştırma)", full, kat=f"{full / median:.1f}x")
+
+    png = io.BytesIO()
+    Image.open(io.BytesIO(photos[0])).resize((2000, 1500)).save(png, format="PNG")
+    _, png_seconds = timed(prepare_image, png.getvalue(), repeat=3)
+    report("prepare_image (PNG 3 MP)", png_seconds, kaynak_kb=png.tell() // 1024)
+
+    check(median * 1000 <= BUDGET_MEDIAN_MS, f"ortanca {median * 1000:.0f} ms > {BUDGET_MEDIAN_MS} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Sergi kataloğu: toplu analizden gelen numunelerle (hazırlanmış fotoğraf + analiz metni)
+# create_catalog_pdf. Süre, Python bellek tepe değeri ve PDF boyutu bütçeyle karşılaştırılır.
+#   python benchmarks/kaya_katalog.py [numune sayısı]
+import sys
+from olcum import check, env_line, report, sample_photo, timed, traced
+from kaya_goruntu import prepare_image
+import kaya_katalog
+
+ANALYSIS = """1. **Kayaç/Mineral Adı:** Granit
+2. **Jeolojik Grubu:** Magmatik (Derinlik)
+3. **Görsel Kanıtlar:** İri taneli, kuvars, feldispat ve biyotit içeren holokristalen doku. """ + "Açıklama metni ölçüsü. " * 40 + """
+4. **Oluşum Süreci:** Magmanın yerin derinliklerinde yavaş soğuması.
+7. **Öğretim İpuçları:** Siyenit ile karıştırılabilir; kuvars oranına bakılmalı."""
+
+# 100 numune için üst sınırlar: süre tek çekirdekli geliştirme makinesinde ölçülenin yaklaşık üç katı;
+# boyut küçük resim bütçesinin (THUMB_BUDGET) numune sayısı katı ve metin/dizin için 8 KB/numune
+BUDGET_SECONDS = 8.0
+BUDGET_PEAK_MB = 32
+TEXT_BYTES_PER_ENTRY = 8 * 1024
+
+def main(n=100):
+    env_line()
+    # 10 farklı fotoğraf; uygulamadaki gibi modele gönderilmeden önce hazırlanmış (≤1600 px) hâlleri
+    photos = [prepare_image(sample_photo(2000, 1500, seed=i))[0] for i in range(10)]
+    entries = [{"name": f"Numune_{i:03d}.jpg", "text": ANALYSIS, "image": photos[i % len(photos)]} for i in range(n)]
+    kaya_katalog.create_catalog_pdf(entries[:2])
+    pdf, seconds = timed(kaya_katalog.create_catalog_pdf, entries)
+    _, _, peak = traced(kaya_katalog.create_catalog_pdf, entries)
+    size_budget = n * (kaya_katalog.THUMB_BUDGET + TEXT_BYTES_PER_ENTRY)
+    report(f"katalog: {n} numune", seconds, numune_ms=f"{seconds / n * 1000:.1f}", tepe_mb=f"{peak / 2**20:.1f}",
+           pdf_kb=len(pdf) // 1024, butce_kb=size_budget // 1024)
+    check(len(pdf) <= size_budget, f"PDF {len(pdf) // 1024} KB > {size_budget // 1024} KB")
+    if n == 100:
+        check(seconds <= BUDGET_SECONDS, f"{seconds:.2f} sn > {BUDGET_SECONDS} sn")
+        check(peak / 2**20 <= BUDGET_PEAK_MB, f"bellek {peak / 2**20:.1f} MB > {BUDGET_PEAK_MB} MB")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
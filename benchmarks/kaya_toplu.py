@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# Toplu analiz: BatchRunner, gerçek servis yerine yerel sahte HTTP sunucusuna (sahte_sunucu.py) istek
+# gönderir. Numuneler aynı adlı dosyalar içeren bir ZIP'ten iter_images ile okunur. Eşzamanlılığa
+# göre toplam süre, kota (429) ve geçici hata (503) altında yeniden denemeler ölçülür.
+#   python benchmarks/kaya_toplu.py [numune sayısı]
+import io
+import sys
+import time
+import zipfile
+from olcum import check, env_line, import_page, report
+from sahte_sunucu import FakeModelServer
+
+# model_istemci içe aktarılırken google.generativeai kullanımdan kaldırma uyarısı basar
+kaya_toplu = import_page("kaya_toplu")
+BatchRunner, iter_images = kaya_toplu.BatchRunner, kaya_toplu.iter_images
+
+LATENCY = 0.4           # Saniye; sahte sunucunun istek başına ortalama gecikmesi
+JITTER = 0.1
+# Gecikmenin baskın olduğu işte 4 eşzamanlı istek en az 3 kat hızlandırmalı (ideal: 4 kat)
+MIN_SPEEDUP = 3.0
+
+def sample_archive(n):
+    # İki "gün" klasörü, aynı telefon numaralandırması: gun1/IMG_0001.jpg ve gun2/IMG_0001.jpg
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        for i in range(n):
+            archive.writestr(f"gun{i % 2 + 1}/IMG_{i // 2 + 1:04d}.jpg", bytes(1000 + i))
+        archive.writestr("__MACOSX/gun1/._IMG_0001.jpg", b"")
+    upload = io.BytesIO(buf.getvalue())
+    upload.name = "sergi.zip"
+    return upload
+
+def run(items, server, concurrency, requests_per_minute):
+    runner = BatchRunner(server.client(), concurrency=concurrency, requests_per_minute=requests_per_minute, base_delay=0.2)
+    start = time.perf_counter()
+    results = list(runner.run(items, lambda name, data, call: call(data)))
+    return results, time.perf_counter() - start, runner.retries
+
+def main(n=24):
+    env_line()
+    items = list(iter_images([sample_archive(n)]))
+    names = [name for name, _ in items]
+    report("ZIP girdileri", adet=len(items), farkli_ad=len(set(names)), ornek=",".join(names[:3]))
+    check(len(items) == n and len(set(names)) == n, "aynı adlı ZIP girdileri birleşti ya da kayboldu")
+
+    # Kota yok: süre eşzamanlılıkla ölçeklenmeli, sunucudaki eşzamanlı istek sayısı sınırı aşmamalı
+    serial = None
+    for concurrency in (1, 4, 8):
+        with FakeModelServer(LATENCY, JITTER, seed=concurrency) as server:
+            results, seconds, retries = run(items, server, concurrency, requests_per_minute=6000)
+        serial = serial or seconds
+        stats = server.stats()
+        report(f"eşzamanlılık {concurrency}", seconds, hizlanma=f"{serial / seconds:.1f}x",
+               tepe_istek=stats["peak_active"], hata=sum(1 for r in results if r[2]))
+        check(stats["peak_active"] <= concurrency, f"sunucuda {stats['peak_active']} eşzamanlı istek > {concurrency}")
+        check(all(r[2] is None for r in results), "kotasız çalıştırmada hata")
+        if concurrency == 4:
+            check(serial / seconds >= MIN_SPEEDUP, f"4 eşzamanlı istek yalnız {serial / seconds:.1f}x hızlandırdı")
+
+    # Dakikada 240 istek kotası ve %15 geçici hata: tüm numuneler yeniden denemeyle tamamlanmalı
+    with FakeModelServer(LATENCY, JITTER, requests_per_minute=240, failure_rate=0.15, seed=7) as server:
+        results, seconds, retries = run(items, server, 4, requests_per_minute=240)
+    stats = server.stats()
+    report("kota + %15 geçici hata", seconds, yeniden_deneme=retries, kota_429=stats["quota"],
+           hata_503=stats["failed"], tamamlanan=sum(1 for r in results if r[2] is None))
+    check(all(r[2] is None for r in results), "yeniden denemelere rağmen tamamlanmayan numune var")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 24)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import importlib
+import io
+import logging
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+# --- ÖLÇÜM YARDIMCILARI ---
+# Betikler "python benchmarks/<betik>.py" ile çalıştırılır. Uygulama modülleri ve tr_font.ttf gibi
+# göreli yollar depo kökünden okunduğu için çalışma dizini köke alınır.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+def import_page(name):
+    # Streamlit sayfası içe aktarılınca arayüz kodu "bare" kipte bir kez çalışır; bağlam uyarıları susturulur
+    logging.disable(logging.WARNING)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return importlib.import_module(name)
+    finally:
+        logging.disable(logging.NOTSET)
+
+def timed(fn, *args, repeat=1, **kwargs):
+    # (son sonuç, çağrı başına en iyi süre sn); ilk çağrı ısınma sayılmaz, ayrıca yapılmalıdır
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def traced(fn, *args, **kwargs):
+    # (sonuç, süre sn, Python bellek tepe değeri bayt); tracemalloc süreyi uzatır, süre ayrıca ölçülmelidir
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def report(label, seconds=None, **values):
+    parts = [f"{label:<40}"]
+    if seconds is not None:
+        parts.append(f"{seconds * 1000:10.2f} ms")
+    parts += [f"{key}={value}" for key, value in values.items()]
+    print("  ".join(parts))
+
+def check(condition, message):
+    # Bütçe aşımı betiği hata koduyla bitirir (CI ya da elle karşılaştırma için)
+    if not condition:
+        print(f"BÜTÇE AŞILDI: {message}")
+        sys.exit(1)
+
+def env_line():
+    print(f"Python {sys.version.split()[0]} · {os.cpu_count()} CPU · {sys.platform}")
+
+def sample_photo(width=4000, height=3000, seed=0, quality=92, orientation=6, gps=(41.0082, 28.9784)):
+    # Telefon fotoğrafı benzeri JPEG: dokulu (kolay sıkışmayan) pikseller, yön etiketi ve GPS'li EXIF.
+    # Aynı tohumla aynı bayt dizisi üretilir; ölçümler makineler arasında karşılaştırılabilir.
+    import numpy as np
+    from PIL import Image
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 12, width, dtype=np.float32)
+    y = np.linspace(0, 9, height, dtype=np.float32)[:, None]
+    base = 110 + 50 * np.sin(x * (1 + seed % 5)) * np.cos(y * 0.7) + 25 * np.sin((x + y) * 3)
+    pixels = base[..., None] + rng.normal(0, 18, (height, width, 3)).astype(np.float32) + np.array([12, 0, -10], np.float32)
+    img = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    exif = Image.Exif()
+    exif[0x010F], exif[0x0110] = "Olcum", "Sentetik Kamera"     # Make, Model
+    if orientation:
+        exif[0x0112] = orientation
+    if gps:
+        def dms(value):
+            value = abs(value)
+            return (int(value), int(value * 60) % 60, round(value * 3600 % 60, 2))
+        exif[0x8825] = {1: "N" if gps[0] >= 0 else "S", 2: dms(gps[0]), 3: "E" if gps[1] >= 0 else "W", 4: dms(gps[1])}
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality, exif=exif)
+    return buf.getvalue()
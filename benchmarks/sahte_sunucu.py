@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- YEREL SAHTE MODEL SUNUCUSU ---
+# Ölçüm betikleri için Gemini yerine geçen HTTP sunucusu (127.0.0.1, boş bir port). POST gövdesini
+# (görüntü baytları) alır, gecikme (latency ± jitter sn) kadar bekletip düz metin analiz döndürür.
+# Dakikalık kotayı aşan isteğe 429, failure_rate oranındaki isteğe 503 yanıtı verir; istemcide bunlar
+# HTTPError olarak yükselir ve .code alanı sayesinde is_retryable ikisini de geçici sayar. Aynı tohumla
+# aynı gecikme ve hata dizisi üretilir (sıra, isteklerin sunucuya varış sırasıdır).
+class FakeModelServer:
+    def __init__(self, latency=1.0, jitter=0.3, requests_per_minute=None, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.requests_per_minute = requests_per_minute
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.active = 0
+        self.counters = {"requests": 0, "ok": 0, "quota": 0, "failed": 0, "peak_active": 0}
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/generate"
+        self.thread = None
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _admit(self):
+        # (durum kodu, gecikme sn)
+        with self.lock:
+            self.counters["requests"] += 1
+            if self.requests_per_minute:
+                now = time.monotonic()
+                while self.recent and now - self.recent[0] >= 60:
+                    self.recent.popleft()
+                if len(self.recent) >= self.requests_per_minute:
+                    self.counters["quota"] += 1
+                    return 429, 0.0
+                self.recent.append(now)
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            status = 503 if self.random.random() < self.failure_rate else 200
+            self.active += 1
+            self.counters["peak_active"] = max(self.counters["peak_active"], self.active)
+            return status, delay
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                size = len(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                status, delay = server._admit()
+                if status != 429:
+                    time.sleep(delay)
+                    with server.lock:
+                        server.active -= 1
+                        server.counters["ok" if status == 200 else "failed"] += 1
+                body = (f"Sahte analiz ({size} bayt): Granit, magmatik kayaç." if status == 200 else
+                        "Sahte sunucu: dakikalık kota aşıldı" if status == 429 else
+                        "Sahte sunucu: servis geçici olarak kullanılamıyor").encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def client(self, timeout=30.0):
+        # BatchRunner'a verilecek istemci: client(görüntü baytları) -> metin
+        def call(payload):
+            request = urllib.request.Request(self.url, data=payload, headers={"Content-Type": "application/octet-stream"})
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.read().decode("utf-8")
+        return call
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
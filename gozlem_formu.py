@@ -1,7 +1,17 @@
 import streamlit as st
 from fpdf import FPDF
-import os
-import google.generativeai as genai
+import time
+import unicodedata
+import uuid
+from concurrent.futures import wait
+from functools import partial
+from model_istemci import ModelClient, format_stats
+from onbellek import ResponseCache
+from kazanim_kutuphanesi import load_library, outcome_label
+from ogrenci_listesi import column_key, read_roster
+from pdf_tablo import Table, draw_table
+from pdf_ortak import new_document, pdf_bytes, pdf_text
+from on_yukleme import Prefetcher
 
 # --- SAYFA AYARLARI ---
 st.set_page_config(page_title="AI Saha Gözlem Formu", page_icon="📋", layout="wide")
@@ -9,7 +19,6 @@ st.set_page_config(page_title="AI Saha Gözlem Formu", page_icon="📋", layout=
 # --- API ANAHTARI KONTROLÜ ---
 try:
     api_key = st.secrets["GOOGLE_API_KEY"]
-    genai.configure(api_key=api_key)
     has_api = True
 except:
     has_api = False
@@ -38,10 +47,33 @@ Turizmin inceleme sahanızdaki ekonomik etkileri nelerdir?
 Turizmin yerel kültür ile olan etkilerini hangi örneklerle gözlemlediniz?
 Turizmin inceleme sahanızdaki çevresel etkileri nelerdir?"""
 
+# --- MODEL İSTEMCİSİ (süreç başına bir kez, tüm oturumlarca paylaşılır) ---
+@st.cache_resource
+def get_model_client(key):
+    return ModelClient(key)
+
+# --- ÖNERİ ÖNBELLEĞİ (tüm oturumlarca paylaşılır, diskte kalıcı) ---
+# İstem metinleri değiştiğinde PROMPT_VERSION artırılmalı; eski öneriler kendiliğinden devre dışı kalır.
+PROMPT_VERSION = "1"
+
+@st.cache_resource
+def get_suggestion_cache():
+    return ResponseCache("gozlem_onerileri.db", memory_size=256, ttl_seconds=180 * 24 * 3600, max_entries=5000)
+
+# Büyük/küçük harf (Türkçe I/İ dahil), boşluk ve tırnak farkları aynı kazanıma düşer
+QUOTE_MAP = str.maketrans({"’": "'", "‘": "'", "“": '"', "”": '"', "–": "-", "—": "-"})
+
+def normalize_kazanim(text):
+    text = unicodedata.normalize("NFC", text).replace("İ", "i").replace("I", "ı").lower().translate(QUOTE_MAP)
+    return " ".join(text.split()).strip(" .;")
+
+def suggestion_cache_key(topic, form_type):
+    # Yapılandırılmış ve yarı-yapılandırılmış formlar aynı istemi kullanır
+    kind = "questions" if form_type == "unstructured" else "checklist"
+    return f"{PROMPT_VERSION}|{kind}|{normalize_kazanim(topic)}"
+
 # --- AI FONKSİYONU ---
-def get_ai_suggestions(topic, form_type):
-    model = genai.GenerativeModel('gemini-flash-latest')
-    
+def suggestion_prompt(topic, form_type):
     if form_type == "unstructured":
         prompt = f"""
         Sen uzman bir Coğrafya öğretmenisin. Aşağıdaki kazanım/konu için lise öğrencilerine yönelik 
@@ -56,26 +88,92 @@ def get_ai_suggestions(topic, form_type):
         Konu: {topic}
         Kurallar: Türkçe olsun, madde işareti koyma, somut gözlemler olsun (10-12 adet).
         """
-        
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        return f"Hata: AI servisine ulaşılamadı. ({e})"
-
-# --- GÜVENLİ METİN FONKSİYONU ---
-def safe_text(text):
-    if text is None: return ""
-    text = str(text)
-    replacements = {"’": "'", "‘": "'", "“": '"', "”": '"', "–": "-", "—": "-", "…": "..."}
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-
-    if not os.path.exists("tr_font.ttf"):
-        tr_map = {"ı": "i", "İ": "I", "ğ": "g", "Ğ": "G", "ü": "u", "Ü": "U", "ş": "s", "Ş": "S", "ö": "o", "Ö": "O", "ç": "c", "Ç": "C"}
-        for tr, en in tr_map.items():
-            text = text.replace(tr, en)
-    return text
+    return prompt
+
+# Yanıt akış olarak döner; parçalar geldikçe sayfaya yazılır, tam metin stream.text ile alınır.
+def get_ai_suggestions(topic, form_type):
+    return get_model_client(api_key).stream(suggestion_prompt(topic, form_type))
+
+def outcome_items(outcome, form_type):
+    return outcome["questions"] if form_type == "unstructured" else outcome["checklist"]
+
+# Kütüphanedeki hazır maddeler ya da önbellekteki (arka planda hazırlananlar dahil) öneri
+def ready_suggestion(topic, form_type):
+    outcome = load_library().by_code(topic)
+    if outcome and outcome_items(outcome, form_type):
+        return "\n".join(outcome_items(outcome, form_type)), "library"
+    cached = get_suggestion_cache().get(suggestion_cache_key(topic, form_type))
+    if cached is not None:
+        return cached, "cache"
+    return None, None
+
+# --- ARKA PLANDA ÖNERİ HAZIRLAMA ---
+# Kazanım girildiğinde form türlerinin önerileri aynı anda istenir ve önbelleğe yazılır; form türü
+# değiştirildiğinde öneri beklemeden gelir. Yarı-yapılandırılmış form yapılandırılmışla aynı istemi
+# kullandığından iki istek yeterlidir. Kazanım değişince eski kazanımın istekleri bırakılır.
+PREFETCH_TYPES = ("structured", "unstructured")
+
+@st.cache_resource
+def get_prefetcher():
+    return Prefetcher()
+
+# İş parçacığında çalışır (st.* çağrılmaz); kazanım değiştiyse akış yarıda bırakılır
+def fetch_suggestion(client, cache, key, topic, form_type, cancelled):
+    stream = client.stream(suggestion_prompt(topic, form_type))
+    for _ in stream:
+        if cancelled():
+            return None
+    text = stream.text.strip()
+    if text:
+        cache.put(key, text)
+    return {"text": text, "timings": stream.timings()}
+
+def prefetch_suggestions(topic):
+    if "prefetch_owner" not in st.session_state:
+        st.session_state.prefetch_owner = uuid.uuid4().hex
+    state = st.session_state.get("prefetch")
+    if state and state["topic"] == normalize_kazanim(topic):
+        return state["futures"]
+    futures = {}
+    if normalize_kazanim(topic):
+        client, cache = get_model_client(api_key), get_suggestion_cache()
+        for form_type in PREFETCH_TYPES:
+            if ready_suggestion(topic, form_type)[0] is None:
+                key = suggestion_cache_key(topic, form_type)
+                job = partial(fetch_suggestion, client, cache, key, topic, form_type)
+                futures[key] = get_prefetcher().submit(key, job, st.session_state.prefetch_owner)
+    get_prefetcher().release(st.session_state.prefetch_owner, keep=futures)
+    st.session_state.prefetch = {"topic": normalize_kazanim(topic), "futures": futures}
+    return futures
+
+def stop_prefetch():
+    if "prefetch_owner" in st.session_state:
+        get_prefetcher().release(st.session_state.prefetch_owner)
+    st.session_state.pop("prefetch", None)
+    return {}
+
+def prefetched_result(future):
+    # Tamamlanmış ve metin döndürmüş işin sonucu; hata, iptal ya da boş yanıtta None
+    if not future.done() or future.cancelled() or future.exception() is not None:
+        return None
+    result = future.result()
+    return result if result and result["text"] else None
+
+def prefetch_status(futures):
+    pending = sum(not f.done() for f in futures.values())
+
+    # Bekleyen istek varken durum her saniye yenilenir; hepsi bitince sayfa bir kez yeniden çizilir
+    @st.fragment(run_every=1.0 if pending else None)
+    def show():
+        done = sum(f.done() for f in futures.values())
+        if done < len(futures):
+            st.caption(f"⏳ Öneriler arka planda hazırlanıyor ({done}/{len(futures)})")
+            return
+        if pending:
+            st.rerun()
+        ready = sum(prefetched_result(f) is not None for f in futures.values())
+        st.caption(f"✅ Arka planda {ready}/{len(futures)} öneri hazırlandı; form türü değiştirildiğinde beklemeden gelir.")
+    show()
 
 # --- PDF MOTORU ---
 class PDF(FPDF):
@@ -85,143 +183,117 @@ class PDF(FPDF):
         self.set_font('Arial', 'I', 8)
         self.cell(0, 10, f'Sayfa {self.page_no()}', 0, 0, 'C')
 
-def create_observation_pdf(form_type, school_name, teacher_name, kazanim, items):
-    pdf = PDF()
-    font_path = "tr_font.ttf"
-    has_font = os.path.exists(font_path)
-    
-    pdf.add_page()
+FORM_TITLES = {
+    "structured": "YAPILANDIRILMIS GOZLEM FORMU",
+    "semi": "YARI-YAPILANDIRILMIS GOZLEM FORMU",
+    "unstructured": "YAPILANDIRILMAMIS (ACIK UCLU) GOZLEM FORMU"
+}
+# Tablolu formlar: sütunlar (başlık, genişlik, hizalama) ve draw_table seçenekleri
+FORM_TABLES = {
+    "structured": ([("Ölçütler / Gözlem Maddeleri", 130, 'L'), ("Var", 20, 'C'), ("Kısmen", 20, 'C'), ("Yok", 20, 'C')], {}),
+    # Açıklama yazılabilsin diye satırlar en az 10mm
+    "semi": ([("Ölçütler", 65, 'L'), ("Var", 12, 'C'), ("Yok", 12, 'C'), ("Açıklama (Nasıl Bir Etkisi Var?)", 100, 'L')], {"min_row_height": 10}),
+}
 
-    if has_font:
-        try:
-            pdf.add_font('TrFont', '', font_path, uni=True)
-            main_font = 'TrFont'
-        except:
-            main_font = 'Arial'; has_font = False
-    else:
-        main_font = 'Arial'
+# Formun öğrenciden bağımsız kısmı: etiketler, tablo sütunları ve madde satırlarının yükseklikleri ile
+# satır kırılımları. Form başına bir kez hesaplanır; sınıf setinde her öğrenci aynı ölçümleri kullanır
+# ve satırların sayfadaki yerleri yalnız bu yüksekliklerden çıkar (madde metni yeniden ölçülmez).
+class FormLayout:
+    def __init__(self, main_font, form_type, items):
+        text = partial(pdf_text, font=main_font)
+        self.form_type = form_type
+        self.title = FORM_TITLES[form_type]
+        self.kazanim_label = text("Kazanım/Konu")
+        self.labels = [text(l) for l in ["Gözlem Yeri", "Tarih", "Öğrenci Adı Soyadı", "Gözlem Süresi", "Öğretmen"]]
+        self.items = items
+        self.columns = self.table_options = self.rows = None
+        if form_type in FORM_TABLES:
+            columns, options = FORM_TABLES[form_type]
+            self.columns = [(text(title), w, align) for title, w, align in columns]
+            self.table_options = dict(options, font=(main_font, '', 8), header_font=(main_font, '', 9)) # Font küçüldü (Kompakt)
+
+    def table_rows(self, pdf):
+        # İlk çizimde ölçülür (FPDF imleci ilk add_page ile kurulur), sonraki formlar aynı ölçümü kullanır
+        if self.rows is None:
+            self.rows = Table(pdf, self.columns, **self.table_options).measure([(item, "", "", "") for item in self.items])
+        return self.rows
 
-    school_name = safe_text(school_name)
-    teacher_name = safe_text(teacher_name)
-    kazanim = safe_text(kazanim)
-    items = [safe_text(i) for i in items]
+def create_observation_pdf(form_type, school_name, teacher_name, kazanim, items):
+    pdf, main_font = new_document(PDF)
+    text = partial(pdf_text, font=main_font)
+    layout = FormLayout(main_font, form_type, [text(i) for i in items])
+    draw_observation_form(pdf, main_font, layout, text(school_name), text(teacher_name), text(kazanim))
+    return pdf_bytes(pdf)
+
+# Metinler pdf_text'ten geçmiş olarak gelir. Öğrenci adı/gözlem yeri verilmezse noktalı boş satır basılır.
+def draw_observation_form(pdf, main_font, layout, school_name, teacher_name, kazanim, student_name="", site=""):
+    pdf.add_page()
 
     # Başlıklar
     pdf.set_font(main_font, '', 14)
     pdf.cell(0, 10, txt=school_name.upper(), ln=True, align='C')
     pdf.set_font(main_font, '', 11) # Başlık fontu biraz küçüldü
-    
-    title_map = {
-        "structured": "YAPILANDIRILMIS GOZLEM FORMU",
-        "semi": "YARI-YAPILANDIRILMIS GOZLEM FORMU",
-        "unstructured": "YAPILANDIRILMAMIS (ACIK UCLU) GOZLEM FORMU"
-    }
-    title_text = safe_text(title_map[form_type])
-    pdf.cell(0, 8, txt=title_text, ln=True, align='C')
+    pdf.cell(0, 8, txt=layout.title, ln=True, align='C')
     pdf.ln(3)
     
     # Kazanım Kutusu
     pdf.set_font(main_font, '', 9) # Kompakt
-    lbl_kazanim = safe_text("Kazanım/Konu")
-    pdf.multi_cell(0, 5, txt=f"{lbl_kazanim}: {kazanim}", border=1, align='L')
+    pdf.multi_cell(0, 5, txt=f"{layout.kazanim_label}: {kazanim}", border=1, align='L')
     pdf.ln(4)
     
     # Bilgiler
-    l_yer, l_tar, l_ogr, l_sur, l_tea = map(safe_text, ["Gözlem Yeri", "Tarih", "Öğrenci Adı Soyadı", "Gözlem Süresi", "Öğretmen"])
+    l_yer, l_tar, l_ogr, l_sur, l_tea = layout.labels
     
-    pdf.cell(95, 6, txt=f"{l_yer}: ...........................................", ln=0)
+    pdf.cell(95, 6, txt=f"{l_yer}: {site or '...........................................'}", ln=0)
     pdf.cell(95, 6, txt=f"{l_tar}: ..../..../20....", ln=1)
-    pdf.cell(95, 6, txt=f"{l_ogr}: ................................", ln=0)
+    pdf.cell(95, 6, txt=f"{l_ogr}: {student_name or '................................'}", ln=0)
     pdf.cell(95, 6, txt=f"{l_sur}: .....................................", ln=1)
     pdf.cell(95, 6, txt=f"{l_tea}: {teacher_name}", ln=1)
     pdf.ln(4)
     
     # --- DİNAMİK TABLOLAR (TAŞMAYI ÖNLEYEN SİSTEM) ---
+    # Satır yüksekliği çizimden önce ölçülür; sayfaya sığmayan satır başlığıyla yeni sayfaya geçer.
     
-    if form_type == "structured":
-        pdf.set_fill_color(240, 240, 240)
-        h = [safe_text(x) for x in ["Ölçütler / Gözlem Maddeleri", "Var", "Kısmen", "Yok"]]
-        
-        # Sütun Genişlikleri
-        w_text = 130
-        w_box = 20
-        
-        pdf.cell(w_text, 8, h[0], 1, 0, 'C', 1)
-        pdf.cell(w_box, 8, h[1], 1, 0, 'C', 1)
-        pdf.cell(w_box, 8, h[2], 1, 0, 'C', 1)
-        pdf.cell(w_box, 8, h[3], 1, 1, 'C', 1)
-        
-        pdf.set_font(main_font, '', 8) # Font küçüldü (Kompakt)
-        
-        for item in items:
-            # 1. Mevcut konumu kaydet
-            x_start = pdf.get_x()
-            y_start = pdf.get_y()
-            
-            # 2. Metni yaz (MultiCell) ve yeni Y konumunu al
-            # Border=1 veriyoruz ki kutu çizsin
-            pdf.multi_cell(w_text, 5, txt=f" {item}", border=1, align='L')
-            y_end = pdf.get_y()
-            
-            # 3. Satır yüksekliğini hesapla
-            row_height = y_end - y_start
-            
-            # 4. İmleci eski yerine (metnin sağına) taşı
-            pdf.set_xy(x_start + w_text, y_start)
-            
-            # 5. Kutucukları bu yüksekliğe göre çiz
-            pdf.cell(w_box, row_height, "", 1)
-            pdf.cell(w_box, row_height, "", 1)
-            pdf.cell(w_box, row_height, "", 1, 1) # Sonuncusu alt satıra atar
-
-    elif form_type == "semi":
-        pdf.set_fill_color(240, 240, 240)
-        h = [safe_text(x) for x in ["Ölçütler", "Var", "Yok", "Açıklama (Nasıl Bir Etkisi Var?)"]]
-        
-        w_item, w_chk, w_exp = 65, 12, 100 # Genişlikler ayarlandı
-        
-        pdf.cell(w_item, 8, h[0], 1, 0, 'C', 1)
-        pdf.cell(w_chk, 8, h[1], 1, 0, 'C', 1)
-        pdf.cell(w_chk, 8, h[2], 1, 0, 'C', 1)
-        pdf.cell(w_exp, 8, h[3], 1, 1, 'C', 1)
-        
-        pdf.set_font(main_font, '', 8)
-        
-        for item in items:
-            x_start = pdf.get_x()
-            y_start = pdf.get_y()
-            
-            # Metin hücresi (Otomatik kaydırmalı)
-            pdf.multi_cell(w_item, 5, txt=f" {item}", border=1, align='L')
-            
-            # Eğer açıklama kısmı için ekstra yükseklik gerekiyorsa en az 10mm olsun
-            y_end = pdf.get_y()
-            row_height = max(y_end - y_start, 10) 
-            
-            # Eğer metin kısa kaldıysa, kutuyu tamamlamak için boşluğu doldur
-            if (y_end - y_start) < row_height:
-                pdf.set_xy(x_start, y_start)
-                pdf.cell(w_item, row_height, "", 1) # Sadece çerçeve çiz
-                # Metni tekrar yazmaya gerek yok, üstüne çizdik
-            
-            # İmleci sağa taşı
-            pdf.set_xy(x_start + w_item, y_start)
-            
-            pdf.cell(w_chk, row_height, "", 1)
-            pdf.cell(w_chk, row_height, "", 1)
-            pdf.cell(w_exp, row_height, "", 1, 1)
-
-    elif form_type == "unstructured":
+    if layout.columns:
+        draw_table(pdf, layout.columns, None, measured=layout.table_rows(pdf), **layout.table_options)
+
+    elif layout.form_type == "unstructured":
         pdf.set_font(main_font, '', 10)
-        for i, soru in enumerate(items, 1):
+        for i, soru in enumerate(layout.items, 1):
             pdf.multi_cell(0, 5, txt=f"{i}. {soru}")
             # Noktalı alan (Kompakt: 3 satır yeterli)
             for _ in range(3): 
                 pdf.cell(0, 7, txt="."*145, ln=1)
             pdf.ln(2)
 
-    try: return pdf.output(dest='S').encode('latin-1')
-    except: return pdf.output(dest='S').encode('latin-1', 'replace')
+# --- SINIF SETİ ---
+# Öğrenci listesi: "Ad Soyad" (ya da ilk sütun), isteğe bağlı "Grup" ve "Gözlem Yeri" sütunları.
+# Gözlem yeri öğrenci satırında yoksa grubunun yeri kullanılır.
+def class_set_students(rows, group_sites=None):
+    group_sites = group_sites or {}
+    return [(row.name, row.site or group_sites.get(column_key(row.group), "")) for row in rows]
+
+def parse_group_sites(text):
+    # "1: Sultanahmet Meydanı" ya da "A Grubu = Kapalıçarşı" satırları
+    sites = {}
+    for line in text.splitlines():
+        for sep in (":", "="):
+            if sep in line:
+                group, site = line.split(sep, 1)
+                if group.strip() and site.strip():
+                    sites[column_key(group)] = site.strip()
+                break
+    return sites
+
+def create_class_set_pdf(form_type, school_name, teacher_name, kazanim, items, students):
+    # Öğrenciden bağımsız metinler bir kez temizlenir; her öğrenci aynı belgeye yeni sayfa(lar) olarak eklenir
+    pdf, main_font = new_document(PDF)
+    text = partial(pdf_text, font=main_font)
+    school_name, teacher_name, kazanim = text(school_name), text(teacher_name), text(kazanim)
+    layout = FormLayout(main_font, form_type, [text(i) for i in items])
+    for student_name, site in students:
+        draw_observation_form(pdf, main_font, layout, school_name, teacher_name, kazanim, text(student_name), text(site))
+    return pdf_bytes(pdf)
 
 # --- ARAYÜZ BAŞLANGICI ---
 st.title("📋 AI Destekli Gözlem Formu Oluşturucu")
@@ -251,6 +323,16 @@ if "form_content" not in st.session_state:
     st.session_state.form_content = DEFAULT_MADDELER
 if "last_type" not in st.session_state:
     st.session_state.last_type = "structured"
+if "kazanim_text" not in st.session_state:
+    st.session_state.kazanim_text = DEFAULT_KAZANIM
+
+# Kütüphaneden seçilen kazanım metni ve (varsa) hazır maddeleri forma aktarılır
+def use_outcome(outcome, form_type):
+    st.session_state.kazanim_text = outcome_label(outcome)
+    items = outcome_items(outcome, form_type)
+    if items:
+        st.session_state.form_content = "\n".join(items)
+        st.session_state.ai_source = "library"
 
 # --- KENAR ÇUBUĞU ---
 with st.sidebar:
@@ -269,24 +351,112 @@ with st.sidebar:
 
     if selected_type != st.session_state.last_type:
         st.session_state.last_type = selected_type
-        if selected_type == "unstructured":
+        # Kütüphanede ya da arka planda hazırlanmış öneri varsa doğrudan gelir
+        ready, source = ready_suggestion(st.session_state.kazanim_text, selected_type)
+        if ready is not None:
+            st.session_state.form_content = ready
+        elif selected_type == "unstructured":
             st.session_state.form_content = DEFAULT_SORULAR
         else:
             st.session_state.form_content = DEFAULT_MADDELER
+        st.session_state.ai_source = source
+        st.session_state.ai_timings = None
         st.rerun()
 
 # --- ANA EKRAN ---
 st.subheader("1. Konu ve Kazanım")
-kazanim_text = st.text_area("Gözlem Konusu / Kazanımı", DEFAULT_KAZANIM, height=60)
+library = load_library()
+with st.expander(f"📚 Kazanım Kütüphanesi ({len(library)} kazanım, çevrimdışı arama)"):
+    query = st.text_input("Kod veya anahtar kelime", placeholder="ör. COĞ.12.5 ya da turizm çevre")
+    if query:
+        start = time.perf_counter()
+        results = library.search(query)
+        st.caption(f"{len(results)} sonuç · {(time.perf_counter() - start) * 1000:.1f} ms")
+        for outcome in results:
+            c_text, c_btn = st.columns([6, 1])
+            ready = " 📝" if outcome_items(outcome, selected_type) else ""
+            unofficial = "" if outcome["official"] else " ⚠️ *resmi metin değil*"
+            c_text.markdown(f"**{outcome['code']}** {outcome['text']}{ready}{unofficial}")
+            c_btn.button("Seç", key=f"kazanim_{outcome['code']}", on_click=use_outcome, args=(outcome, selected_type))
+        st.caption("📝 Hazır maddeleri olan kazanımlarda form yapay zekaya gerek kalmadan doldurulur.")
+    if library.unofficial_count():
+        st.caption(f"⚠️ Kütüphane öğretim programındaki kazanımların tamamını içermez. {library.unofficial_count()} kazanım resmi "
+                   "metin değil, programın tema yapısına göre hazırlanmış uyarlamadır; kodları programla eşleşmeyebilir. "
+                   "Seçildiğinde forma bu not ile yazılır; resmi kazanım için programdaki metni kullanın.")
+
+kazanim_text = st.text_area("Gözlem Konusu / Kazanımı", key="kazanim_text", height=60)
 
 if has_api:
+    prefetch = st.toggle("Önerileri arka planda hazırla", value=True, help="Kazanım girildiğinde tüm form türleri için öneriler aynı anda istenir; form türü değiştirildiğinde hazır gelir.")
+    prefetch_futures = prefetch_suggestions(kazanim_text) if prefetch else stop_prefetch()
+    if prefetch_futures:
+        prefetch_status(prefetch_futures)
+    regenerate = st.checkbox("Yeniden üret (önbelleği atla)", help="İşaretlenmezse bu kazanım için daha önce üretilmiş öneriler yapay zekaya sorulmadan getirilir.")
     if st.button("✨ Yapay Zeka ile Madde Öner", type="secondary"):
-        with st.spinner("Yapay zeka analiz ediyor..."):
-            ai_result = get_ai_suggestions(kazanim_text, selected_type)
-            if "Hata:" in ai_result: st.error(ai_result)
+        # Sıra: kütüphanedeki hazır maddeler, öneri önbelleği, yapay zeka
+        outcome = None if regenerate else library.by_code(kazanim_text)
+        ready = outcome and outcome_items(outcome, selected_type)
+        if ready:
+            st.session_state.form_content = "\n".join(ready)
+            st.session_state.ai_timings = None
+            st.session_state.ai_source = "library"
+            st.rerun()
+        cache = get_suggestion_cache()
+        cache_key = suggestion_cache_key(kazanim_text, selected_type)
+        cached = None if regenerate else cache.get(cache_key)
+        if cached is not None:
+            st.session_state.form_content = cached
+            st.session_state.ai_timings = None
+            st.session_state.ai_source = "cache"
+            st.rerun()
+        # Aynı öneri arka planda isteniyorsa ikinci bir istek açılmaz, o yanıt beklenir
+        future = None if regenerate else prefetch_futures.get(cache_key)
+        if future is not None and not future.cancelled():
+            with st.spinner("Arka planda hazırlanan öneriler bekleniyor..."):
+                wait([future])
+            result = prefetched_result(future)
+            if result is not None:
+                st.session_state.form_content = result["text"]
+                st.session_state.ai_timings = result["timings"]
+                st.session_state.ai_source = "prefetch"
+                st.rerun()
+        try:
+            with st.spinner("Yapay zeka analiz ediyor..."):
+                stream = get_ai_suggestions(kazanim_text, selected_type)
+            st.write_stream(stream)
+            st.session_state.ai_timings = stream.timings()
+            st.session_state.ai_source = "model"
+            if not stream.text.strip():
+                st.error("Hata: Yapay zeka boş yanıt döndürdü.")
             else:
-                st.session_state.form_content = ai_result
+                st.session_state.form_content = stream.text.strip()
+                cache.put(cache_key, st.session_state.form_content)
                 st.rerun()
+        except Exception as e:
+            st.error(f"Hata: AI servisine ulaşılamadı. ({e})")
+
+    if st.session_state.get("ai_source") == "cache":
+        st.caption("⚡ Bu kazanım için daha önce üretilmiş öneriler önbellekten getirildi. Farklı öneriler için \"Yeniden üret\" seçeneğini işaretleyin.")
+    elif st.session_state.get("ai_source") == "prefetch":
+        st.caption("⚡ Öneriler kazanım girilirken arka planda hazırlandı.")
+    elif st.session_state.get("ai_source") == "library":
+        st.caption("📚 Kazanım kütüphanesindeki hazır maddeler kullanıldı. Yapay zeka önerisi için \"Yeniden üret\" seçeneğini işaretleyin.")
+
+    if st.session_state.get("ai_timings") or st.session_state.get("ai_source") == "cache":
+        timings = st.session_state.get("ai_timings")
+        with st.expander("🛠️ Yanıt Süreleri ve Önbellek (debug)"):
+            if timings:
+                c1, c2, c3 = st.columns(3)
+                c1.metric("İlk parça (TTFT)", f"{timings['ttft_ms'] / 1000:.2f} sn" if timings["ttft_ms"] is not None else "-")
+                c2.metric("Toplam süre", f"{timings['total_ms'] / 1000:.2f} sn")
+                c3.metric("Parça / karakter", f"{timings['chunks']} / {timings['chars']}")
+            st.caption(format_stats(get_model_client(api_key).stats()))
+            cache_stats = get_suggestion_cache().stats()
+            st.caption(f"Önbellek: bellek isabeti {cache_stats['memory_hits']} · disk isabeti {cache_stats['disk_hits']} · "
+                       f"ıska {cache_stats['misses']} · kayıtlı öneri {cache_stats['disk_entries']}")
+            prefetch_stats = get_prefetcher().stats()
+            st.caption(f"Arka plan: başlatılan {prefetch_stats['submitted']} · birleştirilen {prefetch_stats['deduplicated']} · "
+                       f"iptal {prefetch_stats['cancelled']} · süren {prefetch_stats['in_flight']}")
 
 st.subheader("2. İçerik Düzenleme")
 st.info(f"Mod: **{form_type_display}**")
@@ -307,4 +477,25 @@ with col2:
     if st.button("📄 PDF Formu Oluştur", type="primary"):
         pdf_bytes = create_observation_pdf(selected_type, school_name, teacher_name, kazanim_text, clean_items)
         st.success("Form Hazır!")
-        st.download_button("📥 İndir (PDF)", pdf_bytes, f"Gozlem_Formu.pdf", "application/pdf")
\ No newline at end of file
+        st.download_button("📥 İndir (PDF)", pdf_bytes, f"Gozlem_Formu.pdf", "application/pdf")
+
+# --- SINIF SETİ ---
+with st.expander("👥 Sınıf Seti: Öğrenci Listesinden Kişiye Özel Formlar"):
+    st.caption("Öğrenci listesini (CSV/XLSX) yükleyin: \"Ad Soyad\" sütunu zorunlu; \"Grup\" ve \"Gözlem Yeri\" isteğe bağlıdır. "
+               "Her öğrenci için adı ve gözlem yeri doldurulmuş bir form, tek bir PDF içinde hazırlanır.")
+    roster_file = st.file_uploader("Öğrenci Listesi", type=["csv", "xlsx"], key="roster")
+    group_sites_text = st.text_area("Grup Gözlem Yerleri (isteğe bağlı)", placeholder="1: Sultanahmet Meydanı\n2: Kapalıçarşı", height=80)
+    if roster_file is not None:
+        try:
+            students = class_set_students(read_roster(roster_file), parse_group_sites(group_sites_text))
+        except Exception as e:
+            st.error(f"Öğrenci listesi okunamadı: {e}")
+            students = []
+        if students:
+            st.write(f"**Öğrenci sayısı:** {len(students)}")
+            if st.button("📄 Sınıf Setini Oluştur"):
+                start = time.perf_counter()
+                with st.spinner("Formlar hazırlanıyor..."):
+                    class_pdf = create_class_set_pdf(selected_type, school_name, teacher_name, kazanim_text, clean_items, students)
+                st.caption(f"{len(students)} form · {len(class_pdf) / 1024:.0f} KB · {time.perf_counter() - start:.1f} sn")
+                st.download_button("📥 Sınıf Setini İndir (PDF)", class_pdf, "Gozlem_Formlari_Sinif_Seti.pdf", "application/pdf")
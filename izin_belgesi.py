@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+import re
+import threading
+import unicodedata
+import zipfile
+import zlib
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import lru_cache
+from pdf_tablo import draw_table
+from pdf_ortak import FONT_NAME, new_document, pdf_bytes, pdf_text, to_ascii
+from izin_takip import qr_runs, slip_code
+
+# --- PDF OLUŞTURMA FONKSİYONLARI ---
+# Belge kodu (QR) her kopyanın sağ üst köşesine basılır
+QR_X, QR_TOP, QR_SIZE = 184, 5, 16
+
+# Gezinin tüm öğrencilerde ortak bilgileri
+Trip = namedtuple("Trip", "school_name teacher_name destination trip_date transport purpose")
+
+# A4 sayfanın üst ve alt yarısına birer izin belgesi yazılır. Yazı tipi belge başına bir kez eklenir;
+# toplu listede tüm öğrenciler aynı belgeye yeni sayfalar olarak eklenir.
+class SlipDocument:
+    def __init__(self):
+        self.pdf, self.font = new_document()
+        self.has_tr_font = self.font == FONT_NAME
+        # Yazı tipi numaraları (/F1, /F2, ...) her belgede aynı olsun; şablon içerikleri belgeler arasında paylaşılır
+        for style in ("B", ""):
+            self.pdf.set_font("Arial", style, 8)
+
+    def txt_fix(self, text):
+        return pdf_text(text, self.font)
+
+    def draw_slip(self, start_y, trip, class_name, student_no, student_name):
+        self.draw_header(start_y, trip)
+        self.draw_body(start_y, trip, class_name, student_no, student_name)
+        self.draw_details(trip)
+
+    def draw_header(self, start_y, trip):
+        pdf, has_tr_font, txt_fix = self.pdf, self.has_tr_font, self.txt_fix
+        school_name = trip.school_name
+
+        # 1. BAŞLIK BÖLÜMÜ
+        pdf.set_xy(10, start_y + 8) # Biraz aşağıdan başlattık
+        
+        if has_tr_font: pdf.set_font('TrFont', '', 11)
+        else: pdf.set_font("Arial", "B", 11)
+            
+        pdf.cell(0, 5, txt=txt_fix("T.C."), ln=True, align='C')
+        pdf.cell(0, 5, txt=txt_fix(f"{school_name.upper()} MÜDÜRLÜĞÜ"), ln=True, align='C')
+        pdf.cell(0, 5, txt=txt_fix("VELİ İZİN VE MUVAFAKAT BELGESİ"), ln=True, align='C')
+
+    # Belgenin öğrenciye göre değişen tek bölümü
+    def draw_body(self, start_y, trip, class_name, student_no, student_name):
+        pdf, has_tr_font, txt_fix = self.pdf, self.has_tr_font, self.txt_fix
+        teacher_name = trip.teacher_name
+        if student_name:
+            self.draw_code(start_y, slip_code(trip, (class_name, student_no, student_name)))
+
+        # 2. İZİN METNİ
+        pdf.set_xy(10, start_y + 25) # Boşluğu artırdık
+        if has_tr_font: pdf.set_font('TrFont', '', 9)
+        else: pdf.set_font("Arial", "", 9)
+        
+        c_name = txt_fix(class_name) if class_name else "..................."
+        s_no = student_no if student_no else "..................."
+        s_name = txt_fix(student_name) if student_name else "................................................................"
+        t_name = txt_fix(teacher_name) if teacher_name else "..............................................."
+        
+        body_text = (
+            f"Okulunuz {c_name} sınıfı, {s_no} numaralı öğrencisi, velisi bulunduğum "
+            f"{s_name}'nın; okulunuz coğrafya dersi kapsamında, sorumlu öğretmen "
+            f"{t_name} gözetiminde düzenlenecek olan saha çalışmasına katılmasına izin veriyorum."
+        )
+        # Satır yüksekliğini (h) 4'ten 5'e çıkardık ki satırlar birbirine girmesin
+        pdf.multi_cell(0, 5, txt=txt_fix(body_text))
+
+    # QR modülleri vektör olarak çizilir: yan yana koyu modüller tek dikdörtgen, hepsi tek dolgu
+    # komutuyla; altında okunabilir kod
+    def draw_code(self, start_y, code):
+        pdf = self.pdf
+        k = pdf.k
+        size, runs = qr_runs(code)
+        module = QR_SIZE / size
+        y0 = start_y + QR_TOP
+        pdf.set_fill_color(0, 0, 0)
+        pdf._out(" ".join("%.2f %.2f %.2f %.2f re" % ((QR_X + c * module) * k, (pdf.h - y0 - r * module) * k, n * module * k, -module * k)
+                          for r, c, n in runs) + " f")
+        pdf.set_xy(QR_X - 5, y0 + QR_SIZE)
+        pdf.set_font("Arial", "", 6)
+        pdf.cell(QR_SIZE + 10, 3, code, align='C')
+
+    # İzin metninin bittiği yerden başlar
+    def draw_details(self, trip):
+        pdf, has_tr_font, txt_fix = self.pdf, self.has_tr_font, self.txt_fix
+        destination, trip_date, transport, purpose = trip.destination, trip.trip_date, trip.transport, trip.purpose
+
+        # 3. SAHA ÇALIŞMASI BİLGİLERİ (TABLO)
+        # Dinamik boşluk: Metin nerede bittiyse 4 birim altına in
+        current_y = pdf.get_y() + 4
+        pdf.set_xy(10, current_y)
+        
+        if has_tr_font: pdf.set_font('TrFont', '', 9) 
+        else: pdf.set_font("Arial", "B", 9)  
+        pdf.cell(0, 6, txt=txt_fix("SAHA ÇALIŞMASI BİLGİLERİ"), ln=True, border='B')
+        
+        if has_tr_font: pdf.set_font('TrFont', '', 8)
+        else: pdf.set_font("Arial", "", 8)
+            
+        # Etiket : değer satırları; uzun değerler kendi sütununda kayar
+        info = [
+            ("Gidilecek Yer", destination),
+            ("Tarih", trip_date.strftime("%d/%m/%Y")),
+            ("Ulaşım Aracı", transport),
+            ("Etkinliğin Amacı", purpose),
+        ]
+        columns = [("", 35, 'L'), ("", 3, 'L'), ("", 0, 'L')]
+        draw_table(pdf, columns, [(txt_fix(k), ":", txt_fix(v)) for k, v in info], line_height=5.5, border=0) # Satır aralığını açtık
+        
+        # 4. SAĞLIK VE İLETİŞİM
+        current_y = pdf.get_y() + 3
+        pdf.set_xy(10, current_y)
+        if has_tr_font: pdf.set_font('TrFont', '', 9)
+        else: pdf.set_font("Arial", "B", 9)
+        pdf.cell(0, 6, txt=txt_fix("SAĞLIK VE İLETİŞİM BİLGİLERİ"), ln=True, border='B')
+        
+        if has_tr_font: pdf.set_font('TrFont', '', 8)
+        else: pdf.set_font("Arial", "", 8)
+        
+        # Sağlık Sorusu
+        health_q = "Öğrencimin etkinliğe engel kronik rahatsızlığı (fobi, kalp, astım vb.) var mı?"
+        pdf.cell(0, 5, txt=txt_fix(health_q), ln=True)
+        
+        # Kutucuklar (Biraz daha aralıklı)
+        pdf.cell(5, 5, txt="", border=1)
+        pdf.cell(15, 5, txt=txt_fix(" Hayır"), ln=False)
+        pdf.cell(5, 5, txt="", border=0) # Boşluk
+        pdf.cell(5, 5, txt="", border=1)
+        pdf.cell(15, 5, txt=txt_fix(" Evet"), ln=False)
+        pdf.cell(0, 5, txt=txt_fix("(Açıklayınız: .....................................................)"), ln=True)
+        
+        pdf.ln(2) # Hafif boşluk
+        
+        # Kan Grubu (YENİ EKLENDİ)
+        pdf.cell(35, 5, txt=txt_fix("Kan Grubu"), border=0)
+        pdf.cell(0, 5, txt=": ...........................................................", ln=True)
+        
+        # İletişim
+        pdf.cell(35, 5, txt=txt_fix("Veli Tel"), border=0)
+        pdf.cell(0, 5, txt=": ...........................................................", ln=True)
+        
+        pdf.cell(35, 5, txt=txt_fix("Acil Durum 2. Kişi"), border=0)
+        pdf.cell(0, 5, txt=": ...................................... (Tel: ...................................)", ln=True)
+
+        # 5. İMZA BÖLÜMÜ
+        pdf.ln(4)
+        if has_tr_font: pdf.set_font('TrFont', '', 7)
+        else: pdf.set_font("Arial", "", 7)
+        taahhut = "Yukarıdaki bilgilerin doğruluğunu beyan eder, öğrencimin sorumluluğunu kabul ederim."
+        pdf.multi_cell(0, 4, txt=txt_fix(taahhut), align='C')
+        
+        pdf.ln(2)
+        if has_tr_font: pdf.set_font('TrFont', '', 9)
+        else: pdf.set_font("Arial", "", 9)
+        
+        pdf.cell(95, 5, txt=txt_fix(f"Tarih: ..../..../20...."), align='C')
+        pdf.cell(95, 5, txt=txt_fix("Velinin Adı Soyadı - İmza"), align='C')
+
+    # slips: sayfaya yazılacak bir ya da iki (sınıf, numara, ad) üçlüsü
+    def add_page(self, trip, slips):
+        pdf = self.pdf
+        pdf.add_page()
+        # Önceki sayfanın kesme çizgisi ayarları üst kopyaya taşınmasın
+        pdf.set_line_width(0.2)
+        pdf.set_draw_color(0, 0, 0)
+        self.draw_slip(0, trip, *slips[0])   # Üst kopya
+        if len(slips) < 2:
+            return
+        self.draw_cut_line()
+        self.draw_slip(148, trip, *slips[1]) # Alt kopya
+
+    def draw_cut_line(self):
+        pdf = self.pdf
+        # Kesme Çizgisi
+        pdf.set_line_width(0.5)
+        pdf.set_draw_color(150, 150, 150)
+        pdf.dashed_line(0, 148, 210, 148, dash_length=2, space_length=2)
+        pdf.set_xy(100, 145)
+        pdf.set_font("Arial", size=8)
+        pdf.cell(10, 4, "- - - - Kesme Cizgisi - - - -", align='C')
+
+    # Sayfalara doğrudan yazılan şablon içeriğindeki karakterler de yazı tipi alt kümesine girsin
+    def use_chars(self, chars):
+        for font in self.pdf.fonts.values():
+            if font.get('type') == 'TTF':
+                font['subset'].extend(chars)
+
+    def output(self):
+        return pdf_bytes(self.pdf)
+
+# --- HAZIR BELGE ŞABLONU ---
+# Gezi bilgileri aynı kaldıkça başlık, bilgi tablosu, sağlık/iletişim ve imza bölümleri ile kesme
+# çizgisi bir kez çizilir ve sayfa içerik akışı (PDF komutları) olarak saklanır. Öğrenciye göre
+# yalnızca izin metni dizilir; metnin satır sayısı değişirse alttaki sabit bölüm PDF dönüşümüyle
+# (cm) kaydırılır. Tek öğrencilik belgelerde yazı tipi alt kümesi de şablonla bir kez gömülür ve
+# belge, hazır PDF çerçevesine yeni içerik akışı yerleştirilerek üretilir.
+CUT_Y = 148
+BODY_TOP, BODY_LINE = 25, 5
+# Öğrenci alanlarında beklenen karakterler (ASCII, Latin-1 harfleri, Türkçe harfler) baştan gömülür;
+# dışında kalan bir karakter varsa belge her zamanki gibi baştan çizilir.
+OVERLAY_CHARS = frozenset(range(32, 127)) | frozenset(range(0xC0, 0x100)) | frozenset(map(ord, "ğĞıİşŞ’‘"))
+
+class SlipTemplate:
+    def __init__(self, trip):
+        self.trip = trip
+        self.lock = threading.Lock()
+        self.doc = SlipDocument()
+        pdf = self.doc.pdf
+        pdf.add_page()
+        pdf.set_line_width(0.2)
+        pdf.set_draw_color(0, 0, 0)
+        self.prefix = self._take()
+        self.headers = {y: self._capture(self.doc.draw_header, y, trip) for y in (0, CUT_Y)}
+        self.ref_y = BODY_TOP + 2 * BODY_LINE
+        pdf.set_xy(10, self.ref_y)
+        self.details = self._capture(self.doc.draw_details, trip)
+        self.details_height = pdf.get_y() - self.ref_y
+        self.cut = self._capture(self.doc.draw_cut_line)
+        # Öğretmen adı izin metninde geçer; onun karakterleri de gömülür
+        self.chars = OVERLAY_CHARS.union(map(ord, trip.teacher_name), *(f['subset'] for f in pdf.fonts.values() if f.get('type') == 'TTF'))
+        self._build_frame()
+
+    def _take(self):
+        pdf = self.doc.pdf
+        ops, pdf.pages[pdf.page] = pdf.pages[pdf.page], ""
+        return ops
+
+    def _capture(self, draw, *args):
+        # Yazı tipi komutu her parçanın başına yazılsın (FPDF aynı yazı tipini yeniden seçmez)
+        self.doc.pdf.font_family = ''
+        draw(*args)
+        return self._take()
+
+    def _build_frame(self):
+        # Boş sayfalı belge; 4 numaralı nesne sayfa içeriğidir, xref kaymaları belge başına yeniden hesaplanır.
+        # Bu yerleşim FPDF 1.7.2'nin çıktı sırasına dayanır (requirements.txt'de sabit). Başka bir sürümde
+        # yerleşim tutmazsa çerçeve kullanılmaz: document() None döner ve belge add_page ile çizilir.
+        self.frame_ok = False
+        frame = SlipDocument()
+        frame.pdf.add_page()
+        frame.pdf.pages[1] = ""
+        frame.use_chars(sorted(self.chars))
+        data = frame.output()
+        offsets = getattr(frame.pdf, "offsets", None)
+        if not isinstance(offsets, dict) or sorted(offsets) != list(range(1, frame.pdf.n + 1)) or frame.pdf.n < 4:
+            return
+        self.offsets = [offsets[i] for i in range(1, frame.pdf.n + 1)]
+        self.content_at = offsets[4]
+        self.content_end = min((o for o in self.offsets if o > self.content_at), default=None)
+        page_end = min((o for o in self.offsets if o > offsets[3]), default=None)
+        if (self.content_end is None or page_end is None
+                or not data.startswith(b"4 0 obj\n<</Filter /FlateDecode /Length ", self.content_at)
+                or not data[:self.content_end].endswith(b"endstream\nendobj\n")
+                or b"/Contents 4 0 R" not in data[offsets[3]:page_end]
+                or data.count(b"\nxref\n0 %d\n" % (frame.pdf.n + 1)) != 1
+                or b"trailer\n" not in data):
+            return
+        self.head = data[:self.content_at]
+        self.tail = data[self.content_end:data.rindex(b"\nxref\n") + 1]
+        self.trailer = data[data.rindex(b"trailer\n"):data.rindex(b"startxref\n")]
+        self.frame_ok = True
+
+    def fits(self, student):
+        return not self.doc.has_tr_font or all(ord(c) in self.chars for c in "".join(map(str, student)))
+
+    def page_content(self, slips):
+        # Sayfanın içerik akışı; şablona uymayan öğrencide (karakter ya da sayfa taşması) None
+        parts = [self.prefix]
+        for i, student in enumerate(slips):
+            start_y = i * CUT_Y
+            if not self.fits(student):
+                return None
+            with self.lock:
+                body = self._capture(self.doc.draw_body, start_y, self.trip, *student)
+                end_y = self.doc.pdf.get_y()
+                for font in self.doc.pdf.fonts.values():
+                    if font.get('type') == 'TTF': font['subset'] = []
+            if end_y + self.details_height > self.doc.pdf.page_break_trigger:
+                return None
+            details = self.details
+            if end_y != self.ref_y:
+                details = f"q 1 0 0 1 0 {(self.ref_y - end_y) * self.doc.pdf.k:.2f} cm\n{details}Q\n"
+            if i:
+                parts.append(self.cut)
+            parts += [self.headers[start_y], body, details]
+        return "".join(parts)
+
+    def document(self, slips):
+        if not self.frame_ok:
+            return None
+        content = self.page_content(slips)
+        if content is None:
+            return None
+        stream = zlib.compress(content.encode("latin-1", "ignore"))
+        obj = b"4 0 obj\n<</Filter /FlateDecode /Length %d>>\nstream\n%s\nendstream\nendobj\n" % (len(stream), stream)
+        delta = len(obj) - (self.content_end - self.content_at)
+        xref_at = len(self.head) + len(obj) + len(self.tail)
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % (len(self.offsets) + 1)]
+        xref += [b"%010d 00000 n \n" % (o + delta if o > self.content_at else o) for o in self.offsets]
+        return b"".join([self.head, obj, self.tail] + xref + [self.trailer, b"startxref\n%d\n%%%%EOF\n" % xref_at])
+
+@lru_cache(maxsize=16)
+def get_template(trip):
+    return SlipTemplate(trip)
+
+def create_dual_pdf(school_name, class_name, student_no, student_name, teacher_name, destination, trip_date, transport, purpose):
+    trip = Trip(school_name, teacher_name, destination, trip_date, transport, purpose)
+    data = get_template(trip).document([(class_name, student_no, student_name)] * 2)
+    if data is not None:
+        return data
+    doc = SlipDocument()
+    # İki belgeyi çiz
+    doc.add_page(trip, [(class_name, student_no, student_name)] * 2)
+    return doc.output()
+
+# Toplu liste: her öğrenciye iki kopyalı bir sayfa ya da sayfa başına iki farklı öğrenci
+def create_roster_pdf(trip, students, two_per_page=False, progress=None):
+    template = get_template(trip)
+    doc = SlipDocument()
+    doc.use_chars(sorted(template.chars))
+    slips = list(students) if two_per_page else [s for s in students for _ in range(2)]
+    for i in range(0, len(slips), 2):
+        content = template.page_content(slips[i:i + 2])
+        if content is None:
+            doc.add_page(trip, slips[i:i + 2])
+        else:
+            doc.pdf.add_page()
+            doc.pdf.pages[doc.pdf.page] = content
+        if progress: progress(min(i + 2, len(slips)), len(slips))
+    return doc.output()
+
+# --- KİŞİYE ÖZEL DOSYALAR (ZIP) ---
+# Dosya adları ASCII'ye çevrilir ("Şükrü Çağlar" -> "Izin_Sukru_Caglar.pdf"); e-posta ekleri ve
+# eski ZIP araçları Türkçe karakterleri bozmasın. Aynı ada ikinci kez rastlanırsa numara eklenir.
+def safe_filename(name, used=None):
+    text = unicodedata.normalize("NFKD", to_ascii(name))
+    text = re.sub(r"[^A-Za-z0-9]+", "_", text.encode("ascii", "ignore").decode()).strip("_") or "Ogrenci"
+    filename = f"Izin_{text}.pdf"
+    if used is not None:
+        n = 1
+        while filename in used:
+            n += 1
+            filename = f"Izin_{text}_{n}.pdf"
+        used.add(filename)
+    return filename
+
+# İşçi süreçte çalışır; öğrencinin iki kopyalı belgesini döndürür
+def slip_job(trip, student):
+    return create_dual_pdf(trip.school_name, *student, trip.teacher_name, trip.destination, trip.trip_date, trip.transport, trip.purpose)
+
+# Belgeler süreç havuzunda hazırlanır ve bitiş sırasıyla doğrudan `out` akışındaki ZIP'e yazılır.
+# Havuzda aynı anda en fazla `window` iş bekler; bitmiş belgeler birikmez, bellekte yalnızca yazılmayı
+# bekleyen birkaç belge durur. executor verilmezse belgeler sırayla bu süreçte hazırlanır.
+def write_slip_zip(trip, students, out, executor=None, progress=None, window=32):
+    used = set()
+    names = [safe_filename(s[2], used) for s in students]
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        if executor is None:
+            for i, student in enumerate(students):
+                archive.writestr(names[i], slip_job(trip, student))
+                if progress: progress(i + 1, len(students))
+            return
+        pending, done, queue = {}, 0, iter(enumerate(students))
+        while True:
+            for i, student in queue:
+                pending[executor.submit(slip_job, trip, student)] = i
+                if len(pending) >= window:
+                    break
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                archive.writestr(names[pending.pop(future)], future.result())
+                done += 1
+                if progress: progress(done, len(students))
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import base64
+import datetime
+import hashlib
+import io
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+import segno
+import zxingcpp
+from PIL import Image, ImageOps
+
+DB_PATH = "izin_takip.db"
+
+# --- BELGE KODU ---
+# Her belgede "<gezi>-<öğrenci>" biçiminde kısa bir kod ve aynı metni taşıyan QR bulunur
+# ("K7Q2MD-1045"). Gezi kodu okul, yer ve tarihten türetilir; öğrenci kodu okul numarasıdır,
+# numara yoksa sınıf ve addan türetilen "X" ile başlayan bir koddur.
+CODE_RE = re.compile(r"\b([A-Z2-7]{6})-([0-9A-Z]{1,12})\b")
+
+def _short_hash(text, length=6):
+    return base64.b32encode(hashlib.sha1(text.encode("utf-8")).digest()).decode()[:length]
+
+def trip_code(trip):
+    return _short_hash(f"{trip.school_name}|{trip.destination}|{trip.trip_date}|{trip.teacher_name}")
+
+def student_code(class_name, student_no, student_name):
+    number = re.sub(r"[^0-9A-Za-z]", "", str(student_no)).upper()
+    return number[:12] if number else "X" + _short_hash(f"{class_name}|{student_name}", 5)
+
+def slip_code(trip, student):
+    return f"{trip_code(trip)}-{student_code(*student)}"
+
+def student_label(student):
+    return " ".join(str(part) for part in student if part)
+
+def duplicate_codes(students, known=None):
+    # {öğrenci kodu: [öğrenci, ...]} yalnız birden çok farklı öğrenciye denk gelen kodlar;
+    # known: daha önce kaydedilmiş {öğrenci kodu: öğrenci}
+    by_code = {}
+    for code, student in (known or {}).items():
+        by_code[code] = [student_label(student)]
+    for student in students:
+        labels = by_code.setdefault(student_code(*student), [])
+        if student_label(student) not in labels:
+            labels.append(student_label(student))
+    return {code: labels for code, labels in by_code.items() if len(labels) > 1}
+
+def parse_codes(text):
+    # Serbest metinden (elle yazılmış ya da okuyucudan gelen) tüm kodlar: [(gezi, öğrenci)]
+    return CODE_RE.findall(str(text).upper())
+
+# En uygun maske araması kodlamanın neredeyse tamamını tutar; sabit maske de standarttır ve okunur.
+# Aynı kod bir belgenin iki kopyasında da çizilir.
+QR_MASK = 2
+
+@lru_cache(maxsize=256)
+def qr_matrix(code):
+    return segno.make(code, error="m", micro=False, mask=QR_MASK).matrix
+
+@lru_cache(maxsize=256)
+def qr_runs(code):
+    # Çizim için yan yana koyu modül dizileri: (kenar modül sayısı, ((satır, sütun, uzunluk), ...))
+    matrix = qr_matrix(code)
+    runs = []
+    for r, row in enumerate(matrix):
+        c = 0
+        while c < len(row):
+            end = c
+            while end < len(row) and row[end]:
+                end += 1
+            if end > c:
+                runs.append((r, c, end - c))
+            c = end + 1
+    return len(matrix), tuple(runs)
+
+# --- FOTOĞRAFTAN OKUMA ---
+# Çevrimdışı çözülür (zxing-cpp). Bir fotoğrafta birden çok belge olabilir.
+SCAN_MAX_EDGE = 2000
+
+def decode_codes(data):
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    image.thumbnail((SCAN_MAX_EDGE, SCAN_MAX_EDGE))
+    codes = []
+    for result in zxingcpp.read_barcodes(image.convert("L")):
+        codes += parse_codes(result.text)
+    return codes
+
+# --- DÖNÜŞ TAKİBİ ---
+# Gezi listeleri ve geri gelen belgeler SQLite'ta tutulur. Kod eşleştirme birincil anahtar
+# (gezi, öğrenci) üzerinden, sınıf sayımları (gezi, sınıf) indeksi üzerinden yapılır; bin
+# öğrencilik gezide de tablo taranmaz.
+class ReturnTracker:
+    def __init__(self, path=DB_PATH):
+        # Streamlit oturumları ayrı iş parçacıklarında çalışır; tek bağlantı kilitle paylaşılır
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS trips (trip TEXT PRIMARY KEY, title TEXT, created_at TEXT)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS slips (
+                    trip TEXT, student TEXT,
+                    class_name TEXT, student_no TEXT, student_name TEXT,
+                    returned_at TEXT,
+                    PRIMARY KEY (trip, student)
+                ) WITHOUT ROWID""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_slips_class ON slips (trip, class_name, returned_at)")
+
+    def register(self, trip, students):
+        # Aynı liste yeniden yüklenirse işaretlenmiş dönüşler korunur. (gezi kodu, çakışmalar) döner:
+        # aynı öğrenci kodunu alan farklı öğrenciler (ör. iki sınıfta aynı okul numarası) dönüşte
+        # birbirinden ayrılamaz; listede ya da daha önce kaydedilmiş öğrencilerle çakışanlar bildirilir.
+        code = trip_code(trip)
+        title = f"{trip.destination} · {trip.trip_date.strftime('%d/%m/%Y')} · {trip.school_name}"
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO trips VALUES (?, ?, ?)", (code, title, datetime.datetime.now().isoformat(timespec="seconds")))
+            known = self.conn.execute("SELECT student, class_name, student_no, student_name FROM slips WHERE trip = ?", (code,)).fetchall()
+            self.conn.executemany("INSERT OR IGNORE INTO slips VALUES (?, ?, ?, ?, ?, NULL)",
+                                  [(code, student_code(*s), s[0], s[1], s[2]) for s in students])
+        return code, duplicate_codes(students, {row[0]: row[1:] for row in known})
+
+    def trips(self):
+        with self.lock:
+            return self.conn.execute("SELECT trip, title FROM trips ORDER BY created_at DESC").fetchall()
+
+    def mark_returned(self, codes):
+        # codes: [(gezi, öğrenci)]; her kod için (kod, durum, öğrenci adı). Durum: "returned", "duplicate", "unknown"
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        results = []
+        with self.lock, self.conn:
+            for trip, student in codes:
+                row = self.conn.execute("SELECT student_name, returned_at FROM slips WHERE trip = ? AND student = ?", (trip, student)).fetchone()
+                if row is None:
+                    results.append((f"{trip}-{student}", "unknown", ""))
+                elif row[1] is not None:
+                    results.append((f"{trip}-{student}", "duplicate", row[0]))
+                else:
+                    self.conn.execute("UPDATE slips SET returned_at = ? WHERE trip = ? AND student = ?", (now, trip, student))
+                    results.append((f"{trip}-{student}", "returned", row[0]))
+        return results
+
+    def class_counts(self, trip):
+        # [(sınıf, toplam, gelen)]
+        with self.lock:
+            return self.conn.execute(
+                "SELECT class_name, COUNT(*), COUNT(returned_at) FROM slips WHERE trip = ? GROUP BY class_name ORDER BY class_name",
+                (trip,)).fetchall()
+
+    def outstanding(self, trip):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT class_name, student_no, student_name FROM slips WHERE trip = ? AND returned_at IS NULL ORDER BY class_name, student_no",
+                (trip,)).fetchall()
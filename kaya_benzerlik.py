@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+from PIL import Image
+
+HASH_BITS = 64
+DEFAULT_MAX_DISTANCE = 6    # 64 bitten en fazla bu kadar farklı olan görüntü "benzer" sayılır
+
+# --- ALGISAL ÖZET (pHash) ---
+# Gri tonlu 32x32 görüntünün 2B DCT'si alınır; en düşük frekanslı 8x8 katsayının medyandan
+# büyük olup olmadığı 64 bitlik özeti verir. Küçük açı/ışık/sıkıştırma farkları birkaç bit değiştirir.
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    return np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+
+_DCT32 = _dct_matrix(32)
+
+def phash(image):
+    gray = np.asarray(image.convert("L").resize((32, 32), Image.LANCZOS), dtype=float)
+    low = (_DCT32 @ gray @ _DCT32.T)[:8, :8].ravel()
+    # DC katsayısı (ortalama parlaklık) medyanı kaydırmasın
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+# --- ÇOKLU İNDEKSLİ ÖZETLEME (multi-index hashing) ---
+# 64 bit 4 parçaya bölünür ve her parça ayrı bir sözlükte tutulur. Toplam fark r ise güvercin
+# yuvası ilkesine göre en az bir parçanın farkı r // 4'ü geçmez; bu yüzden yalnızca o kadar bit
+# çevrilmiş parça değerlerine bakmak yeterlidir. 100 bin özette arama milisaniyenin altında kalır.
+@lru_cache(maxsize=None)
+def _flip_masks(width, radius):
+    return tuple(sum(1 << b for b in combo) for r in range(radius + 1) for combo in combinations(range(width), r))
+
+class MultiIndexHash:
+    def __init__(self, chunks=4, bits=HASH_BITS):
+        self.chunks = chunks
+        self.width = bits // chunks
+        self.mask = (1 << self.width) - 1
+        self.tables = [{} for _ in range(chunks)]
+        self.hashes = []
+        self.keys = []
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def _parts(self, h):
+        return [(h >> (c * self.width)) & self.mask for c in range(self.chunks)]
+
+    def add(self, h, key):
+        idx = len(self.hashes)
+        self.hashes.append(h)
+        self.keys.append(key)
+        for table, part in zip(self.tables, self._parts(h)):
+            table.setdefault(part, []).append(idx)
+
+    def search(self, h, radius):
+        # En yakın kaydı (anahtar, uzaklık) olarak döndürür; eşik içinde kayıt yoksa None
+        candidates = set()
+        masks = _flip_masks(self.width, radius // self.chunks)
+        for table, part in zip(self.tables, self._parts(h)):
+            for m in masks:
+                ids = table.get(part ^ m)
+                if ids:
+                    candidates.update(ids)
+        best = None
+        for idx in candidates:
+            d = hamming(h, self.hashes[idx])
+            if d <= radius and (best is None or d < best[1]):
+                best = (self.keys[idx], d)
+        return best
+
+# --- KALICI BENZERLİK İNDEKSİ ---
+# Özetler analiz önbelleğinin anahtarıyla birlikte SQLite'ta saklanır, açılışta belleğe yüklenir.
+# Metnin kendisi yanıt önbelleğinde durur; orada süresi dolmuşsa eşleşme kullanılmaz. Farklı istem
+# sürümlerinin analizleri birbirine karışmasın diye her kayıt sürümüyle saklanır.
+def _to_signed(h):
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+class SimilarityIndex:
+    def __init__(self, path, version=""):
+        self.version = version
+        self.lock = threading.Lock()
+        self.index = MultiIndexHash()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS image_hashes (phash INTEGER, key TEXT PRIMARY KEY, version TEXT, created REAL)")
+            for h, key in self.conn.execute("SELECT phash, key FROM image_hashes WHERE version = ?", (version,)):
+                self.index.add(h & ((1 << 64) - 1), key)
+
+    def __len__(self):
+        return len(self.index)
+
+    def add(self, h, key):
+        with self.lock, self.conn:
+            if self.conn.execute("INSERT OR IGNORE INTO image_hashes VALUES (?, ?, ?, ?)", (_to_signed(h), key, self.version, time.time())).rowcount:
+                self.index.add(h, key)
+
+    def find(self, h, max_distance=DEFAULT_MAX_DISTANCE):
+        with self.lock:
+            return self.index.search(h, max_distance)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import io
+import time
+from PIL import Image, ImageOps
+
+# --- GÖRÜNTÜ ÖN İŞLEME AYARLARI ---
+MAX_EDGE = 1600             # Uzun kenar (piksel); model için fazlası gereksiz
+JPEG_QUALITY = 85
+MIN_JPEG_QUALITY = 50
+BYTE_BUDGET = 500 * 1024    # Yüklenecek görüntü için hedef üst sınır
+
+# --- YÜKLEME ÖNCESİ KÜÇÜLTME VE YENİDEN SIKIŞTIRMA ---
+# Telefon fotoğrafları (12+ MP) modele gönderilmeden önce küçültülür. JPEG'lerde draft modu
+# ile görüntü doğrudan 1/2, 1/4 veya 1/8 ölçekte çözülür; tam çözünürlüklü bitmap hiç oluşmaz.
+# Yeniden kodlamada EXIF (GPS dahil) yazılmaz; yön bilgisi önceden piksellere uygulanır.
+def prepare_image(data, max_edge=MAX_EDGE, quality=JPEG_QUALITY, max_bytes=BYTE_BUDGET):
+    start = time.perf_counter()
+    img = Image.open(io.BytesIO(data))
+    original_size = img.size
+    if img.format == "JPEG":
+        # draft, her iki kenarı da istenen boyuttan küçük düşmeyen en küçük ölçeği seçer; kare
+        # (max_edge, max_edge) istenirse 4:3 fotoğrafın kısa kenarı engel olur ve ölçek hiç düşmez
+        scale = max_edge / max(original_size)
+        if scale < 1:
+            img.draft("RGB", (int(original_size[0] * scale), int(original_size[1] * scale)))
+    img = ImageOps.exif_transpose(img).convert("RGB")
+    img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+    # Bütçe aşılırsa kalite kademeli düşürülür; MIN_JPEG_QUALITY'nin altına inilmez
+    while True:
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=quality, optimize=True)
+        if buf.tell() <= max_bytes or quality <= MIN_JPEG_QUALITY:
+            break
+        quality = max(quality - 10, MIN_JPEG_QUALITY)
+
+    out = buf.getvalue()
+    stats = {
+        "original_bytes": len(data), "bytes": len(out),
+        "original_size": original_size, "size": img.size,
+        "quality": quality, "ms": (time.perf_counter() - start) * 1000
+    }
+    return out, stats
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import datetime
+from kaya_goruntu import prepare_image
+from pdf_ortak import new_document, pdf_bytes, pdf_text
+
+# --- KATALOG AYARLARI ---
+THUMB_EDGE = 480            # Küçük resim uzun kenarı (piksel); 80 mm genişlikte ~150 dpi
+THUMB_QUALITY = 70
+THUMB_BUDGET = 40 * 1024    # Küçük resim başına bayt üst sınırı
+THUMB_W, THUMB_MAX_H = 80, 80
+INDEX_ROWS_PER_PAGE = 38
+
+def clean_analysis(text, font_name):
+    # Markdown işaretleri atılır; Arial'de Türkçe harfler ASCII'ye çevrilir
+    return pdf_text(text.replace("**", "").replace("*", "-"), font_name)
+
+# --- KÜÇÜK RESİM ---
+# JPEG baytları PDF'e yeniden kodlanmadan (DCTDecode) yazılır; FPDF'in dosyadan okuma
+# yolu atlanır. Bu yüzden katalog boyutu kabaca küçük resimlerin toplamı kadardır.
+def thumbnail_info(data):
+    jpeg, stats = prepare_image(data, max_edge=THUMB_EDGE, quality=THUMB_QUALITY, max_bytes=THUMB_BUDGET)
+    w, h = stats["size"]
+    return {'w': w, 'h': h, 'cs': 'DeviceRGB', 'bpc': 8, 'f': 'DCTDecode', 'data': jpeg}
+
+def place_thumbnail(pdf, name, info, x, y):
+    pdf.images[name] = dict(info, i=len(pdf.images) + 1)
+    h = min(THUMB_W * info['h'] / info['w'], THUMB_MAX_H)
+    w = h * info['w'] / info['h']
+    pdf.image(name, x=x, y=y, w=w, h=h)
+    return h
+
+def specimen_title(text):
+    # "1. **Kayaç/Mineral Adı:** Granit" satırından tahmini ad; bulunamazsa boş
+    for line in text.splitlines():
+        if "Adı" in line or "Adi" in line:
+            return line.split(":", 1)[-1].replace("*", "").strip()
+    return ""
+
+# --- SERGİ KATALOĞU ---
+# Dizin sayfaları başta ayrılır, numuneler yazıldıktan sonra sayfa numaraları ve bağlantılarla
+# doldurulur (FPDF sonradan araya sayfa eklemeye izin vermez). Geri dönmek için pdf.page değiştirilir;
+# bu FPDF 1.7.2'nin iç yapısına dayanır: sayfa akışları pdf.pages sözlüğünde (sayfa no -> metin) tutulur,
+# yazılan her komut ve bağlantı pdf.page'in akışına eklenir. Bu yapı bulunmazsa dizin katalogun sonuna
+# normal sayfalar olarak eklenir.
+def can_revisit_pages(pdf):
+    return (isinstance(getattr(pdf, "pages", None), dict) and isinstance(getattr(pdf, "page_links", None), dict)
+            and isinstance(getattr(pdf, "page", None), int))
+
+def draw_index_page(pdf, font_name, title, count, rows):
+    pdf.set_xy(10, 10)
+    pdf.set_font(font_name, '', 16)
+    pdf.cell(0, 10, txt=title, ln=True, align='C')
+    pdf.set_font(font_name, '', 9)
+    pdf.cell(0, 6, txt=f"Tarih: {datetime.date.today().strftime('%d/%m/%Y')} | Numune sayisi: {count}", ln=True, align='C')
+    pdf.ln(3)
+    pdf.set_fill_color(240, 240, 240)
+    pdf.cell(12, 6, "No", 1, 0, 'C', 1)
+    pdf.cell(85, 6, "Numune", 1, 0, 'C', 1)
+    pdf.cell(75, 6, "Tahmin", 1, 0, 'C', 1)
+    pdf.cell(18, 6, "Sayfa", 1, 1, 'C', 1)
+    for n, name, guess, page, link in rows:
+        pdf.cell(12, 6, str(n), 1, 0, 'C', link=link)
+        pdf.cell(85, 6, name[:55], 1, 0, link=link)
+        pdf.cell(75, 6, guess[:48], 1, 0, link=link)
+        pdf.cell(18, 6, str(page), 1, 1, 'C', link=link)
+
+# entries: {"name", "text", "image"} sözlükleri (toplu analiz sonuçları)
+def create_catalog_pdf(entries, title="KAYAC SERGISI KATALOGU"):
+    pdf, font_name = new_document()
+    pdf.set_auto_page_break(True, margin=20)
+    title = pdf_text(title, font_name)
+
+    index_pages = max(1, -(-len(entries) // INDEX_ROWS_PER_PAGE))
+    index_first = can_revisit_pages(pdf)
+    if index_first:
+        for _ in range(index_pages):
+            pdf.add_page()
+
+    rows = []
+    for n, entry in enumerate(entries, start=1):
+        pdf.add_page()
+        link = pdf.add_link()
+        pdf.set_link(link)
+        text = clean_analysis(entry["text"], font_name)
+        name = clean_analysis(entry["name"], font_name)
+        rows.append((n, name, specimen_title(text), pdf.page_no(), link))
+
+        pdf.set_font(font_name, '', 14)
+        pdf.cell(0, 10, txt=f"{n}. {name}", ln=True)
+        pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+        top = pdf.get_y() + 4
+        h = place_thumbnail(pdf, f"numune_{n}", thumbnail_info(entry["image"]), 10, top) if entry.get("image") else 0
+        pdf.set_y(top + h + 4)
+        pdf.set_font(font_name, '', 10)
+        pdf.multi_cell(0, 5, txt=text)
+
+    # Dizin: ayrılan ilk sayfalara geri dönülür (ya da sona eklenir)
+    pdf.set_auto_page_break(False)
+    last_page = pdf.page
+    for p in range(index_pages):
+        if index_first:
+            pdf.page = p + 1
+            pdf.font_family = ''    # Yazı tipi komutu bu sayfanın akışına yeniden yazılsın
+        else:
+            pdf.add_page()
+        draw_index_page(pdf, font_name, title, len(entries), rows[p * INDEX_ROWS_PER_PAGE:(p + 1) * INDEX_ROWS_PER_PAGE])
+    if index_first:
+        pdf.page = last_page
+    return pdf_bytes(pdf)
@@ -1,9 +1,17 @@
 import streamlit as st
-import google.generativeai as genai
-from PIL import Image
-from fpdf import FPDF
-import os
+from PIL import Image, ImageOps
+import pandas as pd
+import io
+import time
 import datetime
+import hashlib
+from onbellek import ResponseCache
+from kaya_goruntu import prepare_image, MAX_EDGE, JPEG_QUALITY
+from kaya_benzerlik import phash, SimilarityIndex, DEFAULT_MAX_DISTANCE
+from model_istemci import ModelClient, ModelUnavailableError, format_stats
+from kaya_katalog import thumbnail_info, place_thumbnail, clean_analysis, create_catalog_pdf
+from pdf_ortak import new_document, pdf_bytes
+from kaya_toplu import iter_images, BatchRunner, DEFAULT_CONCURRENCY, DEFAULT_REQUESTS_PER_MINUTE
 
 # --- SAYFA AYARLARI (Emoji kaldırıldı) ---
 st.set_page_config(page_title="Akademik Kayaç Analisti", layout="centered")
@@ -16,15 +24,8 @@ except:
     st.stop()
 
 # --- PDF OLUŞTURMA FONKSİYONU ---
-def create_rock_pdf(rock_data, image_file):
-    pdf = FPDF()
-    
-    font_path = "tr_font.ttf"
-    if os.path.exists(font_path):
-        pdf.add_font('TrFont', '', font_path, uni=True)
-        font_name = 'TrFont'
-    else:
-        font_name = 'Arial'
+def create_rock_pdf(rock_data, image_bytes=None):
+    pdf, font_name = new_document()
 
     pdf.add_page()
     
@@ -40,38 +41,28 @@ def create_rock_pdf(rock_data, image_file):
     pdf.line(10, 30, 200, 30)
     pdf.ln(10)
     
+    # Numune fotoğrafı (küçültülmüş JPEG)
+    if image_bytes:
+        h = place_thumbnail(pdf, "numune", thumbnail_info(image_bytes), 10, 35)
+        pdf.set_y(35 + h + 5)
+    
     # Analiz Metni
     pdf.set_font(font_name, '', 11)
-    clean_text = rock_data.replace("**", "").replace("*", "-")
-    
-    if font_name == 'Arial':
-        tr_map = {"ı": "i", "İ": "I", "ğ": "g", "Ğ": "G", "ü": "u", "Ü": "U", "ş": "s", "Ş": "S", "ö": "o", "Ö": "O", "ç": "c", "Ç": "C"}
-        for tr, en in tr_map.items():
-            clean_text = clean_text.replace(tr, en)
-
-    pdf.multi_cell(0, 7, txt=clean_text)
+    pdf.multi_cell(0, 7, txt=clean_analysis(rock_data, font_name))
     
     # Alt Bilgi
     pdf.set_y(-30)
     pdf.set_font(font_name, '', 8)
     
     footer_text = "Bu rapor Ars. Gor. Yusuf Mert Ustun projesi kapsaminda yapay zeka ile uretilmistir."
-    if font_name == 'Arial': 
-         footer_text = footer_text.replace("ş", "s").replace("Ü", "U").replace("ü", "u")
-
     pdf.cell(0, 10, txt=footer_text, align='C')
     
-    try:
-        return pdf.output(dest='S').encode('latin-1', 'ignore') 
-    except UnicodeEncodeError:
-        return pdf.output(dest='S').encode('latin-1', 'replace')
+    return pdf_bytes(pdf)
 
 # --- YAPAY ZEKA ANALİZ FONKSİYONU ---
-def analyze_image(image, key):
-    genai.configure(api_key=key)
-    model = genai.GenerativeModel('gemini-flash-latest')
-    
-    prompt = """
+# İstem metni değiştiğinde PROMPT_VERSION artırılmalı; eski önbellek kayıtları kendiliğinden devre dışı kalır.
+PROMPT_VERSION = "1"
+PROMPT = """
     Sen uzman bir Jeolog ve Akademik Coğrafyacısın. Bu kayaç/mineral fotoğrafını analiz et.
     Cevabı şu başlıklarla, Türkçe ve akademik bir dille ver:
     
@@ -84,12 +75,104 @@ def analyze_image(image, key):
     
     Eğer bu bir taş değilse, bilimsel bir dille görselin analiz edilemediğini belirt.
     """
-    with st.spinner('Numune inceleniyor... Kristal yapı taranıyor...'):
-        try:
-            response = model.generate_content([prompt, image])
-            return response.text
-        except Exception as e:
-            return f"Hata oluştu: {e}"
+
+# --- ANALİZ ÖNBELLEĞİ (süreç başına bir kez, diskte kalıcı) ---
+@st.cache_resource
+def get_analysis_cache():
+    return ResponseCache("kaya_analizleri.db", memory_size=256, ttl_seconds=90 * 24 * 3600, max_entries=5000)
+
+# Farklı açıdan çekilmiş aynı numune için algısal özet indeksi; yalnızca güncel istem sürümünün kayıtları yüklenir.
+@st.cache_resource
+def get_similarity_index():
+    return SimilarityIndex("kaya_analizleri.db", PROMPT_VERSION)
+
+def find_similar(cache, index, image, max_distance):
+    h = phash(image)
+    match = index.find(h, max_distance)
+    text = cache.get(match[0]) if match else None
+    return h, (text, match[1]) if text is not None else None
+
+# Anahtar, dosya baytları yerine çözülmüş piksellerden üretilir: aynı fotoğrafın farklı
+# EXIF/sıkıştırma ile tekrar yüklenmesi de aynı kayda düşer.
+def image_cache_key(image):
+    normalized = ImageOps.exif_transpose(image).convert("RGB")
+    digest = hashlib.sha256(f"{PROMPT_VERSION}|{normalized.size}".encode())
+    digest.update(normalized.tobytes())
+    return digest.hexdigest()
+
+# --- YÜKLEME ÖNCESİ HAZIRLIK ---
+# Küçültülmüş JPEG, dosya ve ayarlar değişmedikçe yeniden üretilmez (her düğme tıklaması betiği baştan çalıştırır).
+@st.cache_data(max_entries=32, show_spinner=False)
+def prepare_upload(data, max_edge, quality):
+    return prepare_image(data, max_edge=max_edge, quality=quality)
+
+# --- MODEL İSTEMCİSİ (süreç başına bir kez, tüm oturumlarca paylaşılır) ---
+@st.cache_resource
+def get_model_client(key):
+    return ModelClient(key)
+
+def image_part(image_bytes):
+    # PIL nesnesi verilirse SDK onu kayıpsız WebP olarak yeniden kodlar; hazırlanan JPEG baytları doğrudan gönderilir
+    return {"mime_type": "image/jpeg", "data": image_bytes}
+
+# --- TOPLU ANALİZ ---
+# İstemci dışarıdan verilebilir (ör. sahte istemciyle test); varsayılan ortak Gemini istemcisidir.
+# Yeniden denemeyi hız sınırına uyan BatchRunner yaptığı için istemcinin kendi denemeleri kapatılır.
+def gemini_client(key):
+    client = get_model_client(key)
+    def call(image_bytes):
+        return client.generate([PROMPT, image_part(image_bytes)], retries=0).text
+    return call
+
+# İş parçacığında çalışır: Streamlit çağrısı yapılmaz, önbellek nesnesi dışarıdan verilir.
+def analyze_specimen(name, data, call, cache, index, max_edge, quality, max_distance):
+    image_bytes, _ = prepare_image(data, max_edge=max_edge, quality=quality)
+    image = Image.open(io.BytesIO(image_bytes))
+    cache_key = image_cache_key(image)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached, image_bytes, True
+    h, similar = find_similar(cache, index, image, max_distance)
+    if similar is not None:
+        return similar[0], image_bytes, True
+    text = call(image_bytes)
+    cache.put(cache_key, text)
+    index.add(h, cache_key)
+    return text, image_bytes, False
+
+# Yanıt geldikçe sayfaya yazılır; (tam metin, süre ölçümleri) döner. Önbellekten gelen sonuçta ölçüm
+# yoktur; hata durumunda mesaj gösterilir ve metin yerine None döner.
+def analyze_image(image, image_bytes, key, max_distance=DEFAULT_MAX_DISTANCE):
+    cache = get_analysis_cache()
+    cache_key = image_cache_key(image)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        st.caption("⚡ Bu numune daha önce analiz edilmiş; sonuç önbellekten getirildi.")
+        return cached, None
+    index = get_similarity_index()
+    h, similar = find_similar(cache, index, image, max_distance)
+    if similar is not None:
+        st.caption(f"⚡ Daha önce analiz edilen benzer bir numuneye çok yakın (özet farkı: {similar[1]} bit); önceki analiz gösteriliyor.")
+        return similar[0], None
+
+    live = st.empty()
+    try:
+        # Döner simge yalnızca ilk parça gelene kadar görünür; sonrası akarak yazılır
+        with st.spinner('Numune inceleniyor... Kristal yapı taranıyor...'):
+            stream = get_model_client(key).stream([PROMPT, image_part(image_bytes)])
+        live.write_stream(stream)
+        live.empty()
+        if stream.text:
+            cache.put(cache_key, stream.text)
+            index.add(h, cache_key)
+        return stream.text, stream.timings()
+    except ModelUnavailableError as e:
+        live.empty()
+        st.error(str(e))
+    except Exception as e:
+        live.empty()
+        st.error(f"Hata oluştu: {e}")
+    return None, None
 
 # --- ARAYÜZ TASARIMI ---
 # Logonun olduğu yerde emoji yoktu, ikon resim olarak duruyor.
@@ -121,27 +204,96 @@ st.warning("⚠️ **Yasal Uyarı (KVKK):** Lütfen sisteme yüklediğiniz foto
 
 uploaded_file = st.file_uploader("📸 Fotoğraf Seç / Yükle (Sadece Kayaç)", type=["jpg", "jpeg", "png"])
 
+with st.expander("⚙️ Görüntü Ayarları"):
+    max_edge = st.select_slider("En uzun kenar (piksel)", options=[800, 1024, 1280, 1600, 2048, 3072], value=MAX_EDGE,
+                                help="Fotoğraf gönderilmeden önce bu boyuta küçültülür; konum (GPS) dahil EXIF bilgileri silinir.")
+    quality = st.slider("JPEG kalitesi", 50, 95, JPEG_QUALITY, step=5)
+    max_distance = st.slider("Benzer numune eşiği (bit)", 0, 7, DEFAULT_MAX_DISTANCE,
+                             help="Algısal özeti daha önce analiz edilmiş bir fotoğraftan en fazla bu kadar farklı olan yüklemelerde model çağrılmaz, önceki analiz kullanılır.")
+
 if uploaded_file is not None:
-    image = Image.open(uploaded_file)
+    image_bytes, prep = prepare_upload(uploaded_file.getvalue(), max_edge, quality)
+    image = Image.open(io.BytesIO(image_bytes))
     st.image(image, caption='İncelenecek Numune', width=300)
+    saved = 100 * (1 - prep["bytes"] / prep["original_bytes"])
+    st.caption(f"Gönderilecek görüntü: {prep['original_size'][0]}×{prep['original_size'][1]} → {prep['size'][0]}×{prep['size'][1]} px, "
+               f"{prep['original_bytes'] / 1024:.0f} KB → {prep['bytes'] / 1024:.0f} KB (%{saved:.0f} tasarruf, {prep['ms']:.0f} ms)")
     
     if st.button("🔍 DETAYLI ANALİZ BAŞLAT", type="primary"):
-        result_text = analyze_image(image, api_key)
-        
         st.markdown("### Jeolojik Analiz Raporu")
-        st.markdown(f"""
-        <div style='background-color: #ffffff; padding: 20px; border-radius: 10px; border: 1px solid #e0e0e0; color: #333333;'>
-            {result_text}
-        </div>
-        """, unsafe_allow_html=True)
+        result_text, timings = analyze_image(image, image_bytes, api_key, max_distance)
         
-        st.markdown("---")
-        st.success("✅ Rapor oluşturuldu. Çıktı alabilirsiniz.")
+        if result_text is not None:
+            st.markdown(f"""
+            <div style='background-color: #ffffff; padding: 20px; border-radius: 10px; border: 1px solid #e0e0e0; color: #333333;'>
+                {result_text}
+            </div>
+            """, unsafe_allow_html=True)
+
+            if timings:
+                with st.expander("🛠️ Yanıt Süreleri (debug)"):
+                    c1, c2, c3 = st.columns(3)
+                    c1.metric("İlk parça (TTFT)", f"{timings['ttft_ms'] / 1000:.2f} sn" if timings["ttft_ms"] is not None else "-")
+                    c2.metric("Toplam süre", f"{timings['total_ms'] / 1000:.2f} sn")
+                    c3.metric("Parça / karakter", f"{timings['chunks']} / {timings['chars']}")
+                    st.caption(format_stats(get_model_client(api_key).stats()))
+        
+            st.markdown("---")
+            st.success("✅ Rapor oluşturuldu. Çıktı alabilirsiniz.")
         
-        pdf_bytes = create_rock_pdf(result_text, image)
-        st.download_button(
-            label="📄 PDF Gözlem Fişini İndir",
-            data=pdf_bytes,
-            file_name="Kayac_Gozlem_Fisi.pdf",
-            mime="application/pdf"
-        )
+            pdf_bytes = create_rock_pdf(result_text, image_bytes)
+            st.download_button(
+                label="📄 PDF Gözlem Fişini İndir",
+                data=pdf_bytes,
+                file_name="Kayac_Gozlem_Fisi.pdf",
+                mime="application/pdf"
+            )
+
+# --- TOPLU ANALİZ (SERGİ) ---
+st.markdown("---")
+with st.expander("📦 Toplu Analiz (Sergi / ZIP)"):
+    st.caption("Birden çok fotoğraf ya da fotoğrafları içeren bir ZIP dosyası yükleyin. Numuneler eşzamanlı analiz edilir; sonuçlar tamamlandıkça listelenir.")
+    batch_files = st.file_uploader("Fotoğraflar veya ZIP", type=["jpg", "jpeg", "png", "zip"], accept_multiple_files=True, key="batch_files")
+    col_c, col_r = st.columns(2)
+    concurrency = col_c.slider("Eşzamanlı istek", 1, 8, DEFAULT_CONCURRENCY)
+    per_minute = col_r.number_input("Dakikada en fazla istek", 1, 600, DEFAULT_REQUESTS_PER_MINUTE,
+                                    help="Model kotasına göre ayarlayın; kota aşılırsa istek bekleyip yeniden denenir.")
+
+    if batch_files and st.button("🔍 TOPLU ANALİZİ BAŞLAT"):
+        items = list(iter_images(batch_files))
+        if not items:
+            st.warning("Yüklenen dosyalarda analiz edilebilecek görüntü bulunamadı.")
+        else:
+            runner = BatchRunner(gemini_client(api_key), concurrency=concurrency, requests_per_minute=per_minute)
+            cache, index = get_analysis_cache(), get_similarity_index()
+            job = lambda name, data, call: analyze_specimen(name, data, call, cache, index, max_edge, quality, max_distance)
+            progress = st.progress(0.0, text=f"0/{len(items)} numune")
+            results = []
+            start = time.perf_counter()
+            for done, (name, result, error) in enumerate(runner.run(items, job), start=1):
+                progress.progress(done / len(items), text=f"{done}/{len(items)} numune")
+                if error is not None:
+                    st.error(f"**{name}:** Hata oluştu: {error}")
+                    continue
+                text, image_bytes, from_cache = result
+                results.append({"name": name, "text": text, "image": image_bytes})
+                with st.container(border=True):
+                    col_img, col_txt = st.columns([1, 3])
+                    col_img.image(image_bytes, caption=name + (" ⚡" if from_cache else ""))
+                    col_txt.markdown(text)
+            st.session_state.batch_results = results
+            st.success(f"✅ {len(results)}/{len(items)} numune {time.perf_counter() - start:.1f} sn içinde analiz edildi "
+                       f"({runner.retries} yeniden deneme).")
+
+    if st.session_state.get("batch_results"):
+        csv = pd.DataFrame([{"Numune": r["name"], "Analiz": r["text"]} for r in st.session_state.batch_results])
+        st.download_button("📥 Sonuçları İndir (CSV)", csv.to_csv(index=False).encode("utf-8-sig"),
+                           file_name="Kayac_Toplu_Analiz.csv", mime="text/csv")
+
+        # Tüm numuneler tek PDF'te: dizin sayfası + her numune için küçük resim ve analiz
+        if st.button("📚 Sergi Kataloğu Oluştur (PDF)"):
+            start = time.perf_counter()
+            with st.spinner("Katalog hazırlanıyor..."):
+                catalog = create_catalog_pdf(st.session_state.batch_results)
+            st.caption(f"{len(st.session_state.batch_results)} numune, {len(catalog) / 1024:.0f} KB, {time.perf_counter() - start:.1f} sn")
+            st.download_button("📄 Kataloğu İndir", catalog, file_name="Kayac_Sergi_Katalogu.pdf", mime="application/pdf")
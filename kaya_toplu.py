@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import io
+import random
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from model_istemci import is_retryable
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 15    # Ücretsiz Gemini kotası
+MAX_RETRIES = 4
+BASE_DELAY = 2.0                    # Saniye; her denemede iki katına çıkar
+MAX_DELAY = 60.0
+
+# --- DOSYA TOPLAMA ---
+# Yüklenen dosyalar ve ZIP arşivlerinin içindeki görüntüler (ad, bayt) çiftlerine açılır. Ad, sonuç
+# listesinde, katalogda ve CSV'de numunenin kimliğidir; farklı klasörlerden ya da arşivlerden gelen
+# aynı adlı dosyalar (ör. iki IMG_0001.jpg) uzantıdan önce sıra numarası alır: IMG_0001_2.jpg.
+def unique_name(name, used):
+    stem, dot, ext = name.rpartition(".")
+    if not dot:
+        stem, ext = name, ""
+    candidate, n = name, 1
+    while candidate.lower() in used:
+        n += 1
+        candidate = f"{stem}_{n}{dot}{ext}"
+    used.add(candidate.lower())
+    return candidate
+
+def iter_images(uploaded_files):
+    used = set()
+    for f in uploaded_files:
+        name = getattr(f, "name", str(f))
+        data = f.getvalue() if hasattr(f, "getvalue") else open(f, "rb").read()
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for info in archive.infolist():
+                    base = info.filename.rsplit("/", 1)[-1]
+                    # macOS arşivlerindeki __MACOSX/._dosya kopyaları atlanır
+                    if info.is_dir() or base.startswith(".") or "__MACOSX" in info.filename:
+                        continue
+                    if base.lower().endswith(IMAGE_EXTENSIONS):
+                        yield unique_name(base, used), archive.read(info)
+        elif name.lower().endswith(IMAGE_EXTENSIONS):
+            yield unique_name(name, used), data
+
+# --- HIZ SINIRLAYICI (TOKEN BUCKET) ---
+# Kova saniyede `rate` jeton dolar, en fazla `capacity` jeton tutar; her istek bir jeton harcar.
+class TokenBucket:
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+# --- TOPLU ÇALIŞTIRICI ---
+# client(payload) -> metin biçiminde herhangi bir çağrılabilir nesne olabilir (Gemini, test için sahte
+# istemci vb.). İşler iş parçacığı havuzunda çalışır; sonuçlar tamamlanma sırasıyla döner. Kota ve
+# geçici hatalar burada (hız sınırına uyarak) yeniden denenir; açık devre hatası hemen iletilir.
+class BatchRunner:
+    def __init__(self, client, concurrency=DEFAULT_CONCURRENCY, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 max_retries=MAX_RETRIES, base_delay=BASE_DELAY, sleep=time.sleep):
+        self.client = client
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(requests_per_minute / 60.0, capacity=max(1, concurrency), sleep=sleep)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.sleep = sleep
+        self.retries = 0
+        self.lock = threading.Lock()
+
+    def call(self, payload):
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return self.client(payload)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                with self.lock:
+                    self.retries += 1
+                # Üstel bekleme + rastgele sapma: eşzamanlı işler aynı anda tekrar denemesin
+                delay = min(MAX_DELAY, self.base_delay * 2 ** attempt)
+                self.sleep(delay * random.uniform(0.5, 1.0))
+
+    def run(self, items, job):
+        # job(name, data, call) -> sonuç; call, hız sınırı ve yeniden deneme uygulanmış istemcidir.
+        # (ad, sonuç, hata) üçlüleri iş bittikçe üretilir.
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            futures = {pool.submit(job, name, data, self.call): name for name, data in items}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+        finally:
+            # Oturum yarıda kesilirse bekleyen işler iptal edilir
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import bisect
+import json
+import re
+from functools import lru_cache
+
+# --- KAZANIM KÜTÜPHANESİ ---
+# Kazanımlar kazanimlar.json dosyasından süreç başına bir kez okunur ve ters indekse
+# (kelime -> kazanım numaraları) dönüştürülür. Arama internet ya da yapay zeka gerektirmez.
+LIBRARY_PATH = "kazanimlar.json"
+SUPPORTED_LIBRARY_VERSIONS = (1,)
+
+# Türkçe katlama: büyük/küçük harf ve şapkasız yazım farkları aynı kelimeye düşer
+# ("TÜRKİYE", "türkiye", "turkiye" -> "turkiye").
+FOLD_MAP = str.maketrans({"ı": "i", "ğ": "g", "ü": "u", "ş": "s", "ö": "o", "ç": "c", "â": "a", "î": "i", "û": "u"})
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+CODE_RE = re.compile(r"^(?:[a-z]+\.)?\d+(?:\.\d+)*\.?$")
+LEADING_CODE_RE = re.compile(r"^\s*((?:[a-z]+\.)?\d+(?:\.\d+)+)")
+
+# Resmi programdan aynen alınmamış (official: false) kazanımların seçildiğinde forma yazılan etiketi
+UNOFFICIAL_NOTE = "uyarlama, resmi kazanım metni değil"
+
+def fold(text):
+    return str(text).replace("İ", "i").replace("I", "ı").lower().translate(FOLD_MAP)
+
+def tokenize(text):
+    return TOKEN_RE.findall(fold(text))
+
+def _deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+class KazanimLibrary:
+    def __init__(self, data):
+        if data.get("version") not in SUPPORTED_LIBRARY_VERSIONS:
+            raise ValueError(f"Desteklenmeyen kazanım kütüphanesi sürümü: {data.get('version')}")
+        self.version = data["version"]
+        self.outcomes = []
+        self.postings = {}
+        for idx, item in enumerate(data["outcomes"]):
+            if not item.get("code") or not item.get("text"):
+                raise ValueError(f"Kodu veya metni eksik kazanım: {item}")
+            self.outcomes.append({
+                "code": item["code"], "grade": item.get("grade"), "unit": item.get("unit", ""), "text": item["text"],
+                "official": item.get("official") is True,
+                "checklist": list(item.get("checklist", [])), "questions": list(item.get("questions", []))
+            })
+            for token in set(tokenize(item["text"]) + tokenize(item.get("unit", ""))):
+                self.postings.setdefault(token, set()).add(idx)
+        self.codes = [fold(o["code"]) for o in self.outcomes]
+        # "COĞ.12.5.3" -> "12.5.3": kod ön eki yazılmadan da aranabilsin
+        self.code_numbers = [c.split(".", 1)[1] if c[:1].isalpha() and "." in c else c for c in self.codes]
+        # Önek araması için sıralı kelime listesi; 1 harflik yazım hataları için silme komşulukları
+        self.vocabulary = sorted(self.postings)
+        self.deletions = {}
+        for word in self.vocabulary:
+            for variant in _deletions(word) | {word}:
+                self.deletions.setdefault(variant, set()).add(word)
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    def unofficial_count(self):
+        return sum(1 for o in self.outcomes if not o["official"])
+
+    def by_code(self, text):
+        # Metnin başındaki koddan kazanımı bulur ("COĞ.12.5.3. Turizm ..." ya da "12.5.3. Turizm ..." -> COĞ.12.5.3)
+        m = LEADING_CODE_RE.match(fold(text))
+        if not m:
+            return None
+        code = m.group(1)
+        if code in self.codes:
+            return self.outcomes[self.codes.index(code)]
+        if code in self.code_numbers:
+            return self.outcomes[self.code_numbers.index(code)]
+        return None
+
+    def _prefix_words(self, prefix):
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\uffff")
+        return self.vocabulary[start:end]
+
+    def _fuzzy_words(self, word):
+        # Tek harf ekleme/silme/değiştirme: iki kelimenin silme komşulukları kesişir
+        if len(word) < 4:
+            return set()
+        found = set()
+        for variant in _deletions(word) | {word}:
+            found |= self.deletions.get(variant, set())
+        return found
+
+    def _matches(self, token, is_last):
+        # {kazanım: puan}; tam eşleşme 3, önek 2, yazım hatası 1
+        scores = {}
+        def add(words, weight):
+            for w in words:
+                for idx in self.postings[w]:
+                    scores[idx] = max(scores.get(idx, 0), weight)
+        add(self._fuzzy_words(token), 1)
+        if is_last:
+            # Son kelime henüz yazılıyor olabilir
+            add(self._prefix_words(token), 2)
+        if token in self.postings:
+            add([token], 3)
+        return scores
+
+    def search(self, query, limit=10):
+        folded = fold(query).strip()
+        if not folded:
+            return []
+        # Kod ile arama ("coğ.12.5", "COĞ.12.5.3.", "12.5")
+        if CODE_RE.match(folded):
+            code = folded.rstrip(".")
+            code = code.split(".", 1)[1] if code[:1].isalpha() else code
+            return [self.outcomes[i] for i, c in enumerate(self.code_numbers) if c == code or c.startswith(code + ".")][:limit]
+
+        tokens = tokenize(query)
+        per_token = [self._matches(t, i == len(tokens) - 1) for i, t in enumerate(tokens)]
+        # Önce tüm kelimeleri içerenler; hiç yoksa en çok kelimesi eşleşenler
+        totals = {}
+        for scores in per_token:
+            for idx, s in scores.items():
+                hits, total = totals.get(idx, (0, 0))
+                totals[idx] = (hits + 1, total + s)
+        ranked = sorted(totals.items(), key=lambda kv: (-kv[1][0], -kv[1][1], self.codes[kv[0]]))
+        if ranked and ranked[0][1][0] == len(tokens):
+            ranked = [r for r in ranked if r[1][0] == len(tokens)]
+        return [self.outcomes[idx] for idx, _ in ranked[:limit]]
+
+def outcome_label(outcome):
+    # Forma yazılan metin; by_code baştaki koddan kazanımı yine bulur
+    label = f"{outcome['code']}. {outcome['text']}"
+    return label if outcome["official"] else f"{label} ({UNOFFICIAL_NOTE})"
+
+@lru_cache(maxsize=None)
+def load_library(path=LIBRARY_PATH):
+    with open(path, encoding="utf-8") as f:
+        return KazanimLibrary(json.load(f))
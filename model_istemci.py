@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+import random
+import threading
+import time
+from collections import deque
+import google.generativeai as genai
+
+DEFAULT_MODEL = "gemini-flash-latest"
+REQUEST_TIMEOUT = 60.0      # Saniye; akışta ilk parçaya kadar geçen süreyi de sınırlar
+MAX_RETRIES = 2
+BASE_DELAY = 0.5            # Saniye; tam rastgele sapmalı üstel bekleme
+FAILURE_THRESHOLD = 5       # Art arda bu kadar geçici hatada devre açılır
+RESET_SECONDS = 30.0        # Açık devre bu süre sonunda tek bir deneme isteğine izin verir
+PROBE_TIMEOUT = 120.0       # Deneme isteğinin sonucu bu sürede gelmezse istek başarısız sayılır
+
+# Kota (429), zaman aşımı ve geçici sunucu hataları yeniden denenir; diğerleri (geçersiz anahtar,
+# hatalı istek vb.) doğrudan çağırana iletilir.
+RETRYABLE_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError", "TimeoutError"}
+
+QUOTA_ERRORS = {"ResourceExhausted", "TooManyRequests"}
+
+def is_retryable(exc):
+    return type(exc).__name__ in RETRYABLE_ERRORS or getattr(exc, "code", None) in (429, 500, 503)
+
+# Kota aşımı servisin değil çağıranın sınırıdır; yeniden denenir ama devre kesicide hata sayılmaz
+def is_quota_error(exc):
+    return type(exc).__name__ in QUOTA_ERRORS or getattr(exc, "code", None) == 429
+
+class ModelUnavailableError(RuntimeError):
+    def __init__(self, retry_after):
+        super().__init__(f"Yapay zeka servisi geçici olarak devre dışı; {retry_after:.0f} sn sonra tekrar deneyin.")
+        self.retry_after = retry_after
+
+# --- AKIŞLI YANIT ---
+# generate_content(..., stream=True) yanıtını metin parçalarına çevirir; tam metni biriktirir ve
+# ilk parçanın gelme süresi (TTFT) ile toplam süreyi ölçer. `start`, istek gönderilmeden hemen
+# önce alınmış time.perf_counter() değeridir. `on_finish(hata)` akış bittiğinde, yarıda
+# bırakıldığında (hata None) ya da parçalar okunurken bağlantı koptuğunda bir kez çağrılır.
+class TimedStream:
+    def __init__(self, response, start, on_finish=None):
+        self.response = response
+        self.start = start
+        self.on_finish = on_finish
+        self.first = None
+        self.end = None
+        self.parts = []
+
+    def __iter__(self):
+        error = None
+        try:
+            for chunk in self.response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Güvenlik filtresine takılan ya da boş parçaların metni yoktur
+                    continue
+                if not text:
+                    continue
+                if self.first is None:
+                    self.first = time.perf_counter()
+                self.parts.append(text)
+                yield text
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.end = time.perf_counter()
+            if self.on_finish is not None:
+                self.on_finish(error)
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def timings(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return {
+            "ttft_ms": (self.first - self.start) * 1000 if self.first is not None else None,
+            "total_ms": (end - self.start) * 1000,
+            "chunks": len(self.parts),
+            "chars": sum(len(p) for p in self.parts)
+        }
+
+# --- DEVRE KESİCİ ---
+# Kapalı: istekler geçer. Art arda FAILURE_THRESHOLD geçici hatada açılır ve RESET_SECONDS boyunca
+# istekler servise gitmeden reddedilir. Süre dolunca tek bir deneme isteği geçer (yarı açık);
+# başarılıysa devre kapanır, değilse yeniden açılır. Deneme isteğinin sonucu PROBE_TIMEOUT içinde
+# yazılmazsa (ör. akış hiç okunmadan bırakıldı) istek başarısız sayılır; devre yarı açıkta kalmaz.
+CLOSED, OPEN, HALF_OPEN = "kapalı", "açık", "yarı açık"
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_seconds=RESET_SECONDS, probe_timeout=PROBE_TIMEOUT,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self.opens = 0
+        self.lock = threading.Lock()
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opened_at = now
+        self.opens += 1
+
+    def allow(self):
+        with self.lock:
+            now = self.clock()
+            if self.state == HALF_OPEN and now - self.probe_started >= self.probe_timeout:
+                self._open(now)
+            if self.state == OPEN and now - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                self.probe_started = now
+                return True
+            return self.state == CLOSED
+
+    def retry_after(self):
+        with self.lock:
+            if self.state == HALF_OPEN:
+                return max(0.0, self.probe_timeout - (self.clock() - self.probe_started))
+            return max(0.0, self.reset_seconds - (self.clock() - self.opened_at))
+
+    def record_success(self):
+        with self.lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open(self.clock())
+
+    def record_quota(self):
+        # Kota yanıtı servisin ayakta olduğunu gösterir: deneme isteğiyse devre kapanır; art arda
+        # hata sayacı değişmez (toplu iş ya da ön yükleme kotayı doldurunca diğer oturumlar engellenmez)
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self.failures = 0
+
+# --- ORTAK MODEL İSTEMCİSİ ---
+# Süreç başına bir kez oluşturulur (uygulamalarda st.cache_resource ile) ve tüm oturumlarca
+# paylaşılır. İsteklere zaman aşımı uygular, geçici hatalarda yeniden dener, servis çöktüğünde
+# devre kesiciyle hızlıca hata verir ve gecikme/hata/yeniden deneme sayaçlarını tutar.
+class ModelClient:
+    def __init__(self, api_key, model_name=DEFAULT_MODEL, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES,
+                 base_delay=BASE_DELAY, breaker=None, sleep=time.sleep):
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "errors": 0, "retries": 0, "rejected": 0}
+        self.latencies = deque(maxlen=500)
+
+    def _count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def _call(self, contents, stream, retries):
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise ModelUnavailableError(self.breaker.retry_after())
+            self._count("requests")
+            start = time.perf_counter()
+            try:
+                # Akışta bu çağrı ilk parça gelene kadar bekler; zaman aşımı da o ana kadar geçerlidir
+                response = self.model.generate_content(contents, stream=stream, request_options={"timeout": self.timeout})
+            except Exception as e:
+                self._count("errors")
+                if not is_retryable(e):
+                    # Servis yanıt verdi (ör. geçersiz istek); devre açısından başarı sayılır
+                    self.breaker.record_success()
+                    raise
+                if is_quota_error(e):
+                    self.breaker.record_quota()
+                else:
+                    self.breaker.record_failure()
+                if attempt == retries:
+                    raise
+                self._count("retries")
+                self.sleep(random.uniform(0, self.base_delay * 2 ** attempt))
+                continue
+            # Akışta yalnız ilk parça gelmiştir; sonuç akış okununca TimedStream üzerinden yazılır
+            if not stream:
+                self.breaker.record_success()
+            with self.lock:
+                self.latencies.append((time.perf_counter() - start) * 1000)
+            return response
+
+    def _finish_stream(self, error):
+        # Parçalar okunurken kopan bağlantı, kota ya da zaman aşımı devre açısından istek hatası
+        # gibi sayılır (akış yeniden denenmez, hata çağırana iletilir). Akış hiç okunmazsa sonuç
+        # yazılmaz; deneme isteğiyse devre PROBE_TIMEOUT sonunda yeniden açılır.
+        if error is not None:
+            self._count("errors")
+        if error is not None and is_quota_error(error):
+            self.breaker.record_quota()
+        elif error is not None and is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def generate(self, contents, retries=None):
+        return self._call(contents, False, retries)
+
+    def stream(self, contents, retries=None):
+        start = time.perf_counter()
+        return TimedStream(self._call(contents, True, retries), start, on_finish=self._finish_stream)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            latencies = sorted(self.latencies)
+        stats["avg_ms"] = sum(latencies) / len(latencies) if latencies else None
+        stats["p95_ms"] = latencies[int(0.95 * (len(latencies) - 1))] if latencies else None
+        stats["circuit"] = self.breaker.state
+        stats["circuit_opens"] = self.breaker.opens
+        return stats
+
+def format_stats(stats):
+    latency = f"{stats['avg_ms']:.0f} ms (p95 {stats['p95_ms']:.0f} ms)" if stats["avg_ms"] is not None else "-"
+    return (f"İstek: {stats['requests']} · Hata: {stats['errors']} · Yeniden deneme: {stats['retries']} · "
+            f"Reddedilen: {stats['rejected']} · Gecikme: {latency} · Devre: {stats['circuit']}")
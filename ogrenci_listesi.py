@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import io
+from collections import namedtuple
+import pandas as pd
+
+# --- ÖĞRENCİ LİSTESİ (veli_izin ve gozlem_formu ortak) ---
+# CSV/XLSX; başlıklar büyük/küçük harf ve Türkçe İ/ı farkı gözetilmeden eşleşir. Ad sütunu bulunamazsa
+# ilk sütun kullanılır; adı boş satırlar atlanır. Diğer sütunlar isteğe bağlıdır, yoksa boş metin döner.
+NAME_COLUMNS = ("ad soyad", "adı soyadı", "öğrenci", "öğrenci adı soyadı", "ad")
+NUMBER_COLUMNS = ("no", "okul no", "numara", "öğrenci no")
+CLASS_COLUMNS = ("sınıf", "şube", "sınıf/şube")
+GROUP_COLUMNS = ("grup",)
+SITE_COLUMNS = ("gözlem yeri",)
+
+RosterRow = namedtuple("RosterRow", "class_name number name group site")
+
+def column_key(name):
+    return str(name).replace("İ", "i").replace("I", "ı").strip().lower()
+
+def cell_text(value):
+    if pd.isna(value): return ""
+    # Excel sayıları 123.0 olarak okur
+    if isinstance(value, float) and value.is_integer(): value = int(value)
+    return str(value).strip()
+
+def read_roster(uploaded_file):
+    name = getattr(uploaded_file, "name", str(uploaded_file)).lower()
+    if name.endswith((".xlsx", ".xls")):
+        df = pd.read_excel(uploaded_file)
+    else:
+        df = pd.read_csv(io.BytesIO(uploaded_file.getvalue()), sep=None, engine="python", encoding="utf-8-sig")
+    columns = {column_key(c): c for c in df.columns}
+    def find(keys):
+        return next((columns[k] for k in keys if k in columns), None)
+    name_col = find(NAME_COLUMNS)
+    name_col = df.columns[0] if name_col is None else name_col
+    optional = [find(keys) for keys in (CLASS_COLUMNS, NUMBER_COLUMNS, GROUP_COLUMNS, SITE_COLUMNS)]
+
+    rows = []
+    for _, row in df.iterrows():
+        student = cell_text(row[name_col])
+        if not student:
+            continue
+        class_name, number, group, site = (cell_text(row[col]) if col is not None else "" for col in optional)
+        rows.append(RosterRow(class_name, number, student, group, site))
+    return rows
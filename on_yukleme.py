@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PREFETCH_WORKERS = 4
+
+# --- ARKA PLANDA ÖN YÜKLEME ---
+# İstekler kullanıcı istemeden, iş parçacığı havuzunda başlatılır. Aynı anahtarla devam eden bir
+# iş varsa yenisi açılmaz, o işe abone olunur. Her işin sahipleri (oturumlar) tutulur; son sahibi
+# vazgeçen iş iptal edilir: sıradaysa hiç başlamaz, çalışıyorsa `cancelled()` True döner ve iş
+# kendini yarıda bırakabilir.
+class _Job:
+    def __init__(self, owner):
+        self.owners = {owner}
+        self.cancelled = threading.Event()
+        self.future = None
+
+class Prefetcher:
+    def __init__(self, workers=PREFETCH_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="on_yukleme")
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.counters = {"submitted": 0, "deduplicated": 0, "cancelled": 0}
+
+    def submit(self, key, fn, owner):
+        # fn(cancelled) -> sonuç; aynı anahtarla devam eden işin Future'ı paylaşılır
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None:
+                job.owners.add(owner)
+                self.counters["deduplicated"] += 1
+                return job.future
+            job = _Job(owner)
+            self.jobs[key] = job
+            job.future = self.executor.submit(self._run, key, job, fn)
+            self.counters["submitted"] += 1
+            return job.future
+
+    def _run(self, key, job, fn):
+        try:
+            return fn(job.cancelled.is_set)
+        finally:
+            with self.lock:
+                if self.jobs.get(key) is job:
+                    del self.jobs[key]
+
+    def release(self, owner, keep=()):
+        # Sahibin `keep` dışındaki işlerden aboneliği düşer; sahipsiz kalan işler iptal edilir
+        with self.lock:
+            for key, job in list(self.jobs.items()):
+                if key in keep or owner not in job.owners:
+                    continue
+                job.owners.discard(owner)
+                if not job.owners:
+                    job.cancelled.set()
+                    job.future.cancel()
+                    del self.jobs[key]
+                    self.counters["cancelled"] += 1
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, in_flight=len(self.jobs))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --- İKİ KATMANLI YANIT ÖNBELLEĞİ ---
+# Bellek katmanı: süreç içi LRU (en son kullanılan N kayıt).
+# Disk katmanı: SQLite; uygulama yeniden başlasa da kalır, süre aşımı (TTL) ve kayıt sınırı vardır.
+# Streamlit oturumları ayrı iş parçacıklarında çalıştığından tüm erişim tek kilitle yapılır.
+class ResponseCache:
+    def __init__(self, path, memory_size=256, ttl_seconds=30 * 24 * 3600, max_entries=5000):
+        self.memory = OrderedDict()
+        self.memory_size = memory_size
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created REAL, accessed REAL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed)")
+
+    def _remember(self, key, value, created):
+        self.memory[key] = (value, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None and now - entry[1] <= self.ttl:
+                self.memory.move_to_end(key)
+                self.hits_memory += 1
+                return entry[0]
+            self.memory.pop(key, None)
+
+            with self.conn:
+                row = self.conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                    self._remember(key, row[0], row[1])
+                    self.hits_disk += 1
+                    return row[0]
+                if row is not None:
+                    self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        now = time.time()
+        with self.lock, self.conn:
+            self._remember(key, value, now)
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, value, now, now))
+            # Süresi dolanlar ve sınırı aşan en eski kullanılmış kayıtlar silinir
+            self.conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            excess = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)", (excess,))
+
+    def stats(self):
+        with self.lock:
+            stored = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"memory_hits": self.hits_memory, "disk_hits": self.hits_disk, "misses": self.misses,
+                    "memory_entries": len(self.memory), "disk_entries": stored}
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+from functools import lru_cache
+from fpdf import FPDF
+from fpdf.ttfonts import TTFontFile
+
+# --- ORTAK PDF ÇEKİRDEĞİ ---
+# Türkçe yazı tipi (tr_font.ttf) ve harf genişlikleri süreç başına bir kez okunur; her yeni belgeye
+# hazır kayıt olarak eklenir (FPDF.add_font bunu belge başına dosyadan ya da .pkl önbelleğinden
+# yeniden okur). Yazı tipi yoksa Arial kullanılır ve metinler ASCII'ye çevrilir.
+FONT_PATH = "tr_font.ttf"
+FONT_NAME = "TrFont"
+FALLBACK_FONT = "Arial"
+
+TR_MAP = {"ı": "i", "İ": "I", "ğ": "g", "Ğ": "G", "ü": "u", "Ü": "U", "ş": "s", "Ş": "S", "ö": "o", "Ö": "O", "ç": "c", "Ç": "C"}
+PUNCTUATION_MAP = {"’": "'", "‘": "'", "“": '"', "”": '"', "–": "-", "—": "-", "…": "..."}
+# Çeviri çiftleri bir kez hazırlanır: Türkçe yazı tipinde yalnız tipografik işaretler sadeleşir,
+# Arial'de Türkçe harfler de ASCII karşılıklarına iner. str.translate CPython'da her karakter için
+# sözlük araması yaptığından Türkçe metinde zincirleme replace'ten birkaç kat yavaştır.
+UNICODE_PAIRS = tuple(PUNCTUATION_MAP.items())
+ASCII_PAIRS = UNICODE_PAIRS + tuple(TR_MAP.items())
+
+def pdf_text(text, font=FONT_NAME):
+    if text is None: return ""
+    text = str(text)
+    if text.isascii(): return text
+    if font == FONT_NAME:
+        for old, new in UNICODE_PAIRS:
+            text = text.replace(old, new)
+        return text
+    for old, new in ASCII_PAIRS:
+        text = text.replace(old, new)
+    # Arial (çekirdek yazı tipi) yalnız Latin-1 yazabilir; kalan karakterler "?" olur
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+def to_ascii(text):
+    return pdf_text(text, FALLBACK_FONT)
+
+@lru_cache(maxsize=None)
+def load_font(path=FONT_PATH):
+    # FPDF.add_font ile aynı ölçü kaydı; dosya yoksa ya da okunamazsa None
+    if not os.path.exists(path):
+        return None
+    try:
+        ttf = TTFontFile()
+        ttf.getMetrics(path)
+    except Exception:
+        return None
+    desc = {
+        'Ascent': int(round(ttf.ascent, 0)), 'Descent': int(round(ttf.descent, 0)),
+        'CapHeight': int(round(ttf.capHeight, 0)), 'Flags': ttf.flags,
+        'FontBBox': "[%s %s %s %s]" % tuple(int(round(b, 0)) for b in ttf.bbox),
+        'ItalicAngle': int(ttf.italicAngle), 'StemV': int(round(ttf.stemV, 0)),
+        'MissingWidth': int(round(ttf.defaultWidth, 0)),
+    }
+    return {'type': 'TTF', 'name': re.sub('[ ()]', '', ttf.fullName), 'desc': desc,
+            'up': round(ttf.underlinePosition), 'ut': round(ttf.underlineThickness),
+            'cw': ttf.charWidths, 'ttffile': path, 'originalsize': os.stat(path).st_size}
+
+def add_tr_font(pdf, path=FONT_PATH):
+    # Ölçüler (cw, desc) belgeler arasında paylaşılır, salt okunurdur; alt küme listesi belgeye özeldir
+    font = load_font(path)
+    if font is None:
+        return False
+    key = FONT_NAME.lower()
+    if key not in pdf.fonts:
+        pdf.fonts[key] = {
+            'i': len(pdf.fonts) + 1, 'type': 'TTF', 'name': font['name'], 'desc': font['desc'],
+            'up': font['up'], 'ut': font['ut'], 'cw': font['cw'], 'ttffile': font['ttffile'], 'fontkey': key,
+            'subset': list(range(0, 57 if hasattr(pdf, 'str_alias_nb_pages') else 32)), 'unifilename': None,
+        }
+        pdf.font_files[key] = {'length1': font['originalsize'], 'type': "TTF", 'ttffile': font['ttffile']}
+        pdf.font_files[path] = {'type': "TTF"}
+    return True
+
+def font_style(font, style):
+    # Türkçe yazı tipinin yalnız normal biçimi vardır; kalın/italik Arial'de geçerli
+    return style if font == FALLBACK_FONT else ""
+
+def new_document(pdf_class=FPDF):
+    # (belge, yazı tipi adı): Türkçe yazı tipi eklenemezse Arial
+    pdf = pdf_class()
+    return pdf, FONT_NAME if add_tr_font(pdf) else FALLBACK_FONT
+
+# FPDF 1.7 yazılan her karakteri yazı tipi alt kümesi listesine yeniden ekler ve çıktıda bu listeyi
+# karakter başına tarar; yüzlerce sayfalık belgede çıktı süresi saniyelere çıkar. Tekrarlar atılır.
+def compact_font_subsets(pdf):
+    for font in pdf.fonts.values():
+        if font.get('type') == 'TTF':
+            font['subset'] = list(dict.fromkeys(font['subset']))
+
+# FPDF 1.7 belgeyi kapatırken her satırı çıktı dizgesine "self.buffer += s" ile ekler; dizge her seferinde
+# kopyalandığından süre belge boyutuyla karesel artar (1000 sayfalık sınıf listesinde saniyeler). FPDF
+# tampon üzerinde yalnız "+=" ve len() kullanır; parçalar listede toplanıp sonda bir kez birleştirilir.
+class OutputBuffer:
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def __iadd__(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        return self
+
+    def __len__(self):
+        return self.size
+
+    def __str__(self):
+        return "".join(self.parts)
+
+def pdf_bytes(pdf):
+    compact_font_subsets(pdf)
+    if pdf.state < 3 and pdf.buffer == '':
+        pdf.buffer = OutputBuffer()
+    return str(pdf.output(dest='S')).encode('latin-1', 'ignore')
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import OrderedDict
+
+# --- ÖLÇ-SONRA-ÇİZ TABLO ---
+# Satır yüksekliği çizimden önce yazı genişliği ölçülerek hesaplanır: her hücre bir kez çizilir,
+# imleç geri taşınmaz. Satır sayfaya sığmıyorsa önce yeni sayfa açılır ve başlık satırı tekrarlanır;
+# böylece bir satırın hücreleri hiçbir zaman iki sayfaya bölünmez.
+LINE_CACHE_SIZE = 4096
+
+# Satır kaydırma önbelleği: süreç içi LRU. Streamlit oturumları ayrı iş parçacıklarında PDF
+# ürettiğinden erişim kilitle yapılır; ölçüm (multi_cell) kilit dışında, çağıranın belgesinde yapılır.
+_line_cache = OrderedDict()
+_line_cache_lock = threading.Lock()
+
+def split_lines(pdf, text, width):
+    # multi_cell(split_only=True) ile aynı kaydırma kuralları; Unicode yazı tipinde genişlik harf
+    # harf ölçüldüğü için sonuç (metin, genişlik, yazı tipi) başına saklanır.
+    key = (text, width, pdf.font_family, pdf.font_style, pdf.font_size_pt, pdf.c_margin)
+    with _line_cache_lock:
+        lines = _line_cache.get(key)
+        if lines is not None:
+            _line_cache.move_to_end(key)
+            return lines
+    lines = tuple(pdf.multi_cell(width, 1, txt=text, split_only=True) or [""])
+    with _line_cache_lock:
+        _line_cache[key] = lines
+        while len(_line_cache) > LINE_CACHE_SIZE:
+            _line_cache.popitem(last=False)
+    return lines
+
+class Table:
+    # columns: (başlık, genişlik, hizalama) üçlüleri; genişlik 0 ise satırın kalanını kaplar.
+    # Tüm başlıklar boşsa başlık satırı çizilmez. font / header_font: (aile, stil, punto);
+    # verilmezse tablo oluşturulurken geçerli yazı tipi kullanılır.
+    def __init__(self, pdf, columns, line_height=5, min_row_height=0, header_height=8, border=1,
+                 font=None, header_font=None, header_fill=(240, 240, 240)):
+        self.pdf = pdf
+        self.x = pdf.get_x()
+        used = sum(w for _, w, _ in columns)
+        rest = pdf.w - pdf.r_margin - self.x - used
+        self.columns = [(title, w or rest, align) for title, w, align in columns]
+        self.line_height = line_height
+        self.min_row_height = min_row_height
+        self.header_height = header_height
+        self.border = border
+        self.font = font or (pdf.font_family, pdf.font_style, pdf.font_size_pt)
+        self.header_font = header_font or self.font
+        self.header_fill = header_fill
+        self.has_header = any(title for title, _, _ in columns)
+
+    def header(self):
+        if not self.has_header:
+            return
+        pdf = self.pdf
+        # Başlık sayfa sonunda tek başına kalmasın: en az bir satırla birlikte sığmalı
+        self._ensure_room(self.header_height + max(self.line_height, self.min_row_height), repeat_header=False)
+        pdf.set_font(*self.header_font)
+        pdf.set_fill_color(*self.header_fill)
+        pdf.set_x(self.x)
+        for title, w, _ in self.columns:
+            pdf.cell(w, self.header_height, title, 1, 0, 'C', 1)
+        pdf.set_xy(self.x, pdf.get_y() + self.header_height)
+
+    def row_height(self, cells):
+        self.pdf.set_font(*self.font)
+        lines = [split_lines(self.pdf, str(text), w) for text, (_, w, _) in zip(cells, self.columns)]
+        return max(self.min_row_height, max(len(l) for l in lines) * self.line_height), lines
+
+    def measure(self, rows):
+        # [(yükseklik, hücre satırları)]; aynı satırlar birçok kez çizilecekse (sınıf seti) bir kez ölçülür
+        return [self.row_height(cells) for cells in rows]
+
+    def row(self, cells):
+        self.draw_row(*self.row_height(cells))
+
+    def draw_row(self, height, lines):
+        pdf = self.pdf
+        self._ensure_room(height)
+        pdf.set_font(*self.font)
+        x, y = self.x, pdf.get_y()
+        # Satır sığacağı kontrol edildi; sayfadan uzun bir satır hücre ortasında bölünmesin
+        auto_break = pdf.auto_page_break
+        pdf.auto_page_break = 0
+        for (_, w, align), cell_lines in zip(self.columns, lines):
+            if self.border:
+                pdf.rect(x, y, w, height)
+            for i, line in enumerate(cell_lines):
+                pdf.set_xy(x, y + i * self.line_height)
+                pdf.cell(w, self.line_height, line, 0, 0, align)
+            x += w
+        pdf.auto_page_break = auto_break
+        pdf.set_xy(self.x, y + height)
+
+    def rows(self, rows):
+        for cells in rows:
+            self.row(cells)
+
+    def _ensure_room(self, height, repeat_header=True):
+        pdf = self.pdf
+        if pdf.auto_page_break and pdf.get_y() + height > pdf.page_break_trigger and pdf.get_y() > pdf.t_margin:
+            pdf.add_page()
+            pdf.set_x(self.x)
+            if repeat_header:
+                self.header()
+
+def draw_table(pdf, columns, rows, measured=None, **options):
+    # measured: aynı sütun ve yazı tipiyle önceden Table.measure ile ölçülmüş satırlar (rows yok sayılır)
+    table = Table(pdf, columns, **options)
+    table.header()
+    if measured is None:
+        table.rows(rows)
+    else:
+        for height, lines in measured:
+            table.draw_row(height, lines)
+    return table
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import base64
+import io
+import math
+from functools import lru_cache
+import numpy as np
+from PIL import Image
+from saha_kayit import KM_PER_DEG_LAT
+from saha_mesafe import SCHOOL_KM_STEPS, HOSPITAL_KM_STEPS
+
+# --- AYARLAR ---
+TILE_CELLS = 128        # Her harita karosu için en fazla ızgara çözünürlüğü (128 x 128)
+MIN_CELL_KM = 0.5       # Yakın zumda hücreler bundan küçük olmaz (kenar payı sınırlı kalsın)
+IDW_RADIUS_KM = 30.0    # Bu mesafeden uzak kayıtlı sahalar enterpolasyona katılmaz
+IDW_POWER = 2
+MAX_TILES = 24          # Çok uzaklaştırılmış görünümde hesaplanacak en fazla karo
+MIN_ZOOM = 5
+
+# --- KARO HESAPLARI (XYZ / Web Mercator) ---
+def tile_bounds(z, x, y):
+    n = 2 ** z
+    lon_w = x / n * 360 - 180
+    lon_e = (x + 1) / n * 360 - 180
+    lat_n = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    lat_s = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return lat_s, lat_n, lon_w, lon_e
+
+def visible_tiles(bounds, zoom):
+    n = 2 ** zoom
+    def to_tile(lat, lon):
+        lat = max(min(lat, 85.0), -85.0)
+        x = int((lon + 180) / 360 * n)
+        y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+    x0, y0 = to_tile(bounds["_northEast"]["lat"], bounds["_southWest"]["lng"])
+    x1, y1 = to_tile(bounds["_southWest"]["lat"], bounds["_northEast"]["lng"])
+    return [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+# --- KATMANLAR ---
+# Noktalar kenar payı eklenmiş ızgaraya sayılır (binning); ters mesafe ağırlıkları ve
+# "şu yarıçapta hastane var mı" soruları birer FFT evrişimine dönüşür. Maliyet nokta
+# sayısından bağımsızdır, yalnızca ızgara boyutuna bağlıdır.
+def _fft_size(n):
+    # 2, 3 ve 5'in katı olan en küçük uzunluk; asal uzunluklarda FFT çok yavaşlar
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+def _fft_convolve(grid, kernel):
+    shape = tuple(_fft_size(g + k - 1) for g, k in zip(grid.shape, kernel.shape))
+    out = np.fft.irfft2(np.fft.rfft2(grid, shape) * np.fft.rfft2(kernel, shape), shape)
+    r0, c0 = kernel.shape[0] // 2, kernel.shape[1] // 2
+    return out[r0:r0 + grid.shape[0], c0:c0 + grid.shape[1]]
+
+def _kernel_km(pad, cell_km_y, cell_km_x):
+    dy = np.arange(-pad, pad + 1)[:, None] * cell_km_y
+    dx = np.arange(-pad, pad + 1)[None, :] * cell_km_x
+    return np.sqrt(dx * dx + dy * dy)
+
+def _bin_points(lat, lon, origin, cell_deg, shape, weights=None):
+    rows = np.floor((origin[0] - lat) / cell_deg[0]).astype(int)
+    cols = np.floor((lon - origin[1]) / cell_deg[1]).astype(int)
+    ok = (rows >= 0) & (rows < shape[0]) & (cols >= 0) & (cols < shape[1])
+    flat = np.bincount(rows[ok] * shape[1] + cols[ok], weights=None if weights is None else weights[ok], minlength=shape[0] * shape[1])
+    return flat.reshape(shape).astype(float)
+
+def _steps_to_score(dist_km, steps):
+    # saha_mesafe.score_from_steps'in dizi karşılığı
+    return np.select([dist_km <= limit for limit, _ in steps], [score for _, score in steps], default=1).astype(float)
+
+def suitability_grid(bounds, cells, sites=None, hospitals=None, school=None):
+    # bounds: (güney, kuzey, batı, doğu); sonuç (cells x cells), satırlar kuzeyden güneye.
+    # sites: [enlem, boylam, puan] satırları; hospitals: [enlem, boylam] satırları. Veri yoksa NaN.
+    lat_s, lat_n, lon_w, lon_e = bounds
+    cell_deg = ((lat_n - lat_s) / cells, (lon_e - lon_w) / cells)
+    lat0 = (lat_s + lat_n) / 2
+    cell_km_y = cell_deg[0] * KM_PER_DEG_LAT
+    cell_km_x = cell_deg[1] * KM_PER_DEG_LAT * math.cos(math.radians(lat0))
+    layers = []
+
+    reach_km = max(IDW_RADIUS_KM, HOSPITAL_KM_STEPS[-1][0])
+    pad = int(math.ceil(reach_km / min(cell_km_y, cell_km_x)))
+    shape = (cells + 2 * pad, cells + 2 * pad)
+    origin = (lat_n + pad * cell_deg[0], lon_w - pad * cell_deg[1])
+    dist = _kernel_km(pad, cell_km_y, cell_km_x)
+    inner = (slice(pad, pad + cells), slice(pad, pad + cells))
+
+    if sites is not None and len(sites):
+        kernel = np.where(dist <= IDW_RADIUS_KM, np.maximum(dist, min(cell_km_x, cell_km_y) / 2) ** -IDW_POWER, 0)
+        weight_sum = _fft_convolve(_bin_points(sites[:, 0], sites[:, 1], origin, cell_deg, shape), kernel)[inner]
+        score_sum = _fft_convolve(_bin_points(sites[:, 0], sites[:, 1], origin, cell_deg, shape, sites[:, 2]), kernel)[inner]
+        # FFT yuvarlama artığı: ağırlık eşiğinin altı "veri yok" sayılır
+        layers.append(np.where(weight_sum > 1e-9, score_sum / np.maximum(weight_sum, 1e-9), np.nan))
+
+    if school is not None:
+        rows = lat_n - (np.arange(cells) + 0.5) * cell_deg[0]
+        cols = lon_w + (np.arange(cells) + 0.5) * cell_deg[1]
+        dy = (rows[:, None] - school[0]) * KM_PER_DEG_LAT
+        dx = (cols[None, :] - school[1]) * KM_PER_DEG_LAT * math.cos(math.radians(lat0))
+        layers.append(_steps_to_score(np.sqrt(dx * dx + dy * dy), SCHOOL_KM_STEPS))
+
+    if hospitals is not None:
+        # Her eşik için: o yarıçap içinde en az bir hastane var mı? En küçük sağlanan eşik puanı verir.
+        counts = _bin_points(hospitals[:, 0], hospitals[:, 1], origin, cell_deg, shape) if len(hospitals) else np.zeros(shape)
+        score = np.ones((cells, cells))
+        for limit, step_score in reversed(HOSPITAL_KM_STEPS):
+            within = _fft_convolve(counts, (dist <= limit).astype(float))[inner] > 0.5
+            score = np.where(within, step_score, score)
+        layers.append(score)
+
+    if not layers:
+        return np.full((cells, cells), np.nan)
+    # Eşit ağırlıklı ortalama; enterpolasyon yapılamayan hücrelerde diğer katmanlar kullanılır
+    stacked = np.stack(layers)
+    valid = ~np.isnan(stacked)
+    total = np.where(valid, stacked, 0).sum(axis=0)
+    count = valid.sum(axis=0)
+    return np.divide(total, count, out=np.full((cells, cells), np.nan), where=count > 0)
+
+def to_png(v):
+    # 1 (kırmızı) - 3 (sarı) - 5 (yeşil); NaN saydam
+    rgba = np.zeros(v.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = np.interp(v, [1, 3, 5], [215, 250, 40])
+    rgba[..., 1] = np.interp(v, [1, 3, 5], [48, 210, 160])
+    rgba[..., 2] = np.interp(v, [1, 3, 5], [39, 60, 70])
+    rgba[..., 3] = np.where(np.isnan(v), 0, 140)
+    buf = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+# --- UYGUNLUK YÜZEYİ ---
+# Görünen alan XYZ karolarına bölünür ve her karo ayrı önbelleğe alınır. Kaydırma sonrası
+# yalnızca yeni görünen karolar hesaplanır; yeni değerlendirme kaydı (sürüm) veya okul konumu
+# değişince ilgili anahtarlar kendiliğinden geçersiz olur.
+class SuitabilitySurface:
+    def __init__(self, store, distance_service):
+        self.store = store
+        self.distance = distance_service
+        self.tile = lru_cache(maxsize=512)(self._tile)
+
+    def _tile(self, z, x, y, version, school):
+        lat_s, lat_n, lon_w, lon_e = tile_bounds(z, x, y)
+        tile_km = min(lat_n - lat_s, (lon_e - lon_w) * math.cos(math.radians(max(abs(lat_s), abs(lat_n))))) * KM_PER_DEG_LAT
+        cells = int(min(max(tile_km / MIN_CELL_KM, 8), TILE_CELLS))
+
+        def margin(km):
+            d_lat = km / KM_PER_DEG_LAT
+            d_lon = km / (KM_PER_DEG_LAT * max(math.cos(math.radians(max(abs(lat_s), abs(lat_n)))), 0.01))
+            return lat_s - d_lat, lat_n + d_lat, lon_w - d_lon, lon_e + d_lon
+
+        sites = self.store.points_in_bbox(*margin(IDW_RADIUS_KM))
+        hospitals = None
+        if self.distance.hospital_index is not None:
+            index = self.distance.hospital_index
+            ids = index.in_bbox(*margin(HOSPITAL_KM_STEPS[-1][0]))
+            hospitals = np.column_stack([index.lats[ids], index.lons[ids]])
+
+        values = suitability_grid((lat_s, lat_n, lon_w, lon_e), cells, sites, hospitals, school)
+        if np.isnan(values).all():
+            return None
+        return to_png(values), [[lat_s, lon_w], [lat_n, lon_e]]
+
+    def overlays(self, bounds, zoom, school=None):
+        if zoom < MIN_ZOOM:
+            return []
+        tiles = visible_tiles(bounds, zoom)[:MAX_TILES]
+        version = self.store.version()
+        return [t for t in (self.tile(z, x, y, version, school) for z, x, y in tiles) if t is not None]
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+import sqlite3
+import threading
+import numpy as np
+
+DB_PATH = "saha_degerlendirmeleri.db"
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.2
+
+# --- YARDIMCI: Vektörel Haversine (km) ---
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+# --- DEĞERLENDİRME KAYDI ---
+# Tamamlanan her değerlendirme SQLite'a yazılır. Koordinatlar ayrıca bir R-tree tablosunda
+# tutulur; "yakındaki sahalar" sorgusu tüm tabloyu taramadan sınırlayıcı kutu ile aday bulur.
+# Konumu seçilmemiş değerlendirmeler enlem/boylam NULL olarak kaydedilir ve R-tree'ye girmez.
+class EvaluationStore:
+    def __init__(self, path=DB_PATH):
+        # Streamlit oturumları ayrı iş parçacıklarında çalışır; tek bağlantı kilitle paylaşılır
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS evaluations (
+                    id INTEGER PRIMARY KEY,
+                    site_name TEXT, evaluator TEXT, eval_date TEXT,
+                    lat REAL, lon REAL,
+                    scores TEXT, omitted TEXT,
+                    total_avg REAL, status TEXT,
+                    created_at TEXT
+                )""")
+            try:
+                self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS evaluations_geo USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+            except sqlite3.OperationalError:
+                # R-tree modülü olmayan SQLite derlemeleri: aynı sorgu B-tree indeksi ile çalışır
+                self.conn.execute("CREATE TABLE IF NOT EXISTS evaluations_geo (id INTEGER PRIMARY KEY, min_lat REAL, max_lat REAL, min_lon REAL, max_lon REAL)")
+                self.conn.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_geo ON evaluations_geo (min_lat, min_lon)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_form ON evaluations (site_name, eval_date)")
+
+    def save(self, site_name, evaluator, eval_date, lat, lon, item_scores, omitted_items, total_avg, status):
+        # Aynı form (saha, değerlendiren, tarih, konum) yeniden gönderilirse eski kaydın yerine geçer;
+        # yeni kimlik alır ki kayıtlardan türetilen önbellekler (version) yenilensin.
+        with self.lock, self.conn:
+            old = [row[0] for row in self.conn.execute(
+                "SELECT id FROM evaluations WHERE site_name = ? AND eval_date = ? AND evaluator IS ? AND lat IS ? AND lon IS ?",
+                (site_name, str(eval_date), evaluator, lat, lon)
+            )]
+            cur = self.conn.execute(
+                "INSERT INTO evaluations (site_name, evaluator, eval_date, lat, lon, scores, omitted, total_avg, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (site_name, evaluator, str(eval_date), lat, lon,
+                 json.dumps(item_scores, ensure_ascii=False), json.dumps(omitted_items, ensure_ascii=False),
+                 total_avg, status, datetime.datetime.now().isoformat(timespec="seconds"))
+            )
+            if lat is not None and lon is not None:
+                self.conn.execute("INSERT INTO evaluations_geo VALUES (?, ?, ?, ?, ?)", (cur.lastrowid, lat, lat, lon, lon))
+            # Eski kayıt yeni satır eklendikten sonra silinir; önce silinseydi SQLite aynı kimliği yeniden verirdi
+            if old:
+                marks = ",".join("?" * len(old))
+                self.conn.execute(f"DELETE FROM evaluations_geo WHERE id IN ({marks})", old)
+                self.conn.execute(f"DELETE FROM evaluations WHERE id IN ({marks})", old)
+            return cur.lastrowid
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def version(self):
+        # Yeni kayıt eklendiğinde değişir; kayıtlardan türetilen önbellekler için anahtar
+        with self.lock:
+            return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM evaluations").fetchone()[0]
+
+    def points_in_bbox(self, min_lat, max_lat, min_lon, max_lon):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT e.lat, e.lon, e.total_avg FROM evaluations_geo g JOIN evaluations e ON e.id = g.id "
+                "WHERE g.min_lat >= ? AND g.max_lat <= ? AND g.min_lon >= ? AND g.max_lon <= ?",
+                (min_lat, max_lat, min_lon, max_lon)
+            ).fetchall()
+        return np.array(rows, dtype=float).reshape(-1, 3)
+
+    def _in_box(self, lat, lon, radius_km):
+        d_lat = radius_km / KM_PER_DEG_LAT
+        d_lon = radius_km / (KM_PER_DEG_LAT * max(np.cos(np.radians(lat)), 0.01))
+        return self.conn.execute(
+            "SELECT e.id, e.site_name, e.evaluator, e.eval_date, e.lat, e.lon, e.total_avg, e.status, e.scores "
+            "FROM evaluations_geo g JOIN evaluations e ON e.id = g.id "
+            "WHERE g.min_lat >= ? AND g.max_lat <= ? AND g.min_lon >= ? AND g.max_lon <= ?",
+            (lat - d_lat, lat + d_lat, lon - d_lon, lon + d_lon)
+        ).fetchall()
+
+    def nearest(self, lat, lon, k=5):
+        # Kutu en az k aday bulana kadar büyütülür; ardından k. adayın mesafesi kadar yarıçapla
+        # tekrar sorgulanır (kutunun köşesinde kalıp daha yakında olan sahalar kaçırılmasın diye).
+        with self.lock:
+            radius = 5.0
+            rows = self._in_box(lat, lon, radius)
+            while len(rows) < k and radius < 2 * np.pi * EARTH_RADIUS_KM:
+                radius *= 4
+                rows = self._in_box(lat, lon, radius)
+            if not rows:
+                return []
+            dist = haversine_km(lat, lon, np.array([r[4] for r in rows]), np.array([r[5] for r in rows]))
+            if len(rows) >= k:
+                kth = np.partition(dist, k - 1)[k - 1]
+                if kth > radius:
+                    rows = self._in_box(lat, lon, kth)
+                    dist = haversine_km(lat, lon, np.array([r[4] for r in rows]), np.array([r[5] for r in rows]))
+
+        result = []
+        for i in np.argsort(dist)[:k]:
+            r = rows[i]
+            result.append({
+                "Saha": r[1], "Değerlendiren": r[2], "Tarih": r[3],
+                "Mesafe (km)": round(float(dist[i]), 2), "Puan": round(r[6], 2), "Durum": r[7],
+                "Enlem": r[4], "Boylam": r[5], "Puanlar": json.loads(r[8])
+            })
+        return result
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import heapq
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from saha_kayit import haversine_km, KM_PER_DEG_LAT
+
+# --- VERİ DOSYALARI ---
+# hastaneler.csv : ad, enlem, boylam
+# yol_agi.csv    : enlem1, boylam1, enlem2, boylam2, (isteğe bağlı) hiz_kmh
+HOSPITALS_PATH = os.path.join("veri", "hastaneler.csv")
+ROAD_GRAPH_PATH = os.path.join("veri", "yol_agi.csv")
+DEFAULT_SPEED_KMH = 50.0
+
+# --- PUAN EŞİKLERİ ---
+# (üst sınır, puan) çiftleri; ilk sağlanan eşiğin puanı önerilir, hiçbiri sağlanmazsa 1
+SCHOOL_KM_STEPS = [(25, 5), (50, 4), (100, 3), (150, 2)]
+SCHOOL_MIN_STEPS = [(30, 5), (60, 4), (90, 3), (120, 2)]
+HOSPITAL_KM_STEPS = [(5, 5), (10, 4), (20, 3), (40, 2)]
+HOSPITAL_MIN_STEPS = [(10, 5), (20, 4), (30, 3), (45, 2)]
+
+def score_from_steps(value, steps):
+    for limit, score in steps:
+        if value <= limit:
+            return score
+    return 1
+
+# --- IZGARA TABANLI MEKANSAL İNDEKS ---
+# Noktalar sabit boyutlu enlem/boylam hücrelerine dağıtılır. En yakın komşu sorgusu sorgu
+# hücresinden başlayıp halka halka genişler; bulunan k. mesafe, henüz bakılmamış hücrelerin
+# olası en kısa mesafesinden küçükse durur. Böylece binlerce nokta için tüm liste taranmaz.
+class GridIndex:
+    def __init__(self, lats, lons, cell_deg=0.25):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.cell = cell_deg
+        cells = {}
+        for idx, key in enumerate(zip(np.floor(self.lats / cell_deg).astype(int), np.floor(self.lons / cell_deg).astype(int))):
+            cells.setdefault(key, []).append(idx)
+        self.cells = {key: np.array(ids) for key, ids in cells.items()}
+        self.max_ring = int(np.ceil(360 / cell_deg))
+
+    def __len__(self):
+        return len(self.lats)
+
+    def in_bbox(self, min_lat, max_lat, min_lon, max_lon):
+        ids = [self.cells[(i, j)]
+               for i in range(int(np.floor(min_lat / self.cell)), int(np.floor(max_lat / self.cell)) + 1)
+               for j in range(int(np.floor(min_lon / self.cell)), int(np.floor(max_lon / self.cell)) + 1)
+               if (i, j) in self.cells]
+        return np.concatenate(ids) if ids else np.array([], dtype=int)
+
+    def _ring(self, ci, cj, r):
+        if r == 0:
+            keys = [(ci, cj)]
+        else:
+            keys = [(ci + di, cj + dj) for di in (-r, r) for dj in range(-r, r + 1)]
+            keys += [(ci + di, cj + dj) for dj in (-r, r) for di in range(-r + 1, r)]
+        return [self.cells[key] for key in keys if key in self.cells]
+
+    def nearest(self, lat, lon, k=1):
+        k = min(k, len(self))
+        if k == 0:
+            return np.array([], dtype=int), np.array([])
+        ci, cj = int(np.floor(lat / self.cell)), int(np.floor(lon / self.cell))
+        found = []
+        for r in range(self.max_ring + 1):
+            found.extend(self._ring(ci, cj, r))
+            if not found:
+                continue
+            ids = np.concatenate(found)
+            if len(ids) < k:
+                continue
+            dist = haversine_km(lat, lon, self.lats[ids], self.lons[ids])
+            if len(ids) == len(self):
+                break
+            kth = np.partition(dist, k - 1)[k - 1]
+            # Bakılmamış hücreler en az r hücre uzakta (boylam yönü enleme göre kısalır)
+            reach = r * self.cell * KM_PER_DEG_LAT * np.cos(np.radians(min(abs(lat) + (r + 1) * self.cell, 89.0)))
+            if kth <= reach:
+                break
+        order = np.argsort(dist)[:k]
+        return ids[order], dist[order]
+
+# --- YOL AĞI (isteğe bağlı) ---
+# Kenar listesinden yönsüz bir graf kurulur; düğümler 5 ondalık basamağa yuvarlanmış
+# koordinatlarla birleştirilir. Aynı düğüm çifti için en kısa yol bir kez hesaplanır.
+class RoadGraph:
+    def __init__(self, edges):
+        ends = np.round(edges[["enlem1", "boylam1", "enlem2", "boylam2"]].to_numpy(dtype=float), 5)
+        points = np.vstack([ends[:, :2], ends[:, 2:]])
+        nodes, inverse = np.unique(points, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        u, v = inverse[:len(ends)], inverse[len(ends):]
+        length = haversine_km(ends[:, 0], ends[:, 1], ends[:, 2], ends[:, 3])
+        speed = edges["hiz_kmh"].fillna(DEFAULT_SPEED_KMH).to_numpy(dtype=float) if "hiz_kmh" in edges else np.full(len(ends), DEFAULT_SPEED_KMH)
+        minutes = length / speed * 60
+
+        self.adj = [[] for _ in range(len(nodes))]
+        for a, b, km, mins in zip(u.tolist(), v.tolist(), length.tolist(), minutes.tolist()):
+            self.adj[a].append((b, km, mins))
+            self.adj[b].append((a, km, mins))
+        self.index = GridIndex(nodes[:, 0], nodes[:, 1], cell_deg=0.05)
+        self.route = lru_cache(maxsize=4096)(self._dijkstra)
+
+    def _dijkstra(self, source, target):
+        # Süreye göre en kısa yol; (dakika, km) döner, bağlantı yoksa None
+        best = {source: 0.0}
+        heap = [(0.0, 0.0, source)]
+        while heap:
+            mins, km, node = heapq.heappop(heap)
+            if node == target:
+                return mins, km
+            if mins > best.get(node, np.inf):
+                continue
+            for nxt, edge_km, edge_min in self.adj[node]:
+                cand = mins + edge_min
+                if cand < best.get(nxt, np.inf):
+                    best[nxt] = cand
+                    heapq.heappush(heap, (cand, km + edge_km, nxt))
+        return None
+
+    def travel(self, lat1, lon1, lat2, lon2):
+        # Noktalar en yakın düğüme bağlanır; bağlantı mesafesi varsayılan hızla eklenir
+        (a,), (snap_a,) = self.index.nearest(lat1, lon1)
+        (b,), (snap_b,) = self.index.nearest(lat2, lon2)
+        path = self.route(int(a), int(b))
+        if path is None:
+            return None
+        snap_km = snap_a + snap_b
+        return float(path[0] + snap_km / DEFAULT_SPEED_KMH * 60), float(path[1] + snap_km)
+
+# --- MESAFE SERVİSİ ---
+class DistanceService:
+    def __init__(self, hospitals=None, roads=None):
+        self.hospitals = hospitals
+        self.hospital_index = GridIndex(hospitals["enlem"], hospitals["boylam"]) if hospitals is not None and len(hospitals) else None
+        self.roads = RoadGraph(roads) if roads is not None and len(roads) else None
+
+    @classmethod
+    def from_files(cls, hospitals_path=HOSPITALS_PATH, road_graph_path=ROAD_GRAPH_PATH):
+        hospitals = pd.read_csv(hospitals_path) if os.path.exists(hospitals_path) else None
+        roads = pd.read_csv(road_graph_path) if os.path.exists(road_graph_path) else None
+        return cls(hospitals, roads)
+
+    def assess(self, site_lat, site_lon, school_lat=None, school_lon=None):
+        result = {}
+        if school_lat is not None and school_lon is not None:
+            km = float(haversine_km(site_lat, site_lon, school_lat, school_lon))
+            result["school_km"] = km
+            result["school_score"] = score_from_steps(km, SCHOOL_KM_STEPS)
+            travel = self.roads.travel(school_lat, school_lon, site_lat, site_lon) if self.roads else None
+            if travel:
+                result["school_min"], result["school_road_km"] = travel
+                result["school_score"] = score_from_steps(travel[0], SCHOOL_MIN_STEPS)
+
+        if self.hospital_index is not None:
+            ids, dist = self.hospital_index.nearest(site_lat, site_lon, k=5 if self.roads else 1)
+            best = int(ids[0])
+            result["hospital_name"] = str(self.hospitals["ad"].iloc[best])
+            result["hospital_km"] = float(dist[0])
+            result["hospital_score"] = score_from_steps(dist[0], HOSPITAL_KM_STEPS)
+            if self.roads:
+                # Kuş uçuşu en yakın birkaç hastane arasından yol süresi en kısa olanı seçilir
+                options = [(self.roads.travel(site_lat, site_lon, self.hospitals["enlem"].iloc[i], self.hospitals["boylam"].iloc[i]), i) for i in ids]
+                options = [(t, i) for t, i in options if t]
+                if options:
+                    (mins, road_km), best = min(options)
+                    result["hospital_name"] = str(self.hospitals["ad"].iloc[best])
+                    result["hospital_min"], result["hospital_road_km"] = mins, road_km
+                    result["hospital_score"] = score_from_steps(mins, HOSPITAL_MIN_STEPS)
+        return result
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# --- KRİTER ŞEMASI ---
+# Kriterler saha_kriterleri.json dosyasında tanımlıdır ve süreç başına bir kez okunup
+# doğrulanarak dizilere derlenir. Form, PDF detayları, toplu değerlendirme ve karşılaştırma
+# raporu aynı derlenmiş şemayı kullanır; puanlama birkaç matris çarpımından ibarettir.
+SCHEMA_PATH = "saha_kriterleri.json"
+SUPPORTED_SCHEMA_VERSIONS = (1,)
+
+STATUS_CRITICAL = "UYGUN DEGIL (Kritik Guvenlik/Erisim Riskleri Mevcut)"
+STATUS_OK = "UYGUN (Saha Calismasi Icin Elverisli)"
+STATUS_PARTIAL = "KISMEN UYGUN (Gelistirilebilir/Onlem Gerektirir)"
+STATUS_POOR = "UYGUN DEGIL (Yetersiz Altyapi/Icerik)"
+
+class CriteriaSchema:
+    def __init__(self, data):
+        if data.get("version") not in SUPPORTED_SCHEMA_VERSIONS:
+            raise ValueError(f"Desteklenmeyen kriter şeması sürümü: {data.get('version')}")
+        self.version = data["version"]
+        self.min_score = data["scale"]["min"]
+        self.max_score = data["scale"]["max"]
+        self.default_score = data["scale"]["default"]
+        self.ok_min = data["status"]["ok_min"]
+        self.partial_min = data["status"]["partial_min"]
+
+        self.categories = []
+        labels, helps, cat_index, weights, critical_below, skippable = [], [], [], [], [], []
+        for c, cat in enumerate(data["categories"]):
+            if not cat.get("items"):
+                raise ValueError(f"Kategoride madde yok: {cat.get('name')}")
+            self.categories.append(cat["name"])
+            for item in cat["items"]:
+                if not item.get("label"):
+                    raise ValueError(f"Etiketsiz madde: {cat['name']}")
+                if item["label"] in labels:
+                    raise ValueError(f"Tekrarlanan madde: {item['label']}")
+                if item.get("weight", 1) <= 0:
+                    raise ValueError(f"Ağırlık pozitif olmalıdır: {item['label']}")
+                labels.append(item["label"])
+                helps.append(item.get("help", ""))
+                cat_index.append(c)
+                weights.append(float(item.get("weight", 1)))
+                critical_below.append(float(item.get("critical_below", np.nan)))
+                skippable.append(bool(item.get("skippable", False)))
+
+        self.labels = tuple(labels)
+        self.helps = tuple(helps)
+        self.cat_index = np.array(cat_index)
+        self.weights = np.array(weights)
+        self.critical_below = np.array(critical_below)
+        self.skippable = np.array(skippable)
+        # (madde x kategori) ağırlık matrisi: kategori toplamları tek çarpımla çıkar
+        self.membership = np.zeros((len(labels), len(self.categories)))
+        self.membership[np.arange(len(labels)), self.cat_index] = self.weights
+
+    def items_of(self, c):
+        return np.flatnonzero(self.cat_index == c)
+
+    def score(self, scores):
+        # scores: (saha x madde), değerlendirme dışı maddeler NaN
+        scores = np.atleast_2d(np.asarray(scores, dtype=float))
+        answered = ~np.isnan(scores)
+        filled = np.where(answered, scores, 0.0)
+
+        weight_total = answered @ self.weights
+        total_avg = np.divide(filled @ self.weights, weight_total, out=np.full(len(scores), np.nan), where=weight_total > 0)
+        cat_weight = answered @ self.membership
+        # Tüm maddeleri dışarıda kalan kategori 0 sayılır
+        cat_avg = np.divide(filled @ self.membership, cat_weight, out=np.zeros(cat_weight.shape), where=cat_weight > 0)
+
+        # NaN eşik (kritik olmayan madde) ile karşılaştırma her zaman False
+        fails = answered & (scores < self.critical_below)
+        has_critical = fails.any(axis=1)
+        status = np.select(
+            [has_critical, total_avg >= self.ok_min, total_avg >= self.partial_min],
+            [STATUS_CRITICAL, STATUS_OK, STATUS_PARTIAL],
+            default=STATUS_POOR
+        )
+        return {"total": total_avg, "categories": cat_avg, "fails": fails, "has_critical": has_critical, "status": status}
+
+@lru_cache(maxsize=None)
+def load_schema(path=SCHEMA_PATH):
+    with open(path, encoding="utf-8") as f:
+        return CriteriaSchema(json.load(f))
+
+# --- TOPLU DEĞERLENDİRME ---
+# Sütunlar: Saha, (isteğe bağlı) Enlem, Boylam ve her madde için bir sütun.
+# Madde sütunları yıldızlı ya da yıldızsız yazılabilir; atlanabilir maddelerde boş hücre "İhtiyaç Yok" demektir.
+NAME_COL, LAT_COL, LON_COL = "Saha", "Enlem", "Boylam"
+
+def _column_key(label):
+    return str(label).replace("*", "").strip().casefold()
+
+def batch_template():
+    schema = load_schema()
+    row = {NAME_COL: "Ornek Saha", LAT_COL: 41.0082, LON_COL: 28.9784}
+    row.update({label.replace("*", ""): schema.default_score for label in schema.labels})
+    return pd.DataFrame([row]).to_csv(index=False).encode("utf-8-sig")
+
+def read_sites(uploaded_file):
+    name = getattr(uploaded_file, "name", str(uploaded_file)).lower()
+    if name.endswith((".xlsx", ".xls")):
+        return pd.read_excel(uploaded_file)
+    data = uploaded_file.getvalue() if hasattr(uploaded_file, "getvalue") else open(uploaded_file, "rb").read()
+    return pd.read_csv(io.BytesIO(data), sep=None, engine="python", encoding="utf-8-sig")
+
+def score_sites(df):
+    schema = load_schema()
+    columns = {_column_key(c): c for c in df.columns}
+    items = schema.labels
+
+    missing = [item for j, item in enumerate(items) if _column_key(item) not in columns and not schema.skippable[j]]
+    if _column_key(NAME_COL) not in columns:
+        missing.insert(0, NAME_COL)
+    if missing:
+        raise ValueError(f"Eksik sütunlar: {', '.join(missing)}")
+
+    # Satırlar sahalar, sütunlar maddeler; boş (NaN) hücre değerlendirme dışı demektir
+    scores = np.full((len(df), len(items)), np.nan)
+    for j, item in enumerate(items):
+        if _column_key(item) in columns:
+            scores[:, j] = pd.to_numeric(df[columns[_column_key(item)]], errors="coerce").to_numpy(dtype=float)
+
+    answered = ~np.isnan(scores)
+    bad_rows = np.flatnonzero((~answered & ~schema.skippable).any(axis=1))
+    if bad_rows.size:
+        raise ValueError(f"Zorunlu maddelerde boş/geçersiz puan var (satır: {', '.join(str(r + 2) for r in bad_rows[:10])})")
+    out_of_range = np.flatnonzero((answered & ((scores < schema.min_score) | (scores > schema.max_score))).any(axis=1))
+    if out_of_range.size:
+        raise ValueError(f"Puanlar {schema.min_score}-{schema.max_score} arasında olmalıdır (satır: {', '.join(str(r + 2) for r in out_of_range[:10])})")
+
+    scored = schema.score(scores)
+
+    result = pd.DataFrame({NAME_COL: df[columns[_column_key(NAME_COL)]].astype(str).to_numpy()})
+    for col in (LAT_COL, LON_COL):
+        if _column_key(col) in columns:
+            result[col] = pd.to_numeric(df[columns[_column_key(col)]], errors="coerce").to_numpy()
+    result["Durum"] = scored["status"]
+    result["Genel Puan"] = scored["total"]
+    result["Kritik Maddeler"] = [", ".join(np.array(items)[row]) for row in scored["fails"]]
+    for c, cat_name in enumerate(schema.categories):
+        result[cat_name] = scored["categories"][:, c]
+
+    # Sıralama: kritik riski olmayanlar önce, sonra genel puana göre
+    order = np.lexsort((-scored["total"], scored["has_critical"]))
+    result = result.iloc[order].reset_index(drop=True)
+    result.insert(0, "Sıra", np.arange(1, len(result) + 1))
+    return result
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+import datetime
+import io
+import zlib
+from concurrent.futures import as_completed
+from functools import lru_cache
+from matplotlib.figure import Figure
+from PIL import Image
+import numpy as np
+from saha_puanlama import load_schema
+from pdf_tablo import draw_table
+from pdf_ortak import font_style, new_document, pdf_bytes, pdf_text
+
+# --- YARDIMCI: Bellekteki Görseli PDF'e Tanıtma ---
+# FPDF görselleri yalnızca dosya yolundan okur. Çözülmüş pikselleri görsel tablosuna
+# doğrudan yazınca image() dosya aramadan bu kaydı kullanır; diske hiç uğranmaz.
+# Çözme ve sıkıştırma (pahalı kısım) ayrı tutulur ki işçi süreçlerde yapılabilsin.
+def png_to_image_info(data):
+    img = Image.open(io.BytesIO(data)).convert("RGB")
+    return {'w': img.width, 'h': img.height, 'cs': 'DeviceRGB', 'bpc': 8, 'f': 'FlateDecode', 'data': zlib.compress(img.tobytes())}
+
+def register_image(pdf, name, info):
+    pdf.images[name] = dict(info, i=len(pdf.images) + 1)
+
+def register_image_bytes(pdf, name, data):
+    register_image(pdf, name, png_to_image_info(data))
+
+# --- GRAFİK OLUŞTURUCU ---
+# Grafik PNG olarak bellekte üretilir. Aynı ortalamalar ve saha ismi için tekrar çizilmez
+# (her kaydırıcı hareketinde yeniden çalışan sayfa önbellekten okur).
+@lru_cache(maxsize=128)
+def create_radar_chart(categories, values, saha_ismi):
+    N = len(categories)
+    angles = [n / float(N) * 2 * np.pi for n in range(N)]
+    angles += angles[:1]
+    values = list(values) + list(values[:1])
+    
+    # pyplot yerine doğrudan Figure: oturumlar arası paylaşılan global durum yok
+    fig = Figure(figsize=(6, 6))
+    ax = fig.add_subplot(polar=True)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories, color='black', size=9)
+    ax.set_rlabel_position(0)
+    ax.set_yticks([1, 2, 3, 4, 5])
+    ax.set_yticklabels(["1", "2", "3", "4", "5"], color="grey", size=7)
+    ax.set_ylim(0, 5)
+    
+    line_color = '#1E88E5'
+    fill_color = '#42A5F5'
+    
+    ax.plot(angles, values, linewidth=2, linestyle='solid', color=line_color)
+    ax.fill(angles, values, fill_color, alpha=0.3)
+    ax.set_title(f"{saha_ismi} - Uygunluk Grafigi", size=14, color='black', y=1.1)
+    
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=100)
+    return buf.getvalue()
+
+# --- KARŞILAŞTIRMA GRAFİĞİ (çoklu saha) ---
+OVERLAY_COLORS = ['#1E88E5', '#E53935', '#43A047', '#FB8C00', '#8E24AA', '#00ACC1', '#6D4C41', '#546E7A', '#C0CA33', '#D81B60']
+
+@lru_cache(maxsize=32)
+def create_overlay_chart(categories, series):
+    # series: ((saha_ismi, (kategori ortalamaları...)), ...)
+    N = len(categories)
+    angles = [n / float(N) * 2 * np.pi for n in range(N)]
+    angles += angles[:1]
+    
+    fig = Figure(figsize=(7, 7))
+    ax = fig.add_subplot(polar=True)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories, color='black', size=9)
+    ax.set_rlabel_position(0)
+    ax.set_yticks([1, 2, 3, 4, 5])
+    ax.set_yticklabels(["1", "2", "3", "4", "5"], color="grey", size=7)
+    ax.set_ylim(0, 5)
+    
+    for i, (saha_ismi, values) in enumerate(series):
+        color = OVERLAY_COLORS[i % len(OVERLAY_COLORS)]
+        values = list(values) + list(values[:1])
+        ax.plot(angles, values, linewidth=1.5, linestyle='solid', color=color, label=saha_ismi)
+        ax.fill(angles, values, color, alpha=0.08)
+    ax.legend(loc='upper right', bbox_to_anchor=(1.35, 1.12), fontsize=8)
+    ax.set_title("Saha Karsilastirma Grafigi", size=14, color='black', y=1.1)
+    
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight', dpi=100)
+    return buf.getvalue()
+
+# --- PDF OLUŞTURUCU ---
+# Sabit ASCII başlıklar Arial kalın/italik kalır; saha adı, maddeler ve notlar gibi Türkçe metinler
+# Türkçe yazı tipiyle (yalnız normal biçimi vardır) yazılır. Yazı tipi yoksa hepsi Arial'e çevrilir.
+def create_pdf(saha_info, results_text, item_scores, observation_note, chart_png, lat, lon):
+    pdf, font = new_document()
+    pdf.add_page()
+    
+    # Başlık
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(200, 10, txt="SAHA CALISMASI DEGERLENDIRME RAPORU", ln=True, align='C')
+    pdf.set_font("Arial", "I", 10)
+    pdf.cell(200, 5, txt="Ortaogretim Cografya Dersleri - Gunubirlik Saha Calismasi", ln=True, align='C')
+    
+    # Saha Bilgileri
+    pdf.set_font(font, size=11)
+    pdf.ln(10)
+    for key, value in saha_info.items():
+        pdf.cell(200, 7, txt=pdf_text(f"{key}: {value}", font), ln=True)
+    
+    # Konum Bilgisi ve Link
+    if lat and lon:
+        pdf.set_text_color(0, 0, 255)
+        maps_link = f"https://www.google.com/maps?q={lat},{lon}"
+        pdf.cell(200, 7, txt=f"Konum: {lat}, {lon} (Haritada Goruntulemek Icin Tiklayin)", ln=True, link=maps_link)
+        pdf.set_text_color(0, 0, 0)
+    
+    # Grafiği Ekle
+    if chart_png:
+        register_image_bytes(pdf, "radar_chart", chart_png)
+        pdf.image("radar_chart", x=130, y=35, w=70)
+    
+    pdf.ln(5)
+    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+    pdf.ln(5)
+    
+    # Sonuç Metni
+    pdf.set_font(font, font_style(font, "B"), 11)
+    pdf.multi_cell(0, 8, txt=pdf_text(f"GENEL DEGERLENDIRME SONUCU: {results_text}", font))
+    pdf.ln(5)
+    
+    if observation_note:
+        pdf.set_font(font, font_style(font, "I"), 10)
+        pdf.multi_cell(0, 8, txt=pdf_text(f"GOZLEM VE ONERILER: {observation_note}", font))
+        pdf.ln(5)
+
+    # Detaylar (kriter şemasının sırasıyla; item_scores: madde -> puan, değerlendirme dışı ise None)
+    schema = load_schema()
+    for c, cat in enumerate(schema.categories):
+        rows = []
+        for j in schema.items_of(c):
+            item = schema.labels[j]
+            score = item_scores.get(item)
+            rows.append((pdf_text(item, font), f"{score}/5" if score is not None else "Degerlendirme Disi"))
+        # Kategori adı tablo başlığıdır; sayfa taşarsa yeni sayfada tekrarlanır
+        draw_table(pdf, [(pdf_text(cat.upper(), font), 150, 'L'), ("Puan", 40, 'C')], rows,
+                   header_height=6, font=(font, "", 9), header_font=(font, font_style(font, "B"), 9))
+        pdf.ln(3)
+        
+    return pdf_bytes(pdf)
+
+
+# --- İŞÇİ SÜREÇ GÖREVLERİ ---
+# Grafik çizimi ve piksel sıkıştırma raporun CPU yoğun kısmıdır; süreç havuzunda çalışır.
+# Dönen değer FPDF görsel kaydıdır, ana süreç sayfaları sırayla bu kayıtlarla birleştirir.
+def site_chart_job(cat_names, values, saha_ismi):
+    return png_to_image_info(create_radar_chart(cat_names, values, saha_ismi))
+
+def overlay_chart_job(cat_names, series):
+    return png_to_image_info(create_overlay_chart(cat_names, series))
+
+# --- KARŞILAŞTIRMA RAPORU ---
+# ranked: saha_puanlama.score_sites çıktısı (sıralı tablo)
+def create_comparison_pdf(ranked, top_n=5, executor=None, progress=None):
+    cat_cols = load_schema().categories
+    cat_names = tuple(cat_cols)
+    records = ranked.to_dict("records")
+    series = tuple((r["Saha"], tuple(float(r[c]) for c in cat_cols)) for r in records[:top_n])
+
+    tasks = [(overlay_chart_job, (cat_names, series))]
+    tasks += [(site_chart_job, (cat_names, tuple(float(r[c]) for c in cat_cols), r["Saha"])) for r in records]
+    infos = [None] * len(tasks)
+    if executor is None:
+        for i, (fn, args) in enumerate(tasks):
+            infos[i] = fn(*args)
+            if progress: progress(i + 1, len(tasks))
+    else:
+        futures = {executor.submit(fn, *args): i for i, (fn, args) in enumerate(tasks)}
+        for done, future in enumerate(as_completed(futures), 1):
+            infos[futures[future]] = future.result()
+            if progress: progress(done, len(tasks))
+
+    pdf, font = new_document()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    
+    # Başlık ve Özet Sıralama Tablosu
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, txt="SAHA KARSILASTIRMA RAPORU", ln=True, align='C')
+    pdf.set_font("Arial", "I", 10)
+    pdf.cell(0, 5, txt=f"{len(records)} aday saha - {datetime.date.today().strftime('%d/%m/%Y')}", ln=True, align='C')
+    pdf.ln(6)
+    
+    columns = [("Sira", 12, 'C'), ("Saha", 80, 'L'), ("Puan", 20, 'C'), ("Durum", 78, 'L')]
+    rows = [(r["Sıra"], pdf_text(r["Saha"], font), f"{r['Genel Puan']:.2f}", pdf_text(r["Durum"], font)) for r in records]
+    draw_table(pdf, columns, rows, line_height=6, header_height=7, font=(font, "", 8), header_font=("Arial", "B", 9))
+    
+    # İlk N sahanın bindirilmiş grafiği
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, txt=f"ILK {len(series)} SAHA KARSILASTIRMASI", ln=True, align='C')
+    register_image(pdf, "overlay_chart", infos[0])
+    pdf.image("overlay_chart", x=25, y=25, w=160)
+    
+    # Saha sayfaları
+    for i, r in enumerate(records):
+        pdf.add_page()
+        pdf.set_font(font, font_style(font, "B"), 14)
+        pdf.cell(0, 10, txt=pdf_text(f"{r['Sıra']}. {r['Saha']}", font), ln=True)
+        pdf.set_font(font, size=10)
+        pdf.cell(110, 7, txt=f"Genel Puan: {r['Genel Puan']:.2f} / 5", ln=True)
+        pdf.multi_cell(110, 6, txt=pdf_text(f"Sonuc: {r['Durum']}", font))
+        lat, lon = r.get("Enlem"), r.get("Boylam")
+        if lat == lat and lon == lon and lat is not None and lon is not None:
+            pdf.set_text_color(0, 0, 255)
+            pdf.cell(110, 7, txt=f"Konum: {lat:.5f}, {lon:.5f}", ln=True, link=f"https://www.google.com/maps?q={lat},{lon}")
+            pdf.set_text_color(0, 0, 0)
+        pdf.ln(3)
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(110, 6, txt="Kategori Ortalamalari", ln=True)
+        pdf.set_font(font, size=9)
+        for c in cat_cols:
+            pdf.cell(110, 5, txt=pdf_text(f"- {c}: {r[c]:.2f}", font), ln=True)
+        if r["Kritik Maddeler"]:
+            pdf.ln(2)
+            pdf.set_font(font, font_style(font, "B"), 9)
+            pdf.multi_cell(110, 5, txt=pdf_text(f"Kritik maddeler: {r['Kritik Maddeler']}", font))
+        register_image(pdf, f"site_chart_{i}", infos[i + 1])
+        pdf.image(f"site_chart_{i}", x=125, y=25, w=75)
+    
+    return pdf_bytes(pdf)
@@ -1,107 +1,157 @@
 # -*- coding: utf-8 -*-
 import streamlit as st
-from fpdf import FPDF
 import datetime
-import matplotlib.pyplot as plt
-import numpy as np
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
 import pandas as pd
 import folium
 from streamlit_folium import st_folium
+from streamlit.errors import StreamlitAPIException
+from saha_puanlama import load_schema, STATUS_CRITICAL, STATUS_OK, STATUS_PARTIAL, batch_template, read_sites, score_sites
+from saha_kayit import EvaluationStore
+from saha_mesafe import DistanceService
+from saha_isi_haritasi import SuitabilitySurface
+from saha_rapor import create_radar_chart, create_pdf, create_comparison_pdf
 
-# --- YARDIMCI: Türkçe Karakter Temizleyici ---
-def tr_to_en(text):
-    if text is None: return ""
-    tr_map = {"ı": "i", "İ": "I", "ğ": "g", "Ğ": "G", "ü": "u", "Ü": "U", "ş": "s", "Ş": "S", "ö": "o", "Ö": "O", "ç": "c", "Ç": "C"}
-    text = str(text)
-    for tr, en in tr_map.items():
-        text = text.replace(tr, en)
-    return text
-
-# --- GRAFİK OLUŞTURUCU ---
-def create_radar_chart(categories, values, saha_ismi):
-    N = len(categories)
-    angles = [n / float(N) * 2 * np.pi for n in range(N)]
-    angles += angles[:1]
-    values += values[:1]
-    
-    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
-    plt.xticks(angles[:-1], categories, color='black', size=9)
-    ax.set_rlabel_position(0)
-    plt.yticks([1, 2, 3, 4, 5], ["1", "2", "3", "4", "5"], color="grey", size=7)
-    plt.ylim(0, 5)
-    
-    line_color = '#1E88E5'
-    fill_color = '#42A5F5'
-    
-    ax.plot(angles, values, linewidth=2, linestyle='solid', color=line_color)
-    ax.fill(angles, values, fill_color, alpha=0.3)
-    plt.title(f"{saha_ismi} - Uygunluk Grafigi", size=14, color='black', y=1.1)
-    
-    chart_path = "temp_chart.png"
-    plt.savefig(chart_path, bbox_inches='tight', dpi=100)
-    plt.close()
-    return chart_path, fig
-
-# --- PDF OLUŞTURUCU ---
-def create_pdf(saha_info, results_text, categories_dict, user_scores, omitted_items, observation_note, chart_path, lat, lon):
-    pdf = FPDF()
-    pdf.add_page()
-    
-    # Başlık
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(200, 10, txt=tr_to_en("SAHA CALISMASI DEGERLENDIRME RAPORU"), ln=True, align='C')
-    pdf.set_font("Arial", "I", 10)
-    pdf.cell(200, 5, txt=tr_to_en("Ortaogretim Cografya Dersleri - Gunubirlik Saha Calismasi"), ln=True, align='C')
-    
-    # Saha Bilgileri
-    pdf.set_font("Arial", size=11)
-    pdf.ln(10)
-    for key, value in saha_info.items():
-        pdf.cell(200, 7, txt=tr_to_en(f"{key}: {value}"), ln=True)
-    
-    # Konum Bilgisi ve Link
-    if lat != 0 and lon != 0:
-        pdf.set_text_color(0, 0, 255)
-        maps_link = f"https://www.google.com/maps?q={lat},{lon}"
-        pdf.cell(200, 7, txt=f"Konum: {lat}, {lon} (Haritada Goruntulemek Icin Tiklayin)", ln=True, link=maps_link)
-        pdf.set_text_color(0, 0, 0)
-    
-    # Grafiği Ekle
-    if chart_path:
-        pdf.image(chart_path, x=130, y=35, w=70)
-    
-    pdf.ln(5)
-    pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-    pdf.ln(5)
+# --- DEĞERLENDİRME KAYDI (süreç başına tek bağlantı) ---
+@st.cache_resource
+def get_store():
+    return EvaluationStore()
+
+# --- MESAFE VERİLERİ (süreç başına bir kez yüklenir) ---
+@st.cache_resource
+def get_distance_service():
+    return DistanceService.from_files()
+
+@st.cache_resource
+def get_surface():
+    return SuitabilitySurface(get_store(), get_distance_service())
+
+# --- RAPOR SÜREÇ HAVUZU (süreç başına bir kez) ---
+# spawn: Streamlit sunucusunun iş parçacıklı durumu çatallanmadan temiz işçi süreçler başlar
+@st.cache_resource
+def get_report_pool():
+    if (os.cpu_count() or 1) < 2:
+        return None
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+def apply_suggested_scores(suggested):
+    for item, score in suggested.items():
+        st.session_state[f"score_{item}"] = score
+
+# --- KONUM SEÇİCİ (Harita) ---
+# Harita bir fragment içinde çalışır: tıklama yalnızca bu bölümü yeniden çalıştırır, puanlama
+# kaydırıcıları ve grafik tekrar çizilmez. Temel harita oturum başına bir kez kurulur; her
+# çalıştırmada yalnızca işaretçi katmanı (FeatureGroup) istemciye gönderilir.
+DEFAULT_LAT, DEFAULT_LON = 41.0082, 28.9784
+
+def rerun_location_picker():
+    # Fragment kapsamı yalnızca fragment yeniden çalışmasında geçerli; tam sayfa çalışmasında tüm sayfa çalışır
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+@st.fragment
+def location_picker():
+    if 'lat' not in st.session_state:
+        st.session_state.lat = DEFAULT_LAT
+    if 'lon' not in st.session_state:
+        st.session_state.lon = DEFAULT_LON
+    if 'base_map' not in st.session_state:
+        st.session_state.base_map = folium.Map(location=[DEFAULT_LAT, DEFAULT_LON], zoom_start=6)
+
+    show_surface = st.toggle("Uygunluk yüzeyini göster", key="show_surface",
+                             help="Kayıtlı saha puanları ile okul ve sağlık kuruluşu mesafelerinden türetilen yüzey.")
+
+    col_map, col_info = st.columns([3, 1])
     
-    # Sonuç Metni
-    pdf.set_font("Arial", "B", 11)
-    pdf.multi_cell(0, 8, txt=tr_to_en(f"GENEL DEGERLENDIRME SONUCU: {results_text}"))
-    pdf.ln(5)
+    with col_map:
+        marker_layer = folium.FeatureGroup(name="Seçilen Saha")
+        if st.session_state.lat != DEFAULT_LAT:
+            folium.Marker(
+                [st.session_state.lat, st.session_state.lon],
+                popup="Seçilen Saha",
+                tooltip="Seçilen Saha"
+            ).add_to(marker_layer)
+
+        # Uygunluk yüzeyi görünen alanın karolarından oluşur; karolar önbellekten gelir
+        layers = [marker_layer]
+        if show_surface and "map_view" in st.session_state:
+            school = None
+            if st.session_state.get("okul_lat") is not None and st.session_state.get("okul_lon") is not None:
+                school = (st.session_state.okul_lat, st.session_state.okul_lon)
+            surface_layer = folium.FeatureGroup(name="Uygunluk Yüzeyi")
+            for image_url, image_bounds in get_surface().overlays(st.session_state.map_view["bounds"], st.session_state.map_view["zoom"], school):
+                folium.raster_layers.ImageOverlay(image_url, image_bounds).add_to(surface_layer)
+            layers = [surface_layer, marker_layer]
+
+        # Kaydırma/yakınlaştırma yalnızca yüzey açıkken yeniden çalıştırma tetikler
+        output = st_folium(
+            st.session_state.base_map, key="saha_map", width=700, height=400,
+            feature_group_to_add=layers,
+            returned_objects=["last_clicked", "bounds", "zoom"] if show_surface else ["last_clicked"]
+        )
+
+        # Görünüm değişince yüzey yeni karolarla bir kez yeniden çizilir (art arda döngüye girmemesi için bayrak)
+        view_rerun = st.session_state.pop("view_rerun", False)
+        if show_surface and output.get("bounds") and output["bounds"]["_southWest"]["lat"] is not None:
+            view = {"bounds": output["bounds"], "zoom": output["zoom"]}
+            if view != st.session_state.get("map_view"):
+                st.session_state.map_view = view
+                if not view_rerun:
+                    st.session_state.view_rerun = True
+                    rerun_location_picker()
+
+        clicked = output['last_clicked']
+        if clicked and (clicked['lat'], clicked['lng']) != (st.session_state.lat, st.session_state.lon):
+            st.session_state.lat = clicked['lat']
+            st.session_state.lon = clicked['lng']
+            rerun_location_picker()
     
-    if observation_note:
-        pdf.set_font("Arial", "I", 10)
-        pdf.multi_cell(0, 8, txt=tr_to_en(f"GOZLEM VE ONERILER: {observation_note}"))
-        pdf.ln(5)
-
-    # Detaylar
-    i = 0
-    score_idx = 0
-    for cat, items in categories_dict.items():
-        pdf.set_font("Arial", "B", 10)
-        pdf.cell(200, 6, txt=tr_to_en(cat.upper()), ln=True)
-        pdf.set_font("Arial", size=9)
-        for item in items.keys():
-            clean_item = tr_to_en(item)
-            if item not in omitted_items:
-                pdf.cell(200, 5, txt=f"- {clean_item}: {user_scores[score_idx]}/5", ln=True)
-                score_idx += 1
-            else:
-                pdf.cell(200, 5, txt=f"- {clean_item}: -- (Degerlendirme Disi)", ln=True)
-        pdf.ln(2)
-        
-    return pdf.output(dest='S').encode('latin-1', 'ignore')
+    with col_info:
+        st.info("Seçilen Koordinatlar:")
+        st.metric("Enlem", f"{st.session_state.lat:.5f}")
+        st.metric("Boylam", f"{st.session_state.lon:.5f}")
+
+    # Okul ve en yakın hastaneye mesafe: "Mesafe Uygunluğu*" ve "Acil Yardım Erişimi" için öneri
+    if st.session_state.lat != DEFAULT_LAT:
+        distance = get_distance_service().assess(
+            st.session_state.lat, st.session_state.lon,
+            st.session_state.get("okul_lat"), st.session_state.get("okul_lon")
+        )
+        suggested = {}
+        if "school_km" in distance:
+            text = f"Okula uzaklık: **{distance['school_km']:.1f} km** (kuş uçuşu)"
+            if "school_min" in distance:
+                text += f", yol ile **{distance['school_road_km']:.1f} km / {distance['school_min']:.0f} dk**"
+            st.markdown(text)
+            suggested["Mesafe Uygunluğu*"] = distance["school_score"]
+        if "hospital_km" in distance:
+            text = f"En yakın sağlık kuruluşu: **{distance['hospital_name']}**, {distance['hospital_km']:.1f} km (kuş uçuşu)"
+            if "hospital_min" in distance:
+                text += f", yol ile **{distance['hospital_road_km']:.1f} km / {distance['hospital_min']:.0f} dk**"
+            st.markdown(text)
+            suggested["Acil Yardım Erişimi"] = distance["hospital_score"]
+        if suggested:
+            st.caption("Önerilen puanlar: " + ", ".join(f"{item} → {score}" for item, score in suggested.items()))
+            if st.button("Önerilen Puanları Uygula", on_click=apply_suggested_scores, args=(suggested,)):
+                # Kaydırıcılar fragment dışında; yeni değerlerin görünmesi için tüm sayfa çalışır
+                st.rerun()
+
+    # Seçilen noktaya en yakın, daha önce değerlendirilmiş sahalar
+    t_start = time.perf_counter()
+    nearby = get_store().nearest(st.session_state.lat, st.session_state.lon, k=5)
+    if nearby:
+        st.markdown("**Yakındaki Değerlendirilmiş Sahalar**")
+        st.dataframe(
+            pd.DataFrame(nearby)[["Saha", "Mesafe (km)", "Puan", "Durum", "Tarih", "Değerlendiren"]],
+            hide_index=True, use_container_width=True
+        )
+        st.caption(f"Sorgu süresi: {(time.perf_counter() - t_start) * 1000:.1f} ms")
 
 # --- UYGULAMA BAŞLANGICI ---
 st.set_page_config(page_title="Saha Değerlendirme Formu", layout="wide")
@@ -123,6 +173,12 @@ st.write("")
 st.sidebar.markdown("### Puanlama Rehberi")
 st.sidebar.info("1: Hiç Uygun Değil\n3: Kısmen Uygun\n5: Tamamen Uygun")
 
+st.sidebar.markdown("### Okul Konumu")
+st.sidebar.number_input("Okul Enlemi", value=None, format="%.5f", key="okul_lat")
+st.sidebar.number_input("Okul Boylamı", value=None, format="%.5f", key="okul_lon")
+if get_distance_service().hospital_index is None:
+    st.sidebar.caption("Sağlık kuruluşu verisi (veri/hastaneler.csv) bulunamadı; acil yardım önerisi yapılmaz.")
+
 # --- GİRİŞ BİLGİLERİ VE TIKLANABİLİR HARİTA ---
 with st.expander("📍 Saha Kimlik ve Konum Seçimi", expanded=True):
     col1, col2, col3 = st.columns(3)
@@ -133,68 +189,15 @@ with st.expander("📍 Saha Kimlik ve Konum Seçimi", expanded=True):
     st.write("---")
     st.markdown("**Konum Seçimi:** Harita üzerinde saha çalışması yapılacak noktaya tıklayınız.")
     
-    col_map, col_info = st.columns([3, 1])
-    
-    with col_map:
-        if 'lat' not in st.session_state:
-            st.session_state.lat = 41.0082
-        if 'lon' not in st.session_state:
-            st.session_state.lon = 28.9784
-            
-        m = folium.Map(location=[st.session_state.lat, st.session_state.lon], zoom_start=6)
-        
-        if st.session_state.lat != 41.0082:
-             folium.Marker(
-                [st.session_state.lat, st.session_state.lon], 
-                popup="Seçilen Saha", 
-                tooltip="Seçilen Saha"
-            ).add_to(m)
-
-        output = st_folium(m, width=700, height=400)
+    location_picker()
+    # Haritada nokta seçilmediyse varsayılan harita merkezi kayda ve rapora konum olarak geçmez
+    if st.session_state.lat != DEFAULT_LAT:
+        lat, lon = st.session_state.lat, st.session_state.lon
+    else:
+        lat = lon = None
 
-        if output['last_clicked']:
-            st.session_state.lat = output['last_clicked']['lat']
-            st.session_state.lon = output['last_clicked']['lng']
-    
-    with col_info:
-        st.info("Seçilen Koordinatlar:")
-        st.metric("Enlem", f"{st.session_state.lat:.5f}")
-        st.metric("Boylam", f"{st.session_state.lon:.5f}")
-        lat = st.session_state.lat
-        lon = st.session_state.lon
-
-# Kategoriler
-categories = {
-    "Müfredat ve İçerik": {
-        "Kazanımlarla Uyum*": "Müfredat kazanımlarını sahada somutlaştırma imkanı.", 
-        "Merak Uyandırma": "Öğrencide ilgi ve keşif duygusu oluşturma potansiyeli."
-    },
-    "Ulaşım ve Erişim": {
-        "Yol Güvenliği": "Yolun fiziki yapısı (viraj, asfalt kalitesi vb.).", 
-        "Trafik Yoğunluğu": "Gidiş-dönüş güzergahındaki trafik riski.", 
-        "Mesafe Uygunluğu*": "Günübirlik gezi sınırları içinde kalma durumu.", 
-        "Araç Park İmkanı": "Otobüs/servis için güvenli park alanı."
-    },
-    "Temel Altyapı": {
-        "Yeme-İçme Tesisleri**": "Hijyenik ve erişilebilir beslenme alanları.", 
-        "Su Erişimi": "Temiz içme suyuna ulaşım.", 
-        "Toplanma Alanı": "Brifing ve dinlenme için uygun düzlük alan.", 
-        "Tuvalet İmkanı": "Temiz ve yeterli WC kapasitesi.", 
-        "İletişim Ağı": "Telefon ve internet çekim gücü.", 
-        "Engelli Erişimi***": "Özel gereksinimli bireyler için fiziksel uygunluk."
-    },
-    "Güvenlik ve Riskler": {
-        "Doğal Riskler*": "Heyelan, uçurum, kaya düşmesi vb. risklerin yokluğu.", 
-        "Beşeri Riskler*": "Trafik, asayiş vb. dış tehditlerin yokluğu.", 
-        "Sağlık Riskleri*": "Alerjen bitki, haşere vb. risklerin düşüklüğü.", 
-        "Acil Yardım Erişimi": "En yakın sağlık kuruluşuna ulaşım süresi."
-    }
-}
-
-all_scores = []
-cat_averages = []
-cat_names = []
-critical_fails = []
+schema = load_schema()
+item_values = np.full(len(schema.labels), np.nan)
 omitted_items = []
 
 st.divider()
@@ -202,33 +205,31 @@ st.divider()
 col_left, col_right = st.columns([1, 1])
 
 with col_left:
-    for cat_name, items in categories.items():
+    for c, cat_name in enumerate(schema.categories):
         st.subheader(cat_name)
-        cat_scores_temp = []
-        for item, help_text in items.items():
-            if "**" in item or "***" in item:
+        for j in schema.items_of(c):
+            item = schema.labels[j]
+            if schema.skippable[j]:
                 if st.checkbox(f"{item} - İhtiyaç Yok", key=f"skip_{item}"):
                     omitted_items.append(item)
                     continue
-            val = st.slider(item, 1, 5, 3, help=help_text)
-            all_scores.append(val)
-            cat_scores_temp.append(val)
-            if "*" in item and val < 3:
-                critical_fails.append(item)
-        
-        if cat_scores_temp:
-            cat_avg = sum(cat_scores_temp) / len(cat_scores_temp)
-            cat_averages.append(cat_avg)
-            cat_names.append(tr_to_en(cat_name))
-        else:
-            cat_averages.append(0)
-            cat_names.append(cat_name)
+            if f"score_{item}" not in st.session_state:
+                st.session_state[f"score_{item}"] = schema.default_score
+            item_values[j] = st.slider(item, schema.min_score, schema.max_score, key=f"score_{item}", help=schema.helps[j])
+
+# Tek satırlık puan vektörü, toplu değerlendirme ile aynı derlenmiş şemadan geçer
+scored = schema.score(item_values)
+cat_averages = scored["categories"][0]
+cat_names = tuple(schema.categories)
+critical_fails = [schema.labels[j] for j in np.flatnonzero(scored["fails"][0])]
+item_scores = {item: (None if np.isnan(v) else int(v)) for item, v in zip(schema.labels, item_values)}
 
 with col_right:
     st.markdown("### Analiz Grafiği")
-    if cat_averages:
-        chart_path, fig = create_radar_chart(cat_names, list(cat_averages), saha_ismi)
-        st.pyplot(fig)
+    chart_png = None
+    if len(cat_averages):
+        chart_png = create_radar_chart(cat_names, tuple(cat_averages), saha_ismi)
+        st.image(chart_png)
     st.write("")
     observation_note = st.text_area("Gözlem Notları ve Öneriler", height=150)
 
@@ -236,30 +237,32 @@ st.divider()
 
 # --- BUTON KISMI SADELEŞTİRİLDİ ---
 if st.button("Analizi Tamamla ve Rapor Oluştur", type="primary"):
-    if not all_scores:
+    if np.isnan(item_values).all():
         st.error("Lütfen puanlama yapınız.")
     else:
-        total_avg = sum(all_scores) / len(all_scores)
+        total_avg = float(scored["total"][0])
         
-        # Sonuç Belirleme
-        if critical_fails:
-            status_text = "UYGUN DEGIL (Kritik Guvenlik/Erisim Riskleri Mevcut)"
+        # Sonuç Belirleme (toplu değerlendirme ile aynı kurallar)
+        status_text = str(scored["status"][0])
+        if status_text == STATUS_CRITICAL:
             st.error(f"SONUÇ: {status_text}", icon="⛔")
-        elif total_avg >= 4:
-            status_text = "UYGUN (Saha Calismasi Icin Elverisli)"
+        elif status_text == STATUS_OK:
             st.success(f"SONUÇ: {status_text}", icon="✅")
-        elif total_avg >= 3:
-            status_text = "KISMEN UYGUN (Gelistirilebilir/Onlem Gerektirir)"
+        elif status_text == STATUS_PARTIAL:
             st.warning(f"SONUÇ: {status_text}", icon="⚠️")
         else:
-            status_text = "UYGUN DEGIL (Yetersiz Altyapi/Icerik)"
             st.error(f"SONUÇ: {status_text}", icon="❌")
             
         st.info(f"Genel Puan: {total_avg:.2f} / 5")
         
+        # Değerlendirmeyi kalıcı kayda ekle (yakındaki sahalar sorgusu için)
+        get_store().save(saha_ismi, degerlendiren, tarih, lat, lon, item_scores, omitted_items, total_avg, status_text)
+        if lat is None:
+            st.caption("Haritada konum seçilmediği için değerlendirme konumsuz kaydedildi; yakındaki sahalar ve uygunluk yüzeyinde yer almaz.")
+        
         # --- PDF OLUŞTURMA (Excel kısmı çıkarıldı) ---
         info = {"Saha": saha_ismi, "Uzman": degerlendiren, "Tarih": tarih, "Puan": f"{total_avg:.2f}"}
-        pdf_bytes = create_pdf(info, status_text, categories, all_scores, omitted_items, observation_note, chart_path, lat, lon)
+        pdf_bytes = create_pdf(info, status_text, item_scores, observation_note, chart_png, lat, lon)
         
         st.download_button(
             label="📄 PDF Raporunu İndir",
@@ -267,7 +270,39 @@ if st.button("Analizi Tamamla ve Rapor Oluştur", type="primary"):
             file_name=f"Rapor_{saha_ismi}.pdf",
             mime="application/pdf"
         )
-        
-        if os.path.exists("temp_chart.png"):
-            os.remove("temp_chart.png")
 
+# --- TOPLU SAHA DEĞERLENDİRMESİ ---
+st.divider()
+with st.expander("📊 Toplu Saha Değerlendirmesi (CSV/XLSX)"):
+    st.markdown("Her satırı bir aday saha olan tabloyu yükleyin. Sütunlar: **Saha**, **Enlem**, **Boylam** ve her kriter için 1-5 arası puan. "
+                "İhtiyaç olmayan (`**`/`***`) maddeleri boş bırakabilirsiniz.")
+    st.download_button("📥 Boş Şablonu İndir (CSV)", batch_template(), "Toplu_Saha_Sablonu.csv", "text/csv")
+    batch_file = st.file_uploader("Saha listesi", type=["csv", "xlsx"], key="batch_file")
+    if batch_file is not None:
+        try:
+            batch_result = score_sites(read_sites(batch_file))
+        except ValueError as e:
+            st.error(f"Dosya okunamadı: {e}")
+        else:
+            st.success(f"{len(batch_result)} saha değerlendirildi.")
+            st.dataframe(batch_result.round(2), hide_index=True, use_container_width=True)
+            st.download_button(
+                "📥 Sıralı Sonuçları İndir (CSV)",
+                batch_result.round(2).to_csv(index=False).encode("utf-8-sig"),
+                "Toplu_Saha_Sonuclari.csv",
+                "text/csv"
+            )
+
+            st.markdown("**Karşılaştırma Raporu**")
+            rc1, rc2 = st.columns(2)
+            report_count = rc1.number_input("Rapora alınacak saha sayısı", 1, len(batch_result), min(len(batch_result), 50))
+            top_n = rc2.number_input("Grafikte karşılaştırılacak ilk N saha", 1, 10, min(len(batch_result), 5))
+            if st.button("📑 Karşılaştırma Raporunu Oluştur"):
+                progress_bar = st.progress(0.0, text="Saha grafikleri hazırlanıyor...")
+                def report_progress(done, total):
+                    progress_bar.progress(done / total, text=f"Saha grafikleri hazırlanıyor... ({done}/{total})")
+                t_start = time.perf_counter()
+                pdf_bytes = create_comparison_pdf(batch_result.head(int(report_count)), int(top_n), get_report_pool(), report_progress)
+                progress_bar.empty()
+                st.success(f"Rapor hazır ({time.perf_counter() - t_start:.1f} sn).")
+                st.download_button("📥 Karşılaştırma Raporunu İndir (PDF)", pdf_bytes, "Saha_Karsilastirma_Raporu.pdf", "application/pdf")
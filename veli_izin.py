@@ -1,155 +1,47 @@
 import streamlit as st
-from fpdf import FPDF
 import datetime
+import multiprocessing
 import os
-
-# --- PDF OLUŞTURMA FONKSİYONLARI ---
-def create_dual_pdf(school_name, class_name, student_no, student_name, teacher_name, destination, trip_date, transport, purpose):
-    pdf = FPDF()
-    
-    # Font Kontrolü
-    font_path = "tr_font.ttf"
-    if os.path.exists(font_path):
-        pdf.add_font('TrFont', '', font_path, uni=True)
-        has_tr_font = True
-    else:
-        has_tr_font = False
-
-    def txt_fix(text):
-        if has_tr_font: return str(text)
-        tr_map = {"ı": "i", "İ": "I", "ğ": "g", "Ğ": "G", "ü": "u", "Ü": "U", "ş": "s", "Ş": "S", "ö": "o", "Ö": "O", "ç": "c", "Ç": "C"}
-        text = str(text)
-        for tr, en in tr_map.items(): text = text.replace(tr, en)
-        return text
-
-    pdf.add_page()
-
-    def draw_slip(start_y):
-        # 1. BAŞLIK BÖLÜMÜ
-        pdf.set_xy(10, start_y + 8) # Biraz aşağıdan başlattık
-        
-        if has_tr_font: pdf.set_font('TrFont', '', 11)
-        else: pdf.set_font("Arial", "B", 11)
-            
-        pdf.cell(0, 5, txt=txt_fix("T.C."), ln=True, align='C')
-        pdf.cell(0, 5, txt=txt_fix(f"{school_name.upper()} MÜDÜRLÜĞÜ"), ln=True, align='C')
-        pdf.cell(0, 5, txt=txt_fix("VELİ İZİN VE MUVAFAKAT BELGESİ"), ln=True, align='C')
-        
-        # 2. İZİN METNİ
-        pdf.set_xy(10, start_y + 25) # Boşluğu artırdık
-        if has_tr_font: pdf.set_font('TrFont', '', 9)
-        else: pdf.set_font("Arial", "", 9)
-        
-        c_name = txt_fix(class_name) if class_name else "..................."
-        s_no = student_no if student_no else "..................."
-        s_name = txt_fix(student_name) if student_name else "................................................................"
-        t_name = txt_fix(teacher_name) if teacher_name else "..............................................."
-        
-        body_text = (
-            f"Okulunuz {c_name} sınıfı, {s_no} numaralı öğrencisi, velisi bulunduğum "
-            f"{s_name}'nın; okulunuz coğrafya dersi kapsamında, sorumlu öğretmen "
-            f"{t_name} gözetiminde düzenlenecek olan saha çalışmasına katılmasına izin veriyorum."
-        )
-        # Satır yüksekliğini (h) 4'ten 5'e çıkardık ki satırlar birbirine girmesin
-        pdf.multi_cell(0, 5, txt=body_text)
-        
-        # 3. SAHA ÇALIŞMASI BİLGİLERİ (TABLO)
-        # Dinamik boşluk: Metin nerede bittiyse 4 birim altına in
-        current_y = pdf.get_y() + 4
-        pdf.set_xy(10, current_y)
-        
-        if has_tr_font: pdf.set_font('TrFont', '', 9) 
-        else: pdf.set_font("Arial", "B", 9)  
-        pdf.cell(0, 6, txt=txt_fix("SAHA ÇALIŞMASI BİLGİLERİ"), ln=True, border='B')
-        
-        if has_tr_font: pdf.set_font('TrFont', '', 8)
-        else: pdf.set_font("Arial", "", 8)
-            
-        line_height = 5.5 # Satır aralığını açtık
-        
-        # Gidilecek Yer
-        pdf.cell(35, line_height, txt=txt_fix("Gidilecek Yer"), border=0)
-        pdf.cell(3, line_height, txt=":", border=0)
-        pdf.cell(0, line_height, txt=txt_fix(destination), ln=True)
-        
-        # Tarih
-        pdf.cell(35, line_height, txt=txt_fix("Tarih"), border=0)
-        pdf.cell(3, line_height, txt=":", border=0)
-        pdf.cell(0, line_height, txt=txt_fix(trip_date.strftime("%d/%m/%Y")), ln=True)
-        
-        # Ulaşım
-        pdf.cell(35, line_height, txt=txt_fix("Ulaşım Aracı"), border=0)
-        pdf.cell(3, line_height, txt=":", border=0)
-        pdf.cell(0, line_height, txt=txt_fix(transport), ln=True)
-        
-        # Amacı
-        pdf.cell(35, line_height, txt=txt_fix("Etkinliğin Amacı"), border=0)
-        pdf.cell(3, line_height, txt=":", border=0)
-        pdf.multi_cell(0, line_height, txt=txt_fix(purpose))
-        
-        # 4. SAĞLIK VE İLETİŞİM
-        current_y = pdf.get_y() + 3
-        pdf.set_xy(10, current_y)
-        if has_tr_font: pdf.set_font('TrFont', '', 9)
-        else: pdf.set_font("Arial", "B", 9)
-        pdf.cell(0, 6, txt=txt_fix("SAĞLIK VE İLETİŞİM BİLGİLERİ"), ln=True, border='B')
-        
-        if has_tr_font: pdf.set_font('TrFont', '', 8)
-        else: pdf.set_font("Arial", "", 8)
-        
-        # Sağlık Sorusu
-        health_q = "Öğrencimin etkinliğe engel kronik rahatsızlığı (fobi, kalp, astım vb.) var mı?"
-        pdf.cell(0, 5, txt=txt_fix(health_q), ln=True)
-        
-        # Kutucuklar (Biraz daha aralıklı)
-        pdf.cell(5, 5, txt="", border=1)
-        pdf.cell(15, 5, txt=txt_fix(" Hayır"), ln=False)
-        pdf.cell(5, 5, txt="", border=0) # Boşluk
-        pdf.cell(5, 5, txt="", border=1)
-        pdf.cell(15, 5, txt=txt_fix(" Evet"), ln=False)
-        pdf.cell(0, 5, txt=txt_fix("(Açıklayınız: .....................................................)"), ln=True)
-        
-        pdf.ln(2) # Hafif boşluk
-        
-        # Kan Grubu (YENİ EKLENDİ)
-        pdf.cell(35, 5, txt=txt_fix("Kan Grubu"), border=0)
-        pdf.cell(0, 5, txt=": ...........................................................", ln=True)
-        
-        # İletişim
-        pdf.cell(35, 5, txt=txt_fix("Veli Tel"), border=0)
-        pdf.cell(0, 5, txt=": ...........................................................", ln=True)
-        
-        pdf.cell(35, 5, txt=txt_fix("Acil Durum 2. Kişi"), border=0)
-        pdf.cell(0, 5, txt=": ...................................... (Tel: ...................................)", ln=True)
-
-        # 5. İMZA BÖLÜMÜ
-        pdf.ln(4)
-        if has_tr_font: pdf.set_font('TrFont', '', 7)
-        else: pdf.set_font("Arial", "", 7)
-        taahhut = "Yukarıdaki bilgilerin doğruluğunu beyan eder, öğrencimin sorumluluğunu kabul ederim."
-        pdf.multi_cell(0, 4, txt=txt_fix(taahhut), align='C')
-        
-        pdf.ln(2)
-        if has_tr_font: pdf.set_font('TrFont', '', 9)
-        else: pdf.set_font("Arial", "", 9)
-        
-        pdf.cell(95, 5, txt=txt_fix(f"Tarih: ..../..../20...."), align='C')
-        pdf.cell(95, 5, txt=txt_fix("Velinin Adı Soyadı - İmza"), align='C')
-
-    # İki belgeyi çiz
-    draw_slip(0)   # Üst kopya
-    
-    # Kesme Çizgisi
-    pdf.set_line_width(0.5)
-    pdf.set_draw_color(150, 150, 150)
-    pdf.dashed_line(0, 148, 210, 148, dash_length=2, space_length=2)
-    pdf.set_xy(100, 145)
-    pdf.set_font("Arial", size=8)
-    pdf.cell(10, 4, "- - - - Kesme Cizgisi - - - -", align='C')
-
-    draw_slip(148) # Alt kopya
-    
-    return pdf.output(dest='S').encode('latin-1', 'ignore')
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from izin_belgesi import Trip, create_dual_pdf, create_roster_pdf, write_slip_zip
+from izin_takip import ReturnTracker, decode_codes, parse_codes
+from ogrenci_listesi import read_roster
+
+# --- BELGE SÜREÇ HAVUZU (süreç başına bir kez) ---
+# spawn: Streamlit sunucusunun iş parçacıklı durumu çatallanmadan temiz işçi süreçler başlar.
+# Tek çekirdekte havuz kurulmaz: belgeler şablondan milisaniyeler içinde çıktığından süreçler arası
+# aktarım kazancı aşar (300 öğrenci: sıralı 0,8 sn, tek işçili havuz 1,1 sn; bkz. benchmarks/izin_zip.py).
+@st.cache_resource
+def get_slip_pool():
+    if (os.cpu_count() or 1) < 2:
+        return None
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+# --- DÖNÜŞ TAKİBİ (süreç başına bir kez) ---
+@st.cache_resource
+def get_tracker():
+    return ReturnTracker()
+
+STATUS_LABELS = {"returned": "✅ alındı", "duplicate": "↩️ zaten alınmıştı", "unknown": "❓ listede yok"}
+
+def register_slips(trip, students):
+    # Belgedeki kod takip kaydıyla eşleşsin; aynı koda düşen öğrenciler uyarılır
+    _, conflicts = get_tracker().register(trip, students)
+    if conflicts:
+        st.warning(f"{len(conflicts)} belge kodu birden çok öğrenciye denk geliyor (ör. farklı sınıflarda aynı okul numarası). "
+                   "Bu belgeler dönüşte birbirinden ayırt edilemez; okul numaralarını kontrol edin.")
+        st.dataframe(pd.DataFrame([(code, ", ".join(labels)) for code, labels in conflicts.items()],
+                                  columns=["Öğrenci kodu", "Öğrenciler"]), hide_index=True)
+
+def show_scan_results(results, elapsed):
+    counts = {status: sum(1 for _, s, _ in results if s == status) for status in STATUS_LABELS}
+    st.success(f"{counts['returned']} belge işaretlendi · {counts['duplicate']} tekrar · {counts['unknown']} tanınmayan")
+    st.caption(f"{len(results)} kod · {elapsed * 1000:.0f} ms")
+    st.dataframe(pd.DataFrame([(code, STATUS_LABELS[status], name) for code, status, name in results],
+                              columns=["Kod", "Durum", "Öğrenci"]), hide_index=True)
 
 # --- ARAYÜZ ---
 st.set_page_config(page_title="Veli İzin Belgesi", page_icon="✂️", layout="centered")
@@ -188,7 +80,7 @@ st.divider()
 
 st.markdown("### 🎓 Belge Oluşturma")
 
-tab1, tab2 = st.tabs(["📄 Toplu Şablon (Boş)", "👤 Öğrenciye Özel"])
+tab1, tab2, tab3, tab4 = st.tabs(["📄 Toplu Şablon (Boş)", "👤 Öğrenciye Özel", "👥 Sınıf Listesi", "✅ Dönüş Takibi"])
 
 with tab1:
     st.info("Bu seçenek ile isim kısımları boş bırakılır. Sınıfa dağıtmak için uygundur.")
@@ -205,7 +97,97 @@ with tab2:
     s_name = c3.text_input("Öğrenci Adı Soyadı", "Ali Veli")
     
     if st.button("Öğrenci Belgesini Oluştur"):
+        start = time.perf_counter()
+        if s_name:
+            register_slips(Trip(school_name, teacher_name, destination, trip_date, transport, purpose), [(c_name, s_no, s_name)])
         pdf_data = create_dual_pdf(school_name, c_name, s_no, s_name, teacher_name, destination, trip_date, transport, purpose)
         st.success(f"{s_name} için belge hazır!")
+        st.caption(f"{len(pdf_data) / 1024:.0f} KB · {(time.perf_counter() - start) * 1000:.0f} ms")
         st.download_button(f"📥 {s_name} İzin Belgesi İndir", pdf_data, f"Izin_{s_name}.pdf", "application/pdf")
 
+with tab3:
+    st.write("Öğrenci listesindeki herkes için dolu belgeleri tek bir PDF'te hazırlar.")
+    st.caption("CSV/XLSX: \"Ad Soyad\" sütunu zorunlu; \"Sınıf\" ve \"No\" sütunları isteğe bağlıdır.")
+    roster_file = st.file_uploader("Öğrenci Listesi", type=["csv", "xlsx"], key="roster")
+    layout = st.radio("Sayfa düzeni", ("Her öğrenciye bir sayfa (iki kopya)", "Sayfa başına iki öğrenci"), horizontal=True)
+    if roster_file is not None:
+        try:
+            students = [(row.class_name, row.number, row.name) for row in read_roster(roster_file)]
+        except Exception as e:
+            st.error(f"Öğrenci listesi okunamadı: {e}")
+            students = []
+        if students:
+            st.write(f"**Öğrenci sayısı:** {len(students)}")
+            st.caption("Belgelerdeki kod ve QR ile geri gelen belgeler \"Dönüş Takibi\" sekmesinde işaretlenir.")
+            if st.button("Sınıf Belgelerini Oluştur"):
+                trip = Trip(school_name, teacher_name, destination, trip_date, transport, purpose)
+                register_slips(trip, students)
+                bar = st.progress(0.0, text="Belgeler hazırlanıyor...")
+                start = time.perf_counter()
+                pdf_data = create_roster_pdf(trip, students, two_per_page=layout.startswith("Sayfa başına"),
+                                             progress=lambda done, total: bar.progress(done / total, text=f"Belgeler hazırlanıyor... {done}/{total}"))
+                bar.empty()
+                st.success(f"{len(students)} öğrenci için belgeler hazır!")
+                st.caption(f"{len(pdf_data) / 1024:.0f} KB · {time.perf_counter() - start:.1f} sn")
+                st.download_button("📥 Sınıf Belgelerini İndir (PDF)", pdf_data, "Veli_Izin_Sinif_Listesi.pdf", "application/pdf")
+
+            # E-posta ile dağıtım için her öğrenciye ayrı dosya; arşiv diske yazılır, bitince indirilir
+            if st.button("Kişiye Özel Dosyalar (ZIP)"):
+                trip = Trip(school_name, teacher_name, destination, trip_date, transport, purpose)
+                register_slips(trip, students)
+                bar = st.progress(0.0, text="Belgeler hazırlanıyor...")
+                start = time.perf_counter()
+                # Arşiv yazılırken belgeler bellekte birikmez; bitince bir kez okunur ve geçici dosya silinir
+                with tempfile.TemporaryFile() as archive:
+                    write_slip_zip(trip, students, archive, executor=get_slip_pool(),
+                                   progress=lambda done, total: bar.progress(done / total, text=f"Belgeler hazırlanıyor... {done}/{total}"))
+                    archive.seek(0)
+                    zip_data = archive.read()
+                bar.empty()
+                st.success(f"{len(students)} öğrenci için ayrı belgeler hazır!")
+                st.caption(f"{len(zip_data) / 1024:.0f} KB · {time.perf_counter() - start:.1f} sn · {os.cpu_count()} çekirdek")
+                st.download_button("📥 Belgeleri İndir (ZIP)", zip_data, "Veli_Izin_Belgeleri.zip", "application/zip")
+
+with tab4:
+    tracker = get_tracker()
+    trips = tracker.trips()
+    if not trips:
+        st.info("Henüz kayıtlı gezi yok. \"Öğrenciye Özel\" ya da \"Sınıf Listesi\" sekmesinde belgeler oluşturulduğunda gezi burada listelenir.")
+    else:
+        titles = dict(trips)
+        selected = st.selectbox("Gezi", list(titles), format_func=lambda code: f"{titles[code]} ({code})")
+
+        st.write("Geri gelen belgelerin kodlarını yazın ya da okuyucuyla okutun (birden çok kod olabilir).")
+        with st.form("code_entry", clear_on_submit=True):
+            typed = st.text_area("Belge kodları", placeholder="K7Q2MD-1045", height=80)
+            if st.form_submit_button("Kodları İşaretle"):
+                start = time.perf_counter()
+                codes = parse_codes(typed)
+                if codes:
+                    show_scan_results(tracker.mark_returned(codes), time.perf_counter() - start)
+                else:
+                    st.warning("Geçerli bir belge kodu bulunamadı.")
+
+        photos = st.file_uploader("Belge fotoğrafları (QR)", type=["png", "jpg", "jpeg"], accept_multiple_files=True, key="scans")
+        if photos and st.button("Fotoğraflardaki Kodları İşaretle"):
+            start = time.perf_counter()
+            codes = []
+            for photo in photos:
+                found = decode_codes(photo.getvalue())
+                if not found:
+                    st.warning(f"{photo.name}: QR kod okunamadı.")
+                codes += found
+            if codes:
+                show_scan_results(tracker.mark_returned(codes), time.perf_counter() - start)
+
+        counts = tracker.class_counts(selected)
+        total = sum(c[1] for c in counts)
+        returned = sum(c[2] for c in counts)
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Toplam", total)
+        m2.metric("Gelen", returned)
+        m3.metric("Bekleyen", total - returned)
+        st.dataframe(pd.DataFrame([(c or "-", t, r, t - r) for c, t, r in counts],
+                                  columns=["Sınıf", "Toplam", "Gelen", "Bekleyen"]), hide_index=True)
+        with st.expander(f"Belgesi gelmeyen öğrenciler ({total - returned})"):
+            st.dataframe(pd.DataFrame(tracker.outstanding(selected), columns=["Sınıf", "No", "Ad Soyad"]), hide_index=True)